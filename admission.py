@@ -0,0 +1,240 @@
+import asyncio
+import itertools
+import math
+import time
+from collections import deque
+from typing import Optional
+import config
+import metrics
+
+class AdmissionRejected(Exception):
+    """Request ditolak gate; dijawab status_code + header Retry-After"""
+
+    def __init__(self, status_code: int, reason: str, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.reason = reason
+        self.detail = detail
+        self.retry_after = retry_after
+
+class Ticket:
+    """Jatah ulasan milik satu request; release() aman dipanggil lebih dari sekali"""
+
+    def __init__(self, gate: "AdmissionGate", reviews: int, charge: int):
+        self.gate = gate
+        self.reviews = reviews
+        self.charge = charge
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.gate._release(self)
+
+class _Waiter:
+    def __init__(self, reviews: int, charge: int, seq: int, future: asyncio.Future):
+        self.reviews = reviews
+        self.charge = charge
+        self.seq = seq
+        self.future = future
+
+    @property
+    def priority(self):
+        # request kecil didahulukan; ukuran sama = urutan datang
+        return (self.charge, self.seq)
+
+class AdmissionGate:
+    """Admission control berdasarkan jumlah ulasan yang sedang diproses, bukan jumlah request.
+
+    Request masuk langsung jika ulasannya masih muat di max_pending_reviews. Jika tidak,
+    request menunggu di antrean prioritas (ulasan paling sedikit lebih dulu) paling lama
+    max_wait_seconds. Antrean dibatasi max_queued_reviews; saat penuh, request kecil
+    menggeser request antrean yang lebih besar, sisanya langsung ditolak 429. Request
+    yang habis waktu tunggunya ditolak 503. Request yang lebih besar dari seluruh
+    kapasitas dihitung sebesar kapasitas (hanya diproses saat gate kosong).
+    """
+
+    def __init__(self, max_pending_reviews: int, max_queued_reviews: int, max_wait_seconds: float):
+        self.max_pending_reviews = max_pending_reviews
+        self.max_queued_reviews = max_queued_reviews
+        self.max_wait_seconds = max_wait_seconds
+
+        self.inflight_requests = 0
+        self.inflight_reviews = 0
+        self.queued_reviews = 0
+        self._waiters = []
+        self._seq = itertools.count()
+        # (waktu selesai, jumlah ulasan) untuk memperkirakan laju pengurasan
+        self._completions = deque(maxlen=1000)
+
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.evicted = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_pending_reviews > 0
+
+    async def acquire(self, reviews: int, force: bool = False) -> Ticket:
+        """Menunggu jatah untuk `reviews` ulasan; force=True selalu masuk tetapi tetap dihitung
+        (dipakai worker job async yang jumlahnya sudah dibatasi JOB_WORKERS)
+        """
+        reviews = max(1, reviews)
+        charge = min(reviews, self.max_pending_reviews) if self.enabled else reviews
+        if force or not self.enabled or self._fits_now(charge):
+            return self._admit(reviews, charge, queued=False)
+
+        if self.queued_reviews + charge > self.max_queued_reviews and not self._evict_for(charge):
+            self._reject("queue_full")
+            raise AdmissionRejected(
+                429, "queue_full",
+                "Server sedang penuh, coba lagi nanti atau kirim lewat /recommend/jobs.",
+                self.retry_after(),
+            )
+
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(reviews, charge, next(self._seq), loop.create_future())
+        self._waiters.append(waiter)
+        self.queued_reviews += charge
+        start = time.perf_counter()
+        try:
+            return await asyncio.wait_for(asyncio.shield(waiter.future), timeout=self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            if self._remove_waiter(waiter):
+                self.timed_out += 1
+                self._reject("timeout")
+                raise AdmissionRejected(
+                    503, "timeout",
+                    "Server sedang sibuk memproses ulasan lain, coba lagi nanti.",
+                    self.retry_after(),
+                )
+            # sempat diterima (atau digeser) tepat saat waktu habis
+            return waiter.future.result()
+        except asyncio.CancelledError:
+            # client memutus koneksi selagi menunggu
+            if not self._remove_waiter(waiter) and waiter.future.done() and waiter.future.exception() is None:
+                waiter.future.result().release()
+            raise
+        finally:
+            metrics.ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - start)
+
+    def _fits_now(self, charge: int) -> bool:
+        if self.inflight_reviews + charge > self.max_pending_reviews:
+            return False
+        # jangan menyalip waiter yang lebih kecil / datang lebih dulu dengan ukuran sama
+        return all(charge < waiter.charge for waiter in self._waiters)
+
+    def _admit(self, reviews: int, charge: int, queued: bool) -> Ticket:
+        self.inflight_requests += 1
+        self.inflight_reviews += charge
+        self.admitted += 1
+        metrics.ADMISSION_DECISIONS.inc(decision="admitted_after_wait" if queued else "admitted")
+        return Ticket(self, reviews, charge)
+
+    def _reject(self, reason: str):
+        self.rejected += 1
+        metrics.ADMISSION_DECISIONS.inc(decision=reason)
+
+    def _remove_waiter(self, waiter: _Waiter) -> bool:
+        if waiter not in self._waiters:
+            return False
+        self._waiters.remove(waiter)
+        self.queued_reviews -= waiter.charge
+        return True
+
+    def _evict_for(self, charge: int) -> bool:
+        """Menggeser waiter terbesar (yang lebih besar dari request ini) sampai antrean muat"""
+        larger = sorted((w for w in self._waiters if w.charge > charge), key=lambda w: w.priority, reverse=True)
+        freed = 0
+        needed = self.queued_reviews + charge - self.max_queued_reviews
+        victims = []
+        for waiter in larger:
+            if freed >= needed:
+                break
+            victims.append(waiter)
+            freed += waiter.charge
+        if freed < needed:
+            return False
+
+        retry_after = self.retry_after()
+        for waiter in victims:
+            self._remove_waiter(waiter)
+            self.evicted += 1
+            self._reject("evicted")
+            waiter.future.set_exception(AdmissionRejected(
+                429, "evicted",
+                "Request besar digeser request yang lebih kecil, coba lagi nanti atau kirim lewat /recommend/jobs.",
+                retry_after,
+            ))
+        return True
+
+    def _release(self, ticket: Ticket):
+        self.inflight_requests -= 1
+        self.inflight_reviews -= ticket.charge
+        self._completions.append((time.monotonic(), ticket.reviews))
+        self._dispatch()
+
+    def _dispatch(self):
+        while self._waiters:
+            waiter = min(self._waiters, key=lambda w: w.priority)
+            # gate kosong: request terbesar pun boleh jalan sendirian
+            if self.inflight_reviews + waiter.charge > self.max_pending_reviews and self.inflight_reviews > 0:
+                return
+            self._remove_waiter(waiter)
+            waiter.future.set_result(self._admit(waiter.reviews, waiter.charge, queued=True))
+
+    def drain_rate(self) -> Optional[float]:
+        """Ulasan per detik yang diselesaikan dalam 60 detik terakhir"""
+        now = time.monotonic()
+        recent = [(t, reviews) for t, reviews in self._completions if now - t <= 60]
+        if len(recent) < 2:
+            return None
+        span = now - recent[0][0]
+        return sum(reviews for _, reviews in recent) / span if span > 0 else None
+
+    def retry_after(self) -> int:
+        """Perkiraan detik sampai antrean + ulasan yang sedang diproses habis (1..60)"""
+        rate = self.drain_rate()
+        backlog = self.inflight_reviews + self.queued_reviews
+        if not rate:
+            return max(1, math.ceil(self.max_wait_seconds))
+        return min(60, max(1, math.ceil(backlog / rate)))
+
+    def state(self) -> str:
+        if not self.enabled:
+            return "disabled"
+        if self.queued_reviews >= self.max_queued_reviews:
+            return "shedding"
+        if self._waiters or self.inflight_reviews >= self.max_pending_reviews:
+            return "saturated"
+        return "open"
+
+    def stats(self) -> dict:
+        rate = self.drain_rate()
+        return {
+            "state": self.state(),
+            "max_pending_reviews": self.max_pending_reviews,
+            "max_queued_reviews": self.max_queued_reviews,
+            "max_wait_seconds": self.max_wait_seconds,
+            "inflight_requests": self.inflight_requests,
+            "inflight_reviews": self.inflight_reviews,
+            "queued_requests": len(self._waiters),
+            "queued_reviews": self.queued_reviews,
+            "drain_rate_reviews_per_second": round(rate, 1) if rate else None,
+            "retry_after_seconds": self.retry_after(),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "evicted": self.evicted,
+        }
+
+def request_reviews(request) -> int:
+    """Biaya satu RecommendationRequest: total ulasan di semua kandidat"""
+    return sum(len(candidate.reviews) for candidate in request.candidates)
+
+gate = AdmissionGate(
+    max_pending_reviews=config.ADMISSION_MAX_PENDING_REVIEWS,
+    max_queued_reviews=config.ADMISSION_MAX_QUEUED_REVIEWS,
+    max_wait_seconds=config.ADMISSION_MAX_WAIT_SECONDS,
+)
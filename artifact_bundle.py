@@ -0,0 +1,200 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# numpy diimpor di fungsi yang membutuhkannya: proses API memverifikasi checksum bundle
+# registry (verify_bundle) tanpa ikut memuat numpy
+
+BUNDLE_FORMAT = 2
+MANIFEST_NAME = "manifest.json"
+BOOSTER_NAME = "booster.ubj"
+# Array pohon evaluator NumPy (TreeEnsemble), disimpan satu .npy per atribut
+TREE_ARRAYS = ("feature", "threshold", "left", "right", "default_left", "leaf_value", "roots", "tree_class", "base_margin")
+
+class BundleError(ValueError):
+    """Bundle tidak lengkap, rusak (checksum beda) atau formatnya tidak didukung"""
+
+class BundleLabelEncoder:
+    """Pengganti LabelEncoder sklearn dari daftar kelas di manifest"""
+
+    def __init__(self, classes):
+        import numpy as np
+
+        self.classes_ = np.asarray(classes)
+
+    def inverse_transform(self, indices):
+        import numpy as np
+
+        return self.classes_[np.asarray(indices)]
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def write_bundle(path: Path, source_version: str, vectorizer, label_encoder, predictor, ensemble=None) -> dict:
+    """Menulis bundle serving ke direktori `path` (diganti utuh); mengembalikan manifest.
+
+    Isi bundle (tanpa pickle):
+    - vocab.npy: term TF-IDF sebagai tabel string UTF-8 terurut (bytes), vocab_index.npy: indeks
+      fitur asli tiap term. Urutan byte membuat isi file deterministik dan bisa dicari biner.
+    - idf.npy (urutan fitur asli), selector_columns.npy (indeks kolom SelectKBest)
+    - booster.ubj: booster XGBoost format UBJSON bawaan
+    - tree_*.npy: evaluator NumPy hasil compile_booster (opsional), termasuk array turunan
+      evaluasinya (TreeEnsemble.layout) dalam bentuk akhir sehingga worker tidak menyalinnya
+    - manifest.json: format, versi sumber, parameter vectorizer, kelas label, sha256 tiap file
+    """
+    import numpy as np
+
+    path = Path(path)
+    staging = path.with_name(path.name + ".tmp")
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir(parents=True)
+
+    terms = sorted((term.encode("utf-8"), int(idx)) for term, idx in vectorizer.vocabulary_.items())
+    arrays = {
+        "vocab": np.array([term for term, _ in terms], dtype=bytes),
+        "vocab_index": np.array([idx for _, idx in terms], dtype=np.int32),
+        "idf": np.ascontiguousarray(vectorizer.idf_, dtype=np.float64),
+        "selector_columns": np.asarray(predictor.columns, dtype=np.int32),
+    }
+    if ensemble is not None:
+        arrays.update({f"tree_{name}": getattr(ensemble, name) for name in TREE_ARRAYS})
+        arrays["tree_columns"] = ensemble.columns
+        layout = ensemble.layout()
+        arrays.update({f"tree_{name}": array for name, array in layout.items()})
+
+    for name, array in arrays.items():
+        np.save(staging / f"{name}.npy", array, allow_pickle=False)
+    predictor.booster.save_model(str(staging / BOOSTER_NAME))
+
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "source_version": source_version,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "vectorizer": {"token_pattern": vectorizer.token_pattern, "n_features": len(arrays["idf"])},
+        "classes": [str(label) for label in label_encoder.classes_],
+        "model": {"booster": BOOSTER_NAME, "iteration_end": int(predictor.iteration_end)},
+        "tree_ensemble": {
+            "n_features": int(ensemble.n_features),
+            "max_depth": int(ensemble.max_depth),
+            "layout": list(layout),
+        } if ensemble is not None else None,
+        "files": {
+            file.name: {"sha256": _sha256(file), "bytes": file.stat().st_size}
+            for file in sorted(staging.iterdir())
+        },
+    }
+    with open(staging / MANIFEST_NAME, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    # bundle lama diganti setelah bundle baru lengkap
+    if path.exists():
+        shutil.rmtree(path)
+    os.replace(staging, path)
+    return manifest
+
+def read_manifest(path: Path) -> dict:
+    manifest_path = Path(path) / MANIFEST_NAME
+    if not manifest_path.exists():
+        raise BundleError(f"{manifest_path} tidak ditemukan")
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise BundleError(f"Format bundle tidak didukung: {manifest.get('format')}")
+    return manifest
+
+def verify_bundle(path: Path, manifest: dict, checksums: bool = True):
+    """Mencocokkan ukuran (dan sha256 jika checksums=True) setiap file dengan manifest.
+
+    sha256 membaca seluruh isi bundle, jadi cukup sekali per bundle: saat build
+    (src/export/build_bundle.py) atau di proses API sebelum worker versi registry dinyalakan.
+    Worker sendiri hanya mencocokkan ukuran file (file terpotong / tertukar).
+    """
+    for name, expected in manifest["files"].items():
+        file = Path(path) / name
+        if not file.exists():
+            raise BundleError(f"File bundle hilang: {name}")
+        if file.stat().st_size != expected["bytes"]:
+            raise BundleError(f"Ukuran file bundle tidak cocok: {name}")
+        if checksums and _sha256(file) != expected["sha256"]:
+            raise BundleError(f"Checksum file bundle tidak cocok: {name}")
+
+def _load_array(path: Path, name: str):
+    import numpy as np
+
+    # mmap read-only: halaman file dibagi lewat page cache oleh semua proses yang memuat bundle ini
+    return np.load(Path(path) / f"{name}.npy", mmap_mode="r", allow_pickle=False)
+
+def load_bundle(path: Path, load_model: bool = True, verify: bool = False):
+    """Memuat bundle; mengembalikan (manifest, vectorizer, label_encoder, model, waktu muat per aset).
+
+    Array dibuka dengan mmap (tidak disalin ke heap proses); vocab dicari biner langsung di
+    array terurutnya. Vectorizer langsung menghasilkan kolom SelectKBest (NarrowVectorizer).
+    verify=True: sha256 setiap file (lihat verify_bundle). load_model=False: booster tidak dimuat (model None)
+    dan xgboost tidak diimpor, dipakai jika model diganti evaluator NumPy (load_tree_ensemble).
+    """
+    import numpy as np
+    import narrow_vectorizer
+
+    load_times = {}
+    path = Path(path)
+
+    start = time.perf_counter()
+    manifest = read_manifest(path)
+    verify_bundle(path, manifest, checksums=verify)
+    load_times["bundle_verify"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    idf = _load_array(path, "idf")
+    selector_columns = _load_array(path, "selector_columns")
+    columns = np.full(len(idf), -1, dtype=np.int32)
+    columns[selector_columns] = np.arange(len(selector_columns), dtype=np.int32)
+    vectorizer = narrow_vectorizer.NarrowVectorizer(
+        _load_array(path, "vocab"), _load_array(path, "vocab_index"), idf, columns, manifest["vectorizer"]["token_pattern"]
+    )
+    label_encoder = BundleLabelEncoder(manifest["classes"])
+    load_times["vectorizer"] = time.perf_counter() - start
+
+    if not load_model:
+        return manifest, vectorizer, label_encoder, None, load_times
+
+    start = time.perf_counter()
+    import xgboost as xgb
+    import lean_predictor
+    load_times["model_imports"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    booster = xgb.Booster()
+    booster.load_model(str(path / manifest["model"]["booster"]))
+    model = lean_predictor.LeanPredictor(
+        selector_columns, booster, n_features=len(idf), iteration_end=manifest["model"]["iteration_end"]
+    )
+    load_times["model"] = time.perf_counter() - start
+
+    return manifest, vectorizer, label_encoder, model, load_times
+
+def load_tree_ensemble(path: Path, manifest: dict):
+    """Evaluator NumPy dari array tree_*.npy (mmap, termasuk layout evaluasi; tidak ada yang
+    dihitung ulang atau disalin); None jika bundle dibuat tanpa tree ensemble
+    """
+    import tree_ensemble
+
+    params = manifest.get("tree_ensemble")
+    if params is None:
+        return None
+    arrays = {name: _load_array(path, f"tree_{name}") for name in TREE_ARRAYS}
+    return tree_ensemble.TreeEnsemble(
+        columns=_load_array(path, "tree_columns"),
+        n_features=params["n_features"],
+        max_depth=params["max_depth"],
+        layout={name: _load_array(path, f"tree_{name}") for name in params["layout"]},
+        **arrays,
+    )
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import re
+from typing import Dict, List
+import config
+
+# Naikkan jika semantik pencocokan berubah, agar cache prediksi lama tidak terpakai
+MATCHER_VERSION = 2
+
+_WORD_CHAR = re.compile(r'\w')
+
+class AspectMatcher:
+    """Pencocokan keyword aspek dalam satu kali scan teks.
+
+    Semua keyword digabung menjadi satu regex berbentuk trie (prefix yang sama
+    difaktorkan) dengan batas kata (\\b). Regex dibungkus lookahead sehingga setiap
+    awal kata dicek, termasuk keyword yang tumpang tindih ("panas saat cas" juga
+    memuat "cas"). Keyword yang merupakan prefix kata dari keyword lain di posisi
+    yang sama ("panas" di "panas saat cas") dicatat lewat tabel prefix karena regex
+    hanya mengembalikan alternatif terpanjang.
+    """
+
+    def __init__(self, aspect_keywords: Dict[str, List[str]]):
+        self.signature = _signature(aspect_keywords)
+        self.digest = hashlib.sha256(
+            json.dumps([MATCHER_VERSION, self.signature]).encode("utf-8")
+        ).hexdigest()[:8]
+
+        self.aspects = list(aspect_keywords.keys())
+        # (aspect, urutan keyword di config) agar output sama urutannya dengan loop lama
+        self.keyword_slots = {}
+        for aspect, keywords in aspect_keywords.items():
+            for position, keyword in enumerate(keywords):
+                self.keyword_slots.setdefault(keyword, []).append((aspect, position))
+
+        keywords = sorted(self.keyword_slots, key=len, reverse=True)
+        self.pattern = re.compile(r'\b(?=(' + _trie_pattern(keywords) + r')\b)')
+        self.word_prefixes = {
+            keyword: [other for other in keywords if _is_word_prefix(other, keyword)]
+            for keyword in keywords
+        }
+
+    def match(self, *texts: str) -> Dict[str, List[str]]:
+        """Keyword yang muncul di salah satu teks, dikelompokkan per aspek (urutan config)"""
+        hits = set()
+        for keyword in self.pattern.findall("\n".join(texts)):
+            hits.add(keyword)
+            hits.update(self.word_prefixes[keyword])
+
+        slots = {}
+        for keyword in hits:
+            for aspect, position in self.keyword_slots[keyword]:
+                slots.setdefault(aspect, []).append((position, keyword))
+
+        return {
+            aspect: [keyword for _, keyword in sorted(slots[aspect])]
+            for aspect in self.aspects
+            if aspect in slots
+        }
+
+def _signature(aspect_keywords: Dict[str, List[str]]):
+    return tuple((aspect, tuple(keywords)) for aspect, keywords in aspect_keywords.items())
+
+def _trie_pattern(words: List[str]) -> str:
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return _trie_node_pattern(trie)
+
+def _trie_node_pattern(node: dict) -> str:
+    branches = [re.escape(char) + _trie_node_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    # quantifier greedy: keyword terpanjang dicoba dulu, mundur ke yang lebih pendek jika \b gagal
+    return "(?:" + body + ")?" if "" in node else body
+
+def _is_word_prefix(prefix: str, keyword: str) -> bool:
+    """True jika `prefix` cocok dengan \\b di posisi awal `keyword` yang sama"""
+    if prefix == keyword or not keyword.startswith(prefix):
+        return False
+    # batas kata di akhir prefix: salah satu sisi bukan karakter kata
+    return not (_WORD_CHAR.match(prefix[-1]) and _WORD_CHAR.match(keyword[len(prefix)]))
+
+_matcher = None
+
+def get_matcher() -> AspectMatcher:
+    """Matcher untuk config.ASPECT_KEYWORDS saat ini; dibangun ulang jika config berubah"""
+    global _matcher
+
+    if _matcher is None or _matcher.signature != _signature(config.ASPECT_KEYWORDS):
+        _matcher = AspectMatcher(config.ASPECT_KEYWORDS)
+    return _matcher
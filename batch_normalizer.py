@@ -0,0 +1,68 @@
+import re
+from typing import Iterable, List
+
+# Token hasil stem_cache.normalize_text(text).split(' '): setelah karakter selain [a-z0-9 -]
+# diganti spasi dan spasi beruntun digabung, yang tersisa adalah run maksimal [a-z0-9-].
+# Flag IGNORECASE sama dengan regex Sastrawi (mis. tanda Kelvin ikut lolos seperti aslinya).
+_TOKEN = re.compile(r'[a-z0-9-]+', re.IGNORECASE)
+
+class _BatchStems(dict):
+    """Stem per kata unik dalam satu batch; kata baru diteruskan ke StemCache sekali saja"""
+
+    def __init__(self, stem_word):
+        super().__init__()
+        self.stem_word = stem_word
+
+    def __missing__(self, word: str) -> str:
+        stem = self[word] = self.stem_word(word)
+        return stem
+
+def remove_stopwords(words: List[str], stopwords: frozenset) -> List[str]:
+    """Setara StopWordRemover.remove Sastrawi, termasuk perilakunya menghapus elemen list
+    yang sedang diiterasi: list.remove membuang kemunculan pertama kata itu dan kata
+    sesudahnya ikut terlewati (mis. dua stopword berurutan, yang kedua tetap ada).
+    """
+    if stopwords.isdisjoint(words):
+        return words
+    for word in words:
+        if word in stopwords:
+            words.remove(word)
+    return words
+
+class BatchNormalizer:
+    """Preprocessing banyak ulasan sekaligus, hasilnya identik dengan ml_core.preprocess_text.
+
+    Urutan per ulasan sama dengan jalur lama: (lower) -> hapus stopword pada token split(' ')
+    -> normalize_text -> stem per kata. Stopword dicek lewat frozenset tanpa panggilan method
+    dictionary Sastrawi, normalize_text + split diganti satu findall regex terkompilasi, dan
+    setiap kata unik di batch di-stem sekali lewat StemCache (kamus prebuilt + LRU).
+    """
+
+    def __init__(self, stopwords: Iterable[str], stemmer):
+        # kata kosong tidak pernah cocok di dictionary Sastrawi (diabaikan saat add)
+        self.stopwords = frozenset(word for word in stopwords if word and word.strip() != '')
+        self.stemmer = stemmer
+
+    def tokenize(self, texts: List[str], lowercase: bool = True) -> List[List[str]]:
+        """Token per ulasan yang sampai ke stemmer (setelah stopword & normalize_text)"""
+        stopwords = self.stopwords
+        findall = _TOKEN.findall
+        token_lists = []
+        for text in texts:
+            if lowercase:
+                text = text.lower()
+            words = remove_stopwords(text.split(' '), stopwords)
+            # normalize_text('') menghasilkan satu token kosong
+            token_lists.append(findall(' '.join(words).lower()) or [''])
+        return token_lists
+
+    def normalize(self, texts: List[str], lowercase: bool = True) -> List[str]:
+        """lowercase=True: setara preprocess_text (serving); lowercase=False: setara
+        stopword.remove + stemmer.stem tanpa lower di awal (src/utils/preprocessing.py)
+        """
+        stems = _BatchStems(self.stemmer.stem_word)
+        return [' '.join(map(stems.__getitem__, tokens)) for tokens in self.tokenize(texts, lowercase)]
+
+def from_stopword_remover(stopword, stemmer) -> BatchNormalizer:
+    """Dari StopWordRemover Sastrawi (ArrayDictionary / stem_cache.SetDictionary) + StemCache"""
+    return BatchNormalizer(stopword.get_dictionary().words, stemmer)
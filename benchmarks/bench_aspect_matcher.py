@@ -0,0 +1,60 @@
+import sys
+import time
+from pathlib import Path
+import pandas as pd
+
+# ==========================================
+# KONFIGURASI PATH
+# ==========================================
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import aspect_matcher
+import config
+import ml_core
+
+TEST_PATH = config.DATA_DIR / "test" / "data_test_20.csv"
+REPEAT = 20
+
+def legacy_detect_aspects(original_lower: str, clean_text: str) -> dict:
+    """Loop lama di services.process_product_reviews (substring scan per keyword)"""
+    detected = {}
+    for aspect, keywords in config.ASPECT_KEYWORDS.items():
+        matched_words = [k for k in keywords if k in original_lower or k in clean_text]
+        if matched_words:
+            detected[aspect] = matched_words
+    return detected
+
+def bench(fn, pairs):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        for original_lower, clean_text in pairs:
+            fn(original_lower, clean_text)
+    return (time.perf_counter() - start) / (REPEAT * len(pairs))
+
+print("--- BENCHMARK ASPECT MATCHER (robust_data/test) ---")
+
+ml_core.load_ml_assets()
+reviews = pd.read_csv(TEST_PATH)["Review"].fillna("").astype(str).tolist()
+pairs = [(text.lower(), ml_core.preprocess_text(text)) for text in reviews]
+
+matcher = aspect_matcher.get_matcher()
+legacy_us = bench(legacy_detect_aspects, pairs) * 1e6
+compiled_us = bench(matcher.match, pairs) * 1e6
+
+# Perbedaan hasil berasal dari batas kata: loop lama juga mencocokkan substring
+# (mis. "ram" di "ramah", "jam" di "jaminan")
+different = [
+    (original_lower, legacy_detect_aspects(original_lower, clean_text), matcher.match(original_lower, clean_text))
+    for original_lower, clean_text in pairs
+    if legacy_detect_aspects(original_lower, clean_text) != matcher.match(original_lower, clean_text)
+]
+
+print(f"Jumlah ulasan         : {len(pairs)}")
+print(f"Loop lama             : {legacy_us:8.1f} µs/ulasan")
+print(f"Matcher terkompilasi  : {compiled_us:8.1f} µs/ulasan")
+print(f"Speedup               : {legacy_us / compiled_us:8.2f}x")
+print(f"Hasil berbeda         : {len(different)} ulasan (efek batas kata)")
+for original_lower, legacy, compiled in different[:5]:
+    print(f"  - {original_lower[:60]!r}\n    lama: {legacy}\n    baru: {compiled}")
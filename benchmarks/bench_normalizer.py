@@ -0,0 +1,102 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+import pandas as pd
+
+# ==========================================
+# KONFIGURASI PATH
+# ==========================================
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import config
+import ml_core
+
+DATASET_PATH = config.DATA_DIR / "dataset" / "trimmed_sentiment_dataset.csv"
+RESULTS_DIR = SCRIPT_DIR / "results"
+
+def legacy_serving(texts, assets):
+    """Jalur lama predict_batch: preprocess_text per ulasan"""
+    return [ml_core.preprocess_text(text, assets) for text in texts]
+
+def legacy_training(texts, assets):
+    """Jalur lama src/utils/preprocessing.py: stopword.remove lalu stemmer.stem per baris"""
+    return [assets.stemmer.stem(assets.stopword.remove(text)) for text in texts]
+
+def reviews_per_second(fn, texts, batch_size: int, min_seconds: float) -> float:
+    batches = [texts[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+    reviews = 0
+    start = time.perf_counter()
+    while True:
+        for batch in batches:
+            fn(batch)
+        reviews += len(texts)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return reviews / elapsed
+
+def main(args):
+    print("--- BENCHMARK BATCH NORMALIZER vs preprocess_text ---")
+    assets = ml_core.load_assets()
+    normalizer = assets.normalizer
+    df = pd.read_csv(DATASET_PATH)
+
+    modes = {
+        # nama: (kolom dataset, fungsi lama, fungsi batch)
+        "serving": ("Review", legacy_serving, lambda texts: normalizer.normalize(texts)),
+        "training": ("Cleaned_Review", legacy_training, lambda texts: normalizer.normalize(texts, lowercase=False)),
+    }
+
+    # 1. Parity: seluruh dataset, hasil harus sama persis per ulasan
+    parity = {}
+    for mode, (column, legacy_fn, batch_fn) in modes.items():
+        texts = df[column].fillna("").astype(str).tolist()
+        expected = legacy_fn(texts, assets)
+        actual = batch_fn(texts)
+        mismatches = [(text, old, new) for text, old, new in zip(texts, expected, actual) if old != new]
+        parity[mode] = {"reviews": len(texts), "mismatches": len(mismatches)}
+        if mismatches:
+            text, old, new = mismatches[0]
+            print(f"❌ PARITY GAGAL ({mode}): {len(mismatches)} ulasan berbeda, contoh {text[:60]!r}\n"
+                  f"   lama: {old[:80]!r}\n   baru: {new[:80]!r}")
+            sys.exit(1)
+        print(f"✅ Parity OK ({mode}): {len(texts)} ulasan {column}, hasil identik")
+
+    # 2. Throughput per ukuran batch (cache stem sudah hangat dari parity check)
+    rows = []
+    print(f"{'mode':>9} {'batch':>6} {'lama ulasan/s':>14} {'batch ulasan/s':>15} {'speedup':>8}")
+    for mode, (column, legacy_fn, batch_fn) in modes.items():
+        texts = df[column].fillna("").astype(str).tolist()
+        for batch_size in args.batch_sizes:
+            batch_size = batch_size or len(texts)
+            legacy_rate = reviews_per_second(lambda batch: legacy_fn(batch, assets), texts, batch_size, args.min_seconds)
+            batch_rate = reviews_per_second(batch_fn, texts, batch_size, args.min_seconds)
+            rows.append({
+                "mode": mode,
+                "batch_size": batch_size,
+                "legacy_reviews_per_second": round(legacy_rate, 1),
+                "batch_reviews_per_second": round(batch_rate, 1),
+                "speedup": round(batch_rate / legacy_rate, 2),
+            })
+            print(f"{mode:>9} {batch_size:>6} {legacy_rate:>14.0f} {batch_rate:>15.0f} {batch_rate / legacy_rate:>7.2f}x")
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"normalizer_{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "asset_source": assets.source,
+        "parity": parity,
+        "throughput": rows,
+    }, indent=2))
+    print(f"💾 Hasil disimpan ke {output}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parity & throughput BatchNormalizer terhadap preprocess_text per ulasan")
+    parser.add_argument("--batch-sizes", type=lambda value: [int(part) for part in value.split(",")],
+                        default=[1, 32, 512, 0], help="0 = seluruh dataset dalam satu batch")
+    parser.add_argument("--min-seconds", type=float, default=1.0, help="durasi minimal pengukuran per batch")
+    parser.add_argument("--output", help="path file JSON hasil")
+    main(parser.parse_args())
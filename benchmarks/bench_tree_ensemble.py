@@ -0,0 +1,85 @@
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+import joblib
+import pandas as pd
+import scipy.sparse as sp
+
+# ==========================================
+# KONFIGURASI PATH
+# ==========================================
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import config
+import lean_predictor
+import tree_ensemble
+
+TEST_PATH = config.DATA_DIR / "test" / "data_test_20.csv"
+RESULTS_DIR = SCRIPT_DIR / "results"
+
+def import_seconds(statement: str) -> float:
+    """Lama import di proses Python baru (cold, tanpa modul yang sudah termuat)"""
+    code = f"import time; start = time.perf_counter(); {statement}; print(time.perf_counter() - start)"
+    output = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+def time_per_call(fn, X, min_seconds: float) -> float:
+    fn(X)
+    runs = 0
+    start = time.perf_counter()
+    while True:
+        fn(X)
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds and runs >= 3:
+            return elapsed / runs
+
+def main(args):
+    print("--- BENCHMARK EVALUATOR POHON: XGBoost vs NumPy ---")
+    predictor, _ = lean_predictor.load_predictor(config.LEAN_PREDICTOR_PATH)
+    ensemble, _ = tree_ensemble.load_ensemble(config.TREE_ENSEMBLE_PATH)
+    vectorizer = joblib.load(config.VECTORIZER_PATH)
+
+    texts = pd.read_csv(TEST_PATH)["Cleaned_Review"].fillna("").astype(str).tolist()
+    base = vectorizer.transform(texts).tocsr()
+
+    imports = {
+        "xgboost": round(import_seconds("import xgboost"), 4),
+        "numpy_scipy": round(import_seconds("import numpy, scipy.sparse"), 4),
+        "tree_ensemble": round(import_seconds("import tree_ensemble"), 4),
+    }
+    print(f"⏱️ Import (proses baru): {imports}")
+
+    rows = []
+    print(f"{'batch':>7} {'xgboost ms':>11} {'numpy ms':>10} {'rasio':>7}")
+    for batch_size in args.batch_sizes:
+        # baris uji diulang sampai ukuran batch tercapai
+        repeats = -(-batch_size // base.shape[0])
+        X = sp.vstack([base] * repeats, format="csr")[:batch_size]
+        xgb_seconds = time_per_call(predictor.predict_proba, X, args.min_seconds)
+        numpy_seconds = time_per_call(ensemble.predict_proba, X, args.min_seconds)
+        rows.append({
+            "batch_size": batch_size,
+            "xgboost_ms": round(xgb_seconds * 1000, 4),
+            "numpy_ms": round(numpy_seconds * 1000, 4),
+            "numpy_over_xgboost": round(numpy_seconds / xgb_seconds, 3),
+        })
+        print(f"{batch_size:>7} {xgb_seconds * 1000:>11.3f} {numpy_seconds * 1000:>10.3f} {numpy_seconds / xgb_seconds:>7.2f}")
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"tree_ensemble_{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({"created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "imports": imports, "batches": rows}, indent=2))
+    print(f"💾 Hasil disimpan ke {output}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="predict_proba XGBoost (inplace_predict) vs evaluator NumPy")
+    parser.add_argument("--batch-sizes", type=lambda value: [int(part) for part in value.split(",")],
+                        default=[1, 10, 100, 1000, 10000])
+    parser.add_argument("--min-seconds", type=float, default=0.5, help="durasi minimal pengukuran per batch")
+    parser.add_argument("--output", help="path file JSON hasil")
+    main(parser.parse_args())
@@ -0,0 +1,292 @@
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+import pandas as pd
+
+# ==========================================
+# KONFIGURASI PATH
+# ==========================================
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+TEST_PATH = PROJECT_ROOT / "robust_data" / "test" / "data_test_20.csv"
+RESULTS_DIR = SCRIPT_DIR / "results"
+
+# ==========================================
+# MODE SERVER: app + database in-memory
+# ==========================================
+
+def serve(args):
+    """Dijalankan di subprocess: memasang LocalPrisma lalu menjalankan main.app dengan uvicorn"""
+    sys.path.insert(0, str(SCRIPT_DIR))
+    import local_db
+
+    local_db.install(latency=args.db_latency_ms / 1000, remember_metrics=args.cache == "warm")
+
+    import uvicorn
+    import main
+    import review_cache
+
+    if args.cache == "cold":
+        # setiap ulasan diinferensi ulang: yang diukur adalah jalur scoring penuh
+        async def no_hits(keys):
+            return {}
+
+        review_cache.cache.get_many = no_hits
+
+    uvicorn.run(main.app, host="127.0.0.1", port=args.port, log_level="warning")
+
+# ==========================================
+# PAYLOAD
+# ==========================================
+
+def load_review_pool():
+    df = pd.read_csv(TEST_PATH)
+    reviews = df["Review"].dropna().astype(str)
+    urls = df["Source_URL"].dropna().astype(str).unique().tolist()
+    return reviews[reviews.str.strip() != ""].tolist(), urls
+
+def build_payload(rng: random.Random, reviews, urls, candidates: int, reviews_per_candidate: int, request_no: int):
+    payload_candidates = []
+    for i in range(candidates):
+        url = urls[(request_no * candidates + i) % len(urls)]
+        payload_candidates.append({
+            "name": f"Laptop Benchmark {i} {url.rsplit('/', 2)[-2][:40]}",
+            "url": f"{url}?bench={i}",
+            # sampling dengan pengembalian agar reviews_per_candidate boleh > jumlah data uji
+            "reviews": [rng.choice(reviews) for _ in range(reviews_per_candidate)],
+        })
+    return {"user_email": "loadtest@example.com", "candidates": payload_candidates}
+
+# ==========================================
+# DRIVER
+# ==========================================
+
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+async def run_scenario(client, payloads, concurrency: int, retry_rejected: int = 0):
+    latencies = []
+    errors = {}
+    rejections = {}
+    queue = iter(payloads)
+
+    async def send(payload):
+        # retry_rejected: client sopan yang menunggu Retry-After lalu mengirim ulang 429/503
+        for attempt in range(retry_rejected + 1):
+            try:
+                response = await client.post("/recommend", json=payload)
+            except Exception as e:
+                return type(e).__name__
+            retry_after = response.headers.get("Retry-After")
+            if response.status_code not in (429, 503) or retry_after is None or attempt == retry_rejected:
+                return response.status_code
+            rejections[str(response.status_code)] = rejections.get(str(response.status_code), 0) + 1
+            await asyncio.sleep(float(retry_after))
+
+    async def worker():
+        for payload in queue:
+            start = time.perf_counter()
+            status = await send(payload)
+            elapsed = time.perf_counter() - start
+            if status == 200:
+                latencies.append(elapsed)
+            else:
+                errors[str(status)] = errors.get(str(status), 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, rejections, time.perf_counter() - start
+
+async def drive(args, base_url: str):
+    import httpx
+
+    reviews, urls = load_review_pool()
+    rng = random.Random(args.seed)
+    scenarios = []
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout) as client:
+        for candidates, reviews_per_candidate, concurrency in itertools.product(
+            args.candidates, args.reviews, args.concurrency
+        ):
+            total = args.warmup + args.requests
+            payloads = [
+                build_payload(rng, reviews, urls, candidates, reviews_per_candidate, n) for n in range(total)
+            ]
+            if args.warmup:
+                await run_scenario(client, payloads[:args.warmup], min(concurrency, args.warmup))
+
+            latencies, errors, rejections, duration = await run_scenario(
+                client, payloads[args.warmup:], concurrency, args.retry_rejected
+            )
+            latencies.sort()
+            ok = len(latencies)
+            # goodput: respons sukses yang selesai dalam SLO (respons lambat sama saja dengan gagal bagi user)
+            within_slo = sum(1 for latency in latencies if latency * 1000 <= args.slo_ms)
+            scenario = {
+                "candidates": candidates,
+                "reviews_per_candidate": reviews_per_candidate,
+                "concurrency": concurrency,
+                "requests": args.requests,
+                "ok": ok,
+                "errors": errors,
+                "retried_rejections": rejections,
+                "duration_s": round(duration, 4),
+                "throughput_rps": round(ok / duration, 3) if duration else 0.0,
+                "slo_ms": args.slo_ms,
+                "goodput_rps": round(within_slo / duration, 3) if duration else 0.0,
+                "reviews_per_second": round(ok * candidates * reviews_per_candidate / duration, 1) if duration else 0.0,
+                "latency_ms": {
+                    "p50": round(percentile(latencies, 50) * 1000, 2),
+                    "p95": round(percentile(latencies, 95) * 1000, 2),
+                    "p99": round(percentile(latencies, 99) * 1000, 2),
+                    "mean": round(sum(latencies) / ok * 1000, 2) if ok else 0.0,
+                    "max": round(latencies[-1] * 1000, 2) if ok else 0.0,
+                },
+            }
+            scenarios.append(scenario)
+            print(
+                f"  kandidat={candidates:<3} ulasan={reviews_per_candidate:<5} concurrency={concurrency:<3} "
+                f"{scenario['throughput_rps']:>8.2f} req/s  goodput={scenario['goodput_rps']:>7.2f}  "
+                f"{scenario['reviews_per_second']:>9.1f} ulasan/s  "
+                f"p50={scenario['latency_ms']['p50']:>8.1f}ms p95={scenario['latency_ms']['p95']:>8.1f}ms "
+                f"p99={scenario['latency_ms']['p99']:>8.1f}ms  error={sum(errors.values())}"
+            )
+
+        server_stats = {
+            "inference": (await client.get("/inference/stats")).json(),
+            "cache": (await client.get("/cache/stats")).json(),
+            "admission": (await client.get("/admission/stats")).json(),
+        }
+    return scenarios, server_stats
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_until_ready(base_url: str, server: subprocess.Popen, timeout: float):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server berhenti saat startup (exit code {server.returncode})")
+        try:
+            if httpx.get(f"{base_url}/readyz", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise TimeoutError(f"Server belum siap setelah {timeout:.0f} detik")
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main(args):
+    port = args.port or free_port()
+    base_url = f"http://127.0.0.1:{port}"
+
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as tmp_dir:
+        # cache & antrean job benchmark dipisah dari milik server development
+        env = dict(
+            os.environ,
+            REVIEW_CACHE_PATH=str(Path(tmp_dir) / "review_predictions.sqlite3"),
+            JOB_QUEUE_PATH=str(Path(tmp_dir) / "jobs.sqlite3"),
+        )
+        command = [
+            sys.executable, str(Path(__file__).resolve()), "--serve",
+            "--port", str(port), "--cache", args.cache, "--db-latency-ms", str(args.db_latency_ms),
+        ]
+        print(f"⏳ Menyalakan server benchmark di {base_url} (cache={args.cache}, db_latency={args.db_latency_ms}ms)...")
+        server = subprocess.Popen(command, cwd=PROJECT_ROOT, env=env)
+        try:
+            wait_until_ready(base_url, server, args.startup_timeout)
+            print("✅ Server siap, mulai load test")
+            scenarios, server_stats = asyncio.run(drive(args, base_url))
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    result = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": {
+            "cache": args.cache,
+            "db_latency_ms": args.db_latency_ms,
+            "seed": args.seed,
+            "warmup_requests": args.warmup,
+            "server_env": {
+                name: os.environ[name]
+                for name in (
+                    "INFERENCE_WORKERS", "MAX_CONCURRENT_CANDIDATES",
+                    "INFERENCE_BATCH_WINDOW_MS", "INFERENCE_BATCH_MAX_ROWS", "USE_SERVING_BUNDLE",
+                    "ADMISSION_MAX_PENDING_REVIEWS", "ADMISSION_MAX_QUEUED_REVIEWS", "ADMISSION_MAX_WAIT_SECONDS",
+                )
+                if name in os.environ
+            },
+        },
+        "scenarios": scenarios,
+        "server_stats": server_stats,
+    }
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"load_test_{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    print(f"💾 Hasil disimpan ke {output}")
+
+def int_list(value: str):
+    return [int(part) for part in value.split(",") if part.strip()]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test end-to-end POST /recommend dengan database in-memory")
+    parser.add_argument("--candidates", type=int_list, default=[1, 3], help="daftar jumlah kandidat, mis. 1,3,5")
+    parser.add_argument("--reviews", type=int_list, default=[20, 100], help="daftar jumlah ulasan per kandidat")
+    parser.add_argument("--concurrency", type=int_list, default=[1, 8], help="daftar jumlah client paralel")
+    parser.add_argument("--requests", type=int, default=40, help="request terukur per skenario")
+    parser.add_argument("--warmup", type=int, default=2, help="request pemanasan per skenario (tidak diukur)")
+    parser.add_argument("--cache", choices=["cold", "warm"], default="cold",
+                        help="cold: cache ulasan & fingerprint dimatikan; warm: perilaku produksi")
+    parser.add_argument("--db-latency-ms", type=float, default=1.0, help="jeda per query database in-memory")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=300.0, help="timeout per request (detik)")
+    parser.add_argument("--retry-rejected", type=int, default=0,
+                        help="berapa kali request 429/503 dikirim ulang setelah menunggu Retry-After")
+    parser.add_argument("--slo-ms", type=float, default=2000.0, help="batas latensi untuk menghitung goodput")
+    parser.add_argument("--startup-timeout", type=float, default=180.0)
+    parser.add_argument("--output", help="path file JSON hasil (default: benchmarks/results/load_test_<waktu>.json)")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+    else:
+        main(args)
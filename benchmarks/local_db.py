@@ -0,0 +1,216 @@
+"""Pengganti database in-memory untuk benchmark: subset API prisma-client-py yang dipakai
+main.py, services.py dan ref_cache.py. Dipasang dengan install() SEBELUM main diimpor.
+"""
+import asyncio
+import itertools
+from types import SimpleNamespace
+
+MODEL_NAME = "Model XGBoost (Baseline)"
+
+def _unwrap_json(value):
+    # prisma.Json membungkus nilai di atribut .data; saat dibaca Prisma mengembalikan dict biasa
+    return getattr(value, "data", value)
+
+class _Table:
+    def __init__(self, db):
+        self.db = db
+
+class _Models(_Table):
+    async def find_many(self, where=None, order=None):
+        # hanya query registry model: baris aktif
+        model = self.db.active_model
+        return [model] if model.isActive == (where or {}).get("isActive", model.isActive) else []
+
+class _Users(_Table):
+    async def find_unique(self, where):
+        email = where["email"]
+        if email not in self.db.users:
+            self.db.users[email] = SimpleNamespace(id=len(self.db.users) + 1, email=email)
+        return self.db.users[email]
+
+class _Brands(_Table):
+    async def upsert(self, where, data):
+        name = where["name"]
+        if name not in self.db.brands:
+            self.db.brands[name] = SimpleNamespace(brandId=len(self.db.brands) + 1, name=name)
+        return self.db.brands[name]
+
+class _Products(_Table):
+    async def find_unique(self, where):
+        return self.db.products.get(where["url"])
+
+    async def upsert(self, where, data):
+        url = where["url"]
+        if url not in self.db.products:
+            self.db.products[url] = SimpleNamespace(productId=next(self.db.ids), **data["create"])
+        return self.db.products[url]
+
+class _Metrics(_Table):
+    async def find_first(self, where, order=None):
+        # hanya query fingerprint check: Metric terbaru per produk (order createdAt/metricId desc)
+        if not self.db.remember_metrics:
+            return None
+        for metric in self.db.metrics.get(where["productId"], []):
+            if all(getattr(metric, key) == value for key, value in where.items()):
+                return metric
+        return None
+
+class _Transaction:
+    """prisma.tx(): tulisan dikumpulkan lalu diterapkan saat commit (dibuang jika blok gagal).
+
+    SELECT ... FOR UPDATE pada Product memegang kunci per produk sampai transaksi selesai.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.ops = []
+        self.locks = []
+        self.review = SimpleNamespace(
+            delete_many=self._recorder("delete_reviews"),
+            create_many=self._recorder("create_reviews"),
+        )
+        self.analysis = SimpleNamespace(create=self._recorder("create_analysis"))
+
+    def _recorder(self, op):
+        async def record(where=None, data=None, skip_duplicates=False):
+            await asyncio.sleep(self.db.latency)
+            self.ops.append((op, where if data is None else data))
+
+        return record
+
+    async def query_raw(self, query, product_ids):
+        if "FOR UPDATE" in query:
+            for product_id in sorted(set(product_ids)):
+                lock = self.db.product_locks.setdefault(product_id, asyncio.Lock())
+                await lock.acquire()
+                self.locks.append(lock)
+        return await self.db.query_raw(query, product_ids)
+
+    async def __aenter__(self):
+        # BEGIN
+        await asyncio.sleep(self.db.latency)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            # COMMIT / ROLLBACK
+            await asyncio.sleep(self.db.latency)
+            if exc_type is None:
+                for op, payload in self.ops:
+                    getattr(self.db, f"_apply_{op}")(payload)
+        finally:
+            for lock in self.locks:
+                lock.release()
+        return False
+
+class LocalPrisma:
+    """Stand-in untuk connection.prisma.
+
+    latency: jeda (detik) per query untuk meniru round-trip ke Postgres.
+    remember_metrics=False mematikan jalur fingerprint (setiap request dianalisis ulang).
+    """
+
+    def __init__(self, latency: float = 0.0, remember_metrics: bool = True):
+        self.latency = latency
+        self.remember_metrics = remember_metrics
+        self.ids = itertools.count(1)
+        self._connected = False
+
+        self.active_model = SimpleNamespace(
+            modelId=1, modelName=MODEL_NAME, isActive=True, version=None, artifactPath=None
+        )
+        self.users = {}
+        self.brands = {}
+        self.products = {}
+        self.reviews = {}
+        self.product_locks = {}
+        # productId -> Metric terbaru lebih dulu, seperti tabel Metric yang diurutkan createdAt desc
+        self.metrics = {}
+        self.analyses = 0
+
+        self._tables = {
+            "model": _Models(self),
+            "user": _Users(self),
+            "brand": _Brands(self),
+            "product": _Products(self),
+            "metric": _Metrics(self),
+        }
+
+    def __getattr__(self, name):
+        tables = self.__dict__.get("_tables", {})
+        if name not in tables:
+            raise AttributeError(name)
+        return _Delayed(tables[name], self)
+
+    async def connect(self):
+        self._connected = True
+
+    async def disconnect(self):
+        self._connected = False
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    def tx(self):
+        return _Transaction(self)
+
+    async def query_raw(self, query, product_ids):
+        # hanya query plan_review_sync (kunci Product + baca ulasan) yang dipakai aplikasi
+        await asyncio.sleep(self.latency)
+        if '"Review"' not in query:
+            return [{"productId": product_id} for product_id in product_ids if product_id in self.product_ids]
+        return [
+            {
+                "productId": product_id,
+                "contentHash": content_hash,
+                "modelId": review["modelId"],
+                "analysisVersion": review.get("analysisVersion"),
+            }
+            for product_id in product_ids
+            for content_hash, review in self.reviews.get(product_id, {}).items()
+        ]
+
+    @property
+    def product_ids(self):
+        return {product.productId for product in self.products.values()}
+
+    def _apply_delete_reviews(self, where):
+        for clause in where["OR"]:
+            stored = self.reviews.get(clause["productId"], {})
+            for content_hash in clause["contentHash"]["in"]:
+                stored.pop(content_hash, None)
+
+    def _apply_create_reviews(self, data):
+        for review in data:
+            self.reviews.setdefault(review["productId"], {}).setdefault(review["contentHash"], review)
+
+    def _apply_create_analysis(self, data):
+        self.analyses += 1
+        for metric in data["metric"]["create"]:
+            stored = SimpleNamespace(
+                metricId=next(self.ids), **{key: _unwrap_json(value) for key, value in metric.items()}
+            )
+            self.metrics.setdefault(metric["productId"], []).insert(0, stored)
+
+class _Delayed:
+    """Membungkus method tabel dengan jeda latency per query"""
+
+    def __init__(self, table, db):
+        self._table = table
+        self._db = db
+
+    def __getattr__(self, name):
+        method = getattr(self._table, name)
+
+        async def call(*args, **kwargs):
+            await asyncio.sleep(self._db.latency)
+            return await method(*args, **kwargs)
+
+        return call
+
+def install(latency: float = 0.0, remember_metrics: bool = True) -> LocalPrisma:
+    """Mengganti connection.prisma; harus dipanggil sebelum main/services/ref_cache diimpor"""
+    import connection
+
+    connection.prisma = LocalPrisma(latency=latency, remember_metrics=remember_metrics)
+    return connection.prisma
@@ -0,0 +1,116 @@
+import argparse
+import asyncio
+import json
+import multiprocessing.forkserver
+import sys
+import time
+from pathlib import Path
+import pandas as pd
+
+# ==========================================
+# KONFIGURASI PATH
+# ==========================================
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import config
+import inference
+import ml_core
+
+TEST_PATH = config.DATA_DIR / "test" / "data_test_20.csv"
+RESULTS_DIR = SCRIPT_DIR / "results"
+
+def read_memory(pid: int) -> dict:
+    """Sama dengan ml_core.memory_usage() tetapi untuk pid lain"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1])
+    return {
+        "rss_kb": fields.get("Rss", 0),
+        "pss_kb": fields.get("Pss", 0),
+        "uss_kb": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+        "shared_kb": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+    }
+
+async def measure(mode: str, workers: int, texts, rounds: int) -> dict:
+    config.INFERENCE_START_METHOD = mode
+    config.INFERENCE_WORKERS = workers
+
+    start = time.perf_counter()
+    serving = inference.ServingModel(inference.ModelSpec(0, "benchmark", ml_core.get_model_version()))
+    if not await serving.start():
+        raise RuntimeError(serving.error)
+    startup_seconds = time.perf_counter() - start
+
+    # setiap worker menjalankan inferensi sungguhan sebelum diukur (halaman yang disentuh
+    # saat prediksi ikut tersalin jika memang tidak bisa dibagi)
+    worker_stats = {}
+    for _ in range(rounds):
+        jobs = [serving.run(ml_core.predict_batch_job, texts) for _ in range(workers * 2)]
+        for _, stats in await asyncio.gather(*jobs):
+            worker_stats[stats["pid"]] = stats
+
+    report = {
+        "mode": mode,
+        "workers": workers,
+        "startup_seconds": round(startup_seconds, 3),
+        "worker_memory": {pid: read_memory(pid) for pid in sorted(worker_stats)},
+        "asset_source": sorted({stats["asset_source"] for stats in worker_stats.values()}),
+    }
+
+    # forkserver memegang salinan induk yang dibagi ke worker; dihitung ke total PSS
+    forkserver_pid = getattr(multiprocessing.forkserver._forkserver, "_forkserver_pid", None)
+    if mode == "forkserver" and forkserver_pid:
+        report["forkserver_memory"] = read_memory(forkserver_pid)
+
+    serving.shutdown()
+
+    worker_memory = list(report["worker_memory"].values())
+    report["total_worker_uss_kb"] = sum(memory["uss_kb"] for memory in worker_memory)
+    report["total_worker_rss_kb"] = sum(memory["rss_kb"] for memory in worker_memory)
+    report["total_pss_kb"] = sum(memory["pss_kb"] for memory in worker_memory) + report.get(
+        "forkserver_memory", {}
+    ).get("pss_kb", 0)
+    return report
+
+def print_report(report: dict):
+    print(f"\n=== {report['mode']} ({report['workers']} worker, startup {report['startup_seconds']:.2f} detik) ===")
+    print(f"{'pid':>8} {'RSS MB':>9} {'PSS MB':>9} {'USS MB':>9} {'shared MB':>10}")
+    rows = list(report["worker_memory"].items())
+    if "forkserver_memory" in report:
+        rows.append(("fsrv", report["forkserver_memory"]))
+    for pid, memory in rows:
+        print(
+            f"{pid:>8} {memory['rss_kb'] / 1024:>9.1f} {memory['pss_kb'] / 1024:>9.1f} "
+            f"{memory['uss_kb'] / 1024:>9.1f} {memory['shared_kb'] / 1024:>10.1f}"
+        )
+    print(
+        f"Total USS worker: {report['total_worker_uss_kb'] / 1024:.1f} MB | "
+        f"Total PSS (worker + forkserver): {report['total_pss_kb'] / 1024:.1f} MB"
+    )
+
+async def main(args):
+    texts = pd.read_csv(TEST_PATH)["Review"].dropna().astype(str).tolist()[:args.batch]
+    reports = []
+    for mode in args.modes:
+        report = await measure(mode, args.workers, texts, args.rounds)
+        print_report(report)
+        reports.append(report)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"memory_report_{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({"created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "reports": reports}, indent=2))
+    print(f"\n💾 Hasil disimpan ke {output}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memori unik (USS) per worker inferensi: spawn vs forkserver")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--modes", nargs="+", default=["spawn", "forkserver"], choices=["spawn", "forkserver"])
+    parser.add_argument("--batch", type=int, default=300, help="ulasan per batch prediksi")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--output", help="path file JSON hasil")
+    asyncio.run(main(parser.parse_args()))
@@ -1,9 +1,15 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / "robust_data"
 MODEL_DIR = BASE_DIR / "models"
 TOKENIZE_DIR = DATA_DIR / "tokenize"
+CACHE_DIR = BASE_DIR / "cache"
+
+VECTORIZER_PATH = TOKENIZE_DIR / "vectorizer_tfidf.pkl"
+LABEL_ENCODER_PATH = TOKENIZE_DIR / "label_encoder.pkl"
+MODEL_PATH = MODEL_DIR / "final_pipeline_scenario3.pkl"
 
 ASPECT_KEYWORDS = {
     "performa": [
@@ -32,4 +38,93 @@ ASPECT_KEYWORDS = {
         "bonus", "hadiah", "freebie", "ongkir", "budget", "pelajar", 
         "kantong", "investasi", "padan", "sesuai harga"
     ],
-}
\ No newline at end of file
+}
+
+# Jumlah kandidat yang diproses bersamaan dalam satu request /recommend
+MAX_CONCURRENT_CANDIDATES = max(1, int(os.getenv("MAX_CONCURRENT_CANDIDATES", "4")))
+
+# Jumlah proses worker untuk inferensi (preprocessing + XGBoost).
+# 0 = inferensi dijalankan di thread pool proses utama (mode development).
+INFERENCE_WORKERS = max(0, int(os.getenv("INFERENCE_WORKERS", "2")))
+# Cara worker inferensi dibuat:
+# - "spawn": setiap worker memuat aset ML sendiri (memori x jumlah worker)
+# - "forkserver": aset dimuat sekali di proses forkserver, worker di-fork darinya dan
+#   berbagi halaman memori copy-on-write (hanya POSIX)
+INFERENCE_START_METHOD = os.getenv("INFERENCE_START_METHOD", "spawn")
+# Memuat aset ML saat main diimpor. Dipakai bersama `gunicorn --preload` + INFERENCE_WORKERS=0
+# agar beberapa worker server berbagi satu salinan model hasil fork dari master
+PRELOAD_ML_ASSETS = os.getenv("PRELOAD_ML_ASSETS", "0") == "1"
+
+# Micro-batching lintas request: ulasan dari request yang datang bersamaan
+# dikumpulkan selama jendela waktu ini (atau sampai batas baris) lalu diprediksi sekaligus
+INFERENCE_BATCH_WINDOW_MS = max(0.0, float(os.getenv("INFERENCE_BATCH_WINDOW_MS", "5")))
+INFERENCE_BATCH_MAX_ROWS = max(1, int(os.getenv("INFERENCE_BATCH_MAX_ROWS", "512")))
+
+# Cache prediksi per teks ulasan: tier memori (LRU) + tier disk (SQLite)
+REVIEW_CACHE_PATH = Path(os.getenv("REVIEW_CACHE_PATH", str(CACHE_DIR / "review_predictions.sqlite3")))
+REVIEW_CACHE_MEMORY_ITEMS = max(0, int(os.getenv("REVIEW_CACHE_MEMORY_ITEMS", "50000")))
+# Batas baris tier disk (0 = tanpa batas); baris yang paling lama ditulis dibuang lebih dulu
+REVIEW_CACHE_DISK_MAX_ROWS = max(0, int(os.getenv("REVIEW_CACHE_DISK_MAX_ROWS", "1000000")))
+
+# Cache stemming per kata: kamus hasil build offline + LRU runtime untuk kata baru
+STEM_DICT_PATH = TOKENIZE_DIR / "stem_dictionary.json"
+STEM_CACHE_SIZE = max(0, int(os.getenv("STEM_CACHE_SIZE", "100000")))
+
+# Serving bundle (src/export/build_bundle.py): direktori berversi tanpa pickle (tabel vocabulary,
+# idf & kolom selector .npy, booster UBJSON, manifest + sha256) yang dimuat dengan mmap sehingga
+# halamannya dibagi antar proses. Jika tidak ada / rusak, ml_core kembali memuat pickle.
+SERVING_BUNDLE_DIR = MODEL_DIR / "serving_bundle"
+USE_SERVING_BUNDLE = os.getenv("USE_SERVING_BUNDLE", "1") == "1"
+
+# Lean predictor (src/export/build_lean_predictor.py): indeks kolom chi2 + booster XGBoost mentah.
+# Dipakai jalur pickle menggantikan pipeline imblearn jika dibuat dari artefak yang sama.
+LEAN_PREDICTOR_PATH = MODEL_DIR / "lean_predictor.npz"
+
+# Narrow vectorizer (src/export/build_narrow_vectorizer.py): TF-IDF + SelectKBest dalam satu transform
+# yang langsung menghasilkan kolom terpilih. Jalur bundle membentuknya dari array bundle;
+# jalur pickle memakai file ini jika model yang dimuat lean predictor dari artefak yang sama.
+NARROW_VECTORIZER_PATH = MODEL_DIR / "narrow_vectorizer.npz"
+USE_NARROW_VECTORIZER = os.getenv("USE_NARROW_VECTORIZER", "1") == "1"
+
+# Evaluator pohon saat serving:
+# - "xgboost": booster XGBoost (inplace_predict)
+# - "numpy": booster dikompilasi ke array NumPy (src/export/build_tree_ensemble.py), serving
+#   jalur bundle tidak mengimpor xgboost maupun sklearn
+TREE_EVALUATOR = os.getenv("TREE_EVALUATOR", "xgboost")
+TREE_ENSEMBLE_PATH = MODEL_DIR / "tree_ensemble.npz"
+
+# Cache lookup referensi (baris Model & id Brand) lintas request
+REF_CACHE_TTL_SECONDS = max(0.0, float(os.getenv("REF_CACHE_TTL_SECONDS", "60")))
+
+# Token untuk endpoint admin (header X-Admin-Token); kosong = endpoint admin nonaktif
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# Job analisis asinkron (POST /recommend/jobs): antrean SQLite lokal + worker di background
+JOB_QUEUE_PATH = Path(os.getenv("JOB_QUEUE_PATH", str(CACHE_DIR / "jobs.sqlite3")))
+JOB_WORKERS = max(1, int(os.getenv("JOB_WORKERS", "2")))
+# Batas job queued + running; di atas ini POST /recommend/jobs dijawab 429
+JOB_QUEUE_MAX_DEPTH = max(1, int(os.getenv("JOB_QUEUE_MAX_DEPTH", "100")))
+JOB_MAX_ATTEMPTS = max(1, int(os.getenv("JOB_MAX_ATTEMPTS", "3")))
+JOB_RETRY_BACKOFF_SECONDS = max(0.0, float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "2")))
+# Lease job yang sedang berjalan; diperpanjang heartbeat tiap 1/3 lease. Job running yang lease-nya
+# habis (proses pemiliknya mati) diklaim ulang oleh worker mana pun yang berbagi file antrean.
+JOB_LEASE_SECONDS = max(1.0, float(os.getenv("JOB_LEASE_SECONDS", "30")))
+# Job selesai/gagal dihapus dari antrean setelah umur ini
+JOB_RESULT_TTL_SECONDS = max(0.0, float(os.getenv("JOB_RESULT_TTL_SECONDS", "86400")))
+
+# Profiling per request (header X-Profile + token admin, atau di-arm lewat /admin/profiling)
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", str(CACHE_DIR / "profiles")))
+
+# Registry model: versi yang dilayani = baris Model aktif (isActive) dengan artifactPath terbaru.
+# Baris lama tanpa artifactPath dengan nama ini memakai artefak default di atas.
+DEFAULT_MODEL_NAME = "Model XGBoost (Baseline)"
+# Interval pengecekan baris Model aktif (detik); 0 = hanya saat startup & /admin/models/reload
+MODEL_REGISTRY_POLL_SECONDS = max(0.0, float(os.getenv("MODEL_REGISTRY_POLL_SECONDS", "30")))
+
+# Admission control /recommend: dihitung dari jumlah ulasan, bukan jumlah request.
+# Ulasan yang boleh diproses bersamaan; 0 = gate nonaktif
+ADMISSION_MAX_PENDING_REVIEWS = max(0, int(os.getenv("ADMISSION_MAX_PENDING_REVIEWS", "5000")))
+# Ulasan yang boleh menunggu di antrean gate; di atas ini request langsung dijawab 429
+ADMISSION_MAX_QUEUED_REVIEWS = max(0, int(os.getenv("ADMISSION_MAX_QUEUED_REVIEWS", "10000")))
+# Lama maksimal request menunggu di antrean sebelum dijawab 503
+ADMISSION_MAX_WAIT_SECONDS = max(0.0, float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "2")))
@@ -0,0 +1,397 @@
+import asyncio
+import functools
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+import config
+import metrics
+import ml_core
+import profiling
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """Satu versi model di registry: baris Model + file artefaknya"""
+    model_id: int
+    model_name: str
+    version: str
+    # None = artefak default dari config (serving bundle / pickle)
+    artifact_path: Optional[str] = None
+
+# Versi yang sedang melayani request baru, dan versi yang sedang dimuat di background
+_current = None
+_loading = None
+_last_error = None
+
+def _init_worker(artifact_path=None):
+    """Dipanggil sekali di setiap proses worker saat pool menyala"""
+    # worker hasil fork dari forkserver sudah mewarisi aset yang dimuat inference_preload
+    if not ml_core.assets_loaded(artifact_path):
+        ml_core.load_ml_assets(artifact_path)
+
+def _worker_context():
+    # spawn & forkserver sama-sama tidak mewarisi state event loop proses API
+    if config.INFERENCE_START_METHOD == "forkserver" and "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        # forkserver mengimpor inference_preload (memuat aset sekali), lalu mem-fork setiap worker
+        context.set_forkserver_preload(["inference_preload"])
+        return context
+    if config.INFERENCE_START_METHOD != "spawn":
+        print(f"⚠️ INFERENCE_START_METHOD={config.INFERENCE_START_METHOD} tidak didukung, memakai spawn")
+    return multiprocessing.get_context("spawn")
+
+class MicroBatcher:
+    """Menggabungkan ulasan dari banyak pemanggil menjadi panggilan predict_batch.
+
+    Batch dikirim ketika jendela waktu habis atau jumlah baris mencapai batas. Setiap batch
+    paling banyak max_rows baris; antrean yang lebih besar dipecah menjadi beberapa batch yang
+    dikirim bersamaan ke pool worker, lalu setiap pemanggil menerima potongan hasilnya sendiri.
+    """
+
+    def __init__(self, serving: "ServingModel", window_ms: float, max_rows: int):
+        self.serving = serving
+        self.window = window_ms / 1000
+        self.max_rows = max_rows
+        self._pending = []
+        self._pending_rows = 0
+        self._timer = None
+        # task _dispatch yang masih berjalan -> batch-nya; referensi dipegang agar task tidak
+        # dibuang GC sebelum selesai, dan agar pemanggilnya bisa dibatalkan saat shutdown
+        self._tasks = {}
+        # batch yang sudah dikirim ke executor tetapi belum kembali
+        self.inflight_batches = 0
+        self.inflight_rows = 0
+
+        self.total_batches = 0
+        self.total_rows = 0
+        self.recent_sizes = deque(maxlen=1000)
+
+    async def predict(self, raw_texts):
+        if not raw_texts:
+            return [], [], []
+        if len(raw_texts) > self.max_rows:
+            # satu pemanggil besar dipecah agar tidak ada batch yang melebihi max_rows
+            parts = await asyncio.gather(*(
+                self.predict(raw_texts[start:start + self.max_rows])
+                for start in range(0, len(raw_texts), self.max_rows)
+            ))
+            return tuple([value for part in parts for value in part[column]] for column in range(3))
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((list(raw_texts), future))
+        self._pending_rows += len(raw_texts)
+
+        if self._pending_rows >= self.max_rows:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        pending = self._pending
+        self._pending, self._pending_rows = [], 0
+        for items, rows in self._chunks(pending):
+            self.total_batches += 1
+            self.total_rows += rows
+            self.recent_sizes.append(rows)
+            metrics.INFERENCE_BATCH_ROWS.observe(rows)
+            task = asyncio.ensure_future(self._dispatch(items))
+            self._tasks[task] = items
+            task.add_done_callback(self._forget_task)
+
+    def _chunks(self, pending):
+        """Mengelompokkan pemanggil (masing-masing <= max_rows baris) menjadi batch <= max_rows baris"""
+        items, rows = [], 0
+        for texts, future in pending:
+            if items and rows + len(texts) > self.max_rows:
+                yield items, rows
+                items, rows = [], 0
+            items.append((texts, future))
+            rows += len(texts)
+        if items:
+            yield items, rows
+
+    def _forget_task(self, task):
+        self._tasks.pop(task, None)
+
+    async def close(self):
+        """Dipanggil saat shutdown: batch yang belum dikirim maupun yang sedang diproses dibatalkan,
+        pemanggilnya menerima CancelledError alih-alih menunggu selamanya
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for _, future in self._pending:
+            future.cancel()
+        self._pending, self._pending_rows = [], 0
+
+        tasks = list(self._tasks.items())
+        for task, items in tasks:
+            # task yang belum sempat berjalan tidak pernah masuk ke _dispatch, jadi pemanggil dibatalkan di sini
+            task.cancel()
+            for _, future in items:
+                future.cancel()
+        await asyncio.gather(*(task for task, _ in tasks), return_exceptions=True)
+
+    async def _dispatch(self, items):
+        all_texts = [text for texts, _ in items for text in texts]
+        self.inflight_batches += 1
+        self.inflight_rows += len(all_texts)
+        try:
+            (clean_texts, labels, confidences), stats = await self.serving.run(ml_core.predict_batch_job, all_texts)
+            self.serving.worker_stats[stats["pid"]] = stats
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self.inflight_batches -= 1
+            self.inflight_rows -= len(all_texts)
+
+        for stage, seconds in stats["last_batch_seconds"].items():
+            metrics.STAGE_SECONDS.observe(seconds, stage=stage)
+
+        offset = 0
+        for texts, future in items:
+            end = offset + len(texts)
+            if not future.done():
+                future.set_result((clean_texts[offset:end], labels[offset:end], confidences[offset:end]))
+            offset = end
+
+    def pending_rows(self) -> int:
+        """Baris yang masih menunggu jendela batch ditambah baris yang sedang diproses executor"""
+        return self._pending_rows + self.inflight_rows
+
+    def stats(self) -> dict:
+        sizes = sorted(self.recent_sizes)
+        return {
+            "window_ms": self.window * 1000,
+            "max_rows": self.max_rows,
+            "total_batches": self.total_batches,
+            "total_rows": self.total_rows,
+            "mean_batch_rows": round(self.total_rows / self.total_batches, 2) if self.total_batches else 0,
+            "recent_p50_rows": sizes[len(sizes) // 2] if sizes else 0,
+            "recent_p95_rows": sizes[int(len(sizes) * 0.95)] if sizes else 0,
+            "recent_max_rows": sizes[-1] if sizes else 0,
+        }
+
+class ServingModel:
+    """Satu versi model beserta pool worker dan micro-batcher-nya sendiri.
+
+    Request memegang (acquire) satu ServingModel dari awal sampai akhir sehingga semua
+    ulasannya diprediksi oleh versi yang sama. Versi lama yang sudah diganti baru
+    dimatikan setelah request terakhir yang memegangnya selesai.
+    """
+
+    def __init__(self, spec: ModelSpec):
+        self.spec = spec
+        self.executor = None
+        # mode inline (INFERENCE_WORKERS=0): aset dipegang objek ini, bukan global ml_core
+        self.assets = None
+        self.batcher = MicroBatcher(self, config.INFERENCE_BATCH_WINDOW_MS, config.INFERENCE_BATCH_MAX_ROWS)
+        # Statistik terakhir dari setiap worker, dikirim balik bersama hasil prediksi
+        self.worker_stats = {}
+        self.ready = False
+        self.error = None
+        self.warmup_seconds = None
+        self.active_requests = 0
+        self.retired = False
+
+    async def start(self) -> bool:
+        """Menyalakan worker dan menunggu semuanya selesai memuat aset versi ini"""
+        start = time.perf_counter()
+        try:
+            # checksum bundle registry dihitung sekali di sini, bukan di setiap worker
+            await asyncio.to_thread(ml_core.verify_artifact, self.spec.artifact_path)
+            if config.INFERENCE_WORKERS == 0:
+                print(f"🧠 Inferensi model {self.spec.version} berjalan di proses utama (INFERENCE_WORKERS=0)")
+                if ml_core.assets_loaded(self.spec.artifact_path):
+                    # sudah dimuat inference_preload (gunicorn --preload)
+                    self.assets = ml_core.current_assets()
+                else:
+                    loop = asyncio.get_running_loop()
+                    self.assets = await loop.run_in_executor(None, ml_core.load_assets, self.spec.artifact_path)
+                reports = [ml_core.worker_stats(self.assets)]
+            else:
+                print(
+                    f"⏳ Menyalakan {config.INFERENCE_WORKERS} worker inferensi ({config.INFERENCE_START_METHOD}) "
+                    f"untuk model {self.spec.version}..."
+                )
+                self.executor = ProcessPoolExecutor(
+                    max_workers=config.INFERENCE_WORKERS,
+                    mp_context=_worker_context(),
+                    initializer=_init_worker,
+                    initargs=(self.spec.artifact_path,),
+                )
+                reports = await asyncio.gather(*(self.run(ml_core.worker_stats) for _ in range(config.INFERENCE_WORKERS)))
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            print(f"❌ Worker inferensi gagal menyala: {self.error}")
+            self.shutdown(wait=False)
+            return False
+
+        for report in reports:
+            self.worker_stats[report["pid"]] = report
+        self.warmup_seconds = time.perf_counter() - start
+        self.ready = True
+        print(f"✅ Worker inferensi siap dalam {self.warmup_seconds:.2f} detik (pid: {sorted(self.worker_stats)})")
+        return True
+
+    async def run(self, fn, *args, **kwargs):
+        """Menjalankan fungsi ml_core (yang menerima argumen assets) tanpa memblokir event loop"""
+        if self.executor is None:
+            kwargs["assets"] = self.assets
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+
+    async def predict(self, raw_texts):
+        """Prediksi sentimen lewat micro-batcher: (clean_texts, labels, confidences)"""
+        session = profiling.current()
+        if session is not None:
+            # request yang diprofil tidak ikut micro-batch agar profil worker hanya berisi ulasannya
+            (result, worker_profile), stats = await self.run(ml_core.predict_batch_profiled_job, list(raw_texts))
+            self.worker_stats[stats["pid"]] = stats
+            session.add_worker_profile(worker_profile)
+            return result
+        return await self.batcher.predict(raw_texts)
+
+    def acquire(self) -> "ServingModel":
+        self.active_requests += 1
+        return self
+
+    def release(self):
+        self.active_requests -= 1
+        if self.retired and self.active_requests == 0:
+            self.shutdown(wait=False)
+
+    def retire(self):
+        """Dipanggil saat versi ini diganti; worker dimatikan setelah request terakhirnya selesai"""
+        self.retired = True
+        if self.active_requests == 0:
+            self.shutdown(wait=False)
+
+    async def close(self):
+        """Shutdown server: hentikan micro-batcher dulu, baru pool worker"""
+        self.ready = False
+        await self.batcher.close()
+        self.shutdown(wait=True)
+
+    def shutdown(self, wait: bool = True):
+        self.ready = False
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait, cancel_futures=wait)
+            self.executor = None
+        self.assets = None
+
+    def readiness(self) -> dict:
+        return {
+            "model_id": self.spec.model_id,
+            "model_name": self.spec.model_name,
+            "version": self.spec.version,
+            "artifact_path": self.spec.artifact_path,
+            "ready": self.ready,
+            "error": self.error,
+            "warmup_seconds": round(self.warmup_seconds, 4) if self.warmup_seconds is not None else None,
+            "active_requests": self.active_requests,
+            "workers": [
+                {
+                    "pid": pid,
+                    "asset_source": stats["asset_source"],
+                    "load_times": stats["load_times"],
+                    "memory": stats["memory"],
+                }
+                for pid, stats in sorted(self.worker_stats.items())
+            ],
+        }
+
+def current() -> Optional[ServingModel]:
+    return _current
+
+async def activate(spec: ModelSpec) -> bool:
+    """Memuat versi baru di background lalu menukarnya secara atomik.
+
+    Request yang sudah berjalan tetap memakai versi lama sampai selesai; request baru
+    langsung memakai versi baru. Jika gagal dimuat, versi lama tetap melayani.
+    """
+    global _current, _loading, _last_error
+
+    serving = ServingModel(spec)
+    _loading = serving
+    try:
+        ok = await serving.start()
+    finally:
+        _loading = None
+
+    if not ok:
+        _last_error = serving.error
+        return False
+
+    previous, _current = _current, serving
+    _last_error = None
+    if previous is not None:
+        print(f"🔄 Model ditukar: {previous.spec.version} -> {spec.version}")
+        previous.retire()
+    return True
+
+@contextmanager
+def use_model():
+    """Memegang versi model aktif selama satu request"""
+    if _current is None or not _current.ready:
+        raise RuntimeError("Model ML tidak siap.")
+    serving = _current.acquire()
+    try:
+        yield serving
+    finally:
+        serving.release()
+
+def is_ready() -> bool:
+    return _current is not None and _current.ready
+
+def readiness() -> dict:
+    """Status inferensi + waktu muat aset per worker untuk /readyz"""
+    return {
+        "ready": is_ready(),
+        "error": _last_error,
+        "model": _current.readiness() if _current is not None else None,
+        "loading": _loading.spec.version if _loading is not None else None,
+    }
+
+def batching_stats() -> dict:
+    return _current.batcher.stats() if _current is not None else {}
+
+def pending_rows() -> int:
+    return _current.batcher.pending_rows() if _current is not None else 0
+
+def inflight_batches() -> int:
+    return _current.batcher.inflight_batches if _current is not None else 0
+
+def stem_cache_stats() -> dict:
+    """Gabungan statistik cache stem dari semua worker versi aktif yang pernah melapor"""
+    worker_stats = _current.worker_stats if _current is not None else {}
+    totals = {"prebuilt_hits": 0, "lru_hits": 0, "misses": 0}
+    for stats in worker_stats.values():
+        for name in totals:
+            totals[name] += stats["stem_cache"][name]
+
+    lookups = sum(totals.values())
+    totals["hit_rate"] = round((totals["prebuilt_hits"] + totals["lru_hits"]) / lookups, 4) if lookups else 0.0
+    totals["workers_reporting"] = len(worker_stats)
+    return totals
+
+async def shutdown():
+    global _current, _loading
+
+    for serving in (_current, _loading):
+        if serving is not None:
+            await serving.close()
+    _current = _loading = None
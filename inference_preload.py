@@ -0,0 +1,15 @@
+"""Memuat aset ML sekali di proses induk agar proses anak hasil fork berbagi memorinya.
+
+Diimpor oleh forkserver inferensi (INFERENCE_START_METHOD=forkserver) atau oleh main.py
+saat PRELOAD_ML_ASSETS=1 (gunicorn --preload). Objek yang sudah ada dipindah ke generasi
+permanen GC (gc.freeze) supaya siklus GC di proses anak tidak menulis ulang header objek
+dan memicu salinan halaman copy-on-write.
+"""
+import gc
+import ml_core
+
+if not ml_core.assets_loaded():
+    ml_core.load_ml_assets()
+    assets = ml_core.current_assets()
+    ml_core.install_assets(assets._replace(source=f"{assets.source}+preload"))
+gc.freeze()
@@ -0,0 +1,366 @@
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from typing import Awaitable, Callable, Dict, Optional, Set
+import config
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+FINISHED_STATUSES = (DONE, FAILED)
+
+_IDLE_POLL_SECONDS = 0.5
+
+class JobQueueFull(Exception):
+    """Antrean sudah mencapai JOB_QUEUE_MAX_DEPTH"""
+
+class PermanentJobError(Exception):
+    """Kegagalan yang tidak akan berubah jika diulang (mis. tidak ada ulasan valid)"""
+
+class JobQueue:
+    """Antrean job persisten di SQLite, diproses oleh sejumlah worker asyncio.
+
+    Klaim job memakai transaksi BEGIN IMMEDIATE sehingga aman juga jika beberapa
+    proses API berbagi file yang sama. Job yang diklaim dipegang dengan lease (owner +
+    lease_expires_at) yang diperpanjang heartbeat selama handler berjalan; hanya job
+    "running" yang lease-nya habis (proses pemiliknya mati) yang diklaim ulang, jadi
+    proses yang baru menyala tidak merebut job yang masih dikerjakan proses lain.
+    Semua akses SQLite dari sisi async berjalan di thread (asyncio.to_thread).
+    """
+
+    def __init__(self, db_path, workers: int, max_depth: int, max_attempts: int,
+                 retry_backoff: float, result_ttl: float, lease_seconds: float):
+        self.db_path = db_path
+        self.workers = workers
+        self.max_depth = max_depth
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.result_ttl = result_ttl
+        self.lease_seconds = lease_seconds
+        # identitas pemegang lease: unik per proses (dan per instance queue)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._conn = None
+        self._lock = threading.Lock()
+        self._tasks = []
+        self._wakeup = None
+        # job id -> event milik setiap waiter yang sedang long polling job tersebut
+        self._changed: Dict[str, Set[asyncio.Event]] = {}
+
+        # hasil depth() terakhir, untuk pembaca sinkron yang tidak boleh menyentuh SQLite (gauge /metrics)
+        self.last_depth = 0
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self.rejected = 0
+        self.reclaimed = 0
+        self.lost_leases = 0
+
+    def open(self):
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # isolation_level=None: transaksi diatur manual (BEGIN IMMEDIATE)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=5, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, payload TEXT NOT NULL, result TEXT, error TEXT, "
+            "attempts INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL, updated_at REAL NOT NULL, "
+            "run_after REAL NOT NULL, owner TEXT, lease_expires_at REAL)"
+        )
+        # file antrean dari versi sebelum lease
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, column_type in (("owner", "TEXT"), ("lease_expires_at", "REAL")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_run_after ON jobs (status, run_after)")
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def is_open(self) -> bool:
+        return self._conn is not None
+
+    # --- API sisi request ---
+
+    def _depth(self) -> int:
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+        ).fetchone()[0]
+
+    def depth(self) -> int:
+        with self._lock:
+            self.last_depth = self._depth()
+        return self.last_depth
+
+    async def depth_async(self) -> int:
+        return await asyncio.to_thread(self.depth)
+
+    def submit(self, payload: dict) -> dict:
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._depth() >= self.max_depth:
+                    self.rejected += 1
+                    raise JobQueueFull()
+                self._conn.execute(
+                    "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                    (*FINISHED_STATUSES, now - self.result_ttl),
+                )
+                self._conn.execute(
+                    "INSERT INTO jobs (id, status, payload, attempts, created_at, updated_at, run_after) "
+                    "VALUES (?, ?, ?, 0, ?, ?, ?)",
+                    (job_id, QUEUED, json.dumps(payload), now, now, now),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return {"job_id": job_id, "status": QUEUED}
+
+    async def submit_async(self, payload: dict) -> dict:
+        return await asyncio.to_thread(self.submit, payload)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status, result, error, attempts, created_at, updated_at FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        job_id, status, result, error, attempts, created_at, updated_at = row
+        return {
+            "job_id": job_id,
+            "status": status,
+            "attempts": attempts,
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "result": json.loads(result) if result else None,
+            "error": error,
+        }
+
+    async def get_async(self, job_id: str) -> Optional[dict]:
+        return await asyncio.to_thread(self.get, job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[dict]:
+        """Menunggu sampai job selesai/gagal atau timeout habis (long polling)"""
+        deadline = time.monotonic() + timeout
+        event = asyncio.Event()
+        waiters = self._changed.setdefault(job_id, set())
+        waiters.add(event)
+        try:
+            while True:
+                job = await self.get_async(job_id)
+                remaining = deadline - time.monotonic()
+                if job is None or job["status"] in FINISHED_STATUSES or remaining <= 0:
+                    return job
+
+                try:
+                    # event dari worker proses ini; polling sebagai cadangan untuk worker proses lain
+                    await asyncio.wait_for(event.wait(), timeout=min(remaining, _IDLE_POLL_SECONDS * 4))
+                except asyncio.TimeoutError:
+                    pass
+                event.clear()
+        finally:
+            # job selesai di proses lain / client terputus: entry tidak boleh tertinggal
+            waiters.discard(event)
+            if not waiters and self._changed.get(job_id) is waiters:
+                del self._changed[job_id]
+
+    def _notify(self, job_id: str):
+        for event in self._changed.get(job_id, ()):
+            event.set()
+
+    # --- worker ---
+
+    def _claim(self) -> Optional[tuple]:
+        """Job queued yang sudah boleh jalan, atau job running yang lease-nya habis"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    row = self._conn.execute(
+                        "SELECT id, payload, attempts, status FROM jobs "
+                        "WHERE (status = ? AND run_after <= ?) "
+                        "OR (status = ? AND (lease_expires_at IS NULL OR lease_expires_at < ?)) "
+                        "ORDER BY run_after LIMIT 1",
+                        (QUEUED, now, RUNNING, now),
+                    ).fetchone()
+                    if row is None or row[3] == QUEUED or row[2] < self.max_attempts:
+                        break
+                    # pemiliknya mati di percobaan terakhir: jangan diulang tanpa batas
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, error = ?, owner = NULL, lease_expires_at = NULL, "
+                        "updated_at = ? WHERE id = ?",
+                        (FAILED, "Proses worker berhenti saat menjalankan job (lease habis).", now, row[0]),
+                    )
+                    self.failed += 1
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, attempts = attempts + 1, updated_at = ?, owner = ?, "
+                        "lease_expires_at = ? WHERE id = ?",
+                        (RUNNING, now, self.owner, now + self.lease_seconds, row[0]),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        job_id, payload, attempts, status = row
+        if status == RUNNING:
+            self.reclaimed += 1
+            print(f"♻️ Job {job_id} diklaim ulang: lease pemilik sebelumnya habis")
+        return job_id, json.loads(payload), attempts + 1
+
+    def _renew(self, job_id: str) -> bool:
+        """Memperpanjang lease; False jika job sudah bukan milik proses ini"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND owner = ? AND status = ?",
+                (time.time() + self.lease_seconds, job_id, self.owner, RUNNING),
+            )
+        return cursor.rowcount == 1
+
+    async def _heartbeat(self, job_id: str):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                if not await asyncio.to_thread(self._renew, job_id):
+                    self.lost_leases += 1
+                    print(f"⚠️ Lease job {job_id} hilang (diklaim proses lain), hasil proses ini tidak akan disimpan")
+                    return
+            except sqlite3.Error:
+                traceback.print_exc()
+
+    def _finish(self, job_id: str, status: str, result: Optional[dict] = None, error: Optional[str] = None,
+                run_after: Optional[float] = None):
+        now = time.time()
+        with self._lock:
+            # hanya pemegang lease yang boleh menulis hasil
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ?, run_after = ?, "
+                "owner = NULL, lease_expires_at = NULL WHERE id = ? AND owner = ?",
+                (status, json.dumps(result) if result is not None else None, error, now, run_after or now,
+                 job_id, self.owner),
+            )
+
+    async def _run_one(self, handler: Callable[[dict], Awaitable[dict]]) -> bool:
+        claimed = await asyncio.to_thread(self._claim)
+        if claimed is None:
+            return False
+
+        job_id, payload, attempt = claimed
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            result = await handler(payload)
+        except PermanentJobError as e:
+            self.failed += 1
+            finish = dict(status=FAILED, error=str(e))
+        except Exception as e:
+            traceback.print_exc()
+            if attempt < self.max_attempts:
+                # backoff eksponensial sebelum job boleh diklaim lagi
+                self.retried += 1
+                delay = self.retry_backoff * (2 ** (attempt - 1))
+                print(f"🔁 Job {job_id} gagal (percobaan {attempt}/{self.max_attempts}), diulang dalam {delay:.1f} detik")
+                finish = dict(status=QUEUED, error=str(e), run_after=time.time() + delay)
+            else:
+                self.failed += 1
+                finish = dict(status=FAILED, error=str(e))
+        else:
+            self.completed += 1
+            finish = dict(status=DONE, result=result)
+        finally:
+            heartbeat.cancel()
+        await asyncio.to_thread(self._finish, job_id, **finish)
+        # asyncio.Event tidak thread-safe: waiter dibangunkan dari event loop, bukan dari thread _finish
+        self._notify(job_id)
+        return True
+
+    def _release_owned(self):
+        """Job milik proses ini yang terputus saat shutdown langsung dikembalikan ke antrean"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, owner = NULL, lease_expires_at = NULL, updated_at = ? "
+                "WHERE owner = ? AND status = ?",
+                (QUEUED, time.time(), self.owner, RUNNING),
+            )
+
+    async def _worker_loop(self, handler, is_ready: Callable[[], bool]):
+        while True:
+            if is_ready():
+                try:
+                    if await self._run_one(handler):
+                        continue
+                except sqlite3.Error:
+                    traceback.print_exc()
+
+            # antrean kosong: tidur sampai ada submit baru (atau interval polling untuk retry terjadwal)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=_IDLE_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self, handler: Callable[[dict], Awaitable[dict]], is_ready: Callable[[], bool]):
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker_loop(handler, is_ready))
+            for _ in range(self.workers)
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._conn is not None:
+            await asyncio.to_thread(self._release_owned)
+
+    async def stats_async(self) -> dict:
+        return await asyncio.to_thread(self.stats)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {
+            "workers": self.workers,
+            "max_depth": self.max_depth,
+            "depth": counts.get(QUEUED, 0) + counts.get(RUNNING, 0),
+            "by_status": counts,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retried": self.retried,
+            "rejected": self.rejected,
+            "reclaimed": self.reclaimed,
+            "lost_leases": self.lost_leases,
+            "lease_seconds": self.lease_seconds,
+            "owner": self.owner,
+        }
+
+queue = JobQueue(
+    config.JOB_QUEUE_PATH,
+    workers=config.JOB_WORKERS,
+    max_depth=config.JOB_QUEUE_MAX_DEPTH,
+    max_attempts=config.JOB_MAX_ATTEMPTS,
+    retry_backoff=config.JOB_RETRY_BACKOFF_SECONDS,
+    result_ttl=config.JOB_RESULT_TTL_SECONDS,
+    lease_seconds=config.JOB_LEASE_SECONDS,
+)
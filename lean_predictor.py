@@ -0,0 +1,78 @@
+from pathlib import Path
+import numpy as np
+import scipy.sparse as sp
+import xgboost as xgb
+
+PREDICTOR_FORMAT = 1
+
+class LeanPredictor:
+    """Kolom hasil SelectKBest (chi2) + booster XGBoost mentah, tanpa wrapper imblearn/sklearn.
+
+    SMOTE hanya aktif saat fit, jadi saat prediksi pipeline cukup memilih kolom lalu
+    memanggil booster. Pemilihan kolom memakai tabel remap (fitur TF-IDF -> kolom booster)
+    langsung di array CSR, tanpa fancy indexing scipy.
+    """
+
+    def __init__(self, columns: np.ndarray, booster: xgb.Booster, n_features: int, iteration_end: int = 0):
+        self.columns = np.asarray(columns, dtype=np.int32)
+        self.booster = booster
+        self.n_features = n_features
+        # 0 = semua pohon; >0 = best_iteration + 1 (early stopping), sama seperti XGBClassifier
+        self.iteration_end = iteration_end
+
+        self._remap = np.full(n_features, -1, dtype=np.int32)
+        self._remap[self.columns] = np.arange(len(self.columns), dtype=np.int32)
+
+    def select(self, X: sp.csr_matrix) -> sp.csr_matrix:
+        """Setara X[:, columns] untuk kolom terurut: urutan nilai per baris tidak berubah"""
+        if X.shape[1] == len(self.columns):
+            # sudah berisi kolom terpilih saja (output NarrowVectorizer)
+            return X
+        mapped = self._remap[X.indices]
+        keep = mapped >= 0
+        row_ids = np.repeat(np.arange(X.shape[0]), np.diff(X.indptr))
+        indptr = np.zeros(X.shape[0] + 1, dtype=np.int32)
+        np.cumsum(np.bincount(row_ids[keep], minlength=X.shape[0]), out=indptr[1:])
+        return sp.csr_matrix((X.data[keep], mapped[keep], indptr), shape=(X.shape[0], len(self.columns)))
+
+    def predict_proba(self, X: sp.csr_matrix) -> np.ndarray:
+        return self.booster.inplace_predict(self.select(X), iteration_range=(0, self.iteration_end))
+
+def from_pipeline(pipeline) -> LeanPredictor:
+    """imblearn Pipeline (smote -> selector -> clf) -> LeanPredictor"""
+    selector = pipeline.named_steps["selector"]
+    clf = pipeline.named_steps["clf"]
+    best_iteration = getattr(clf, "best_iteration", None)
+    return LeanPredictor(
+        columns=selector.get_support(indices=True),
+        booster=clf.get_booster(),
+        n_features=len(selector.get_support()),
+        iteration_end=best_iteration + 1 if best_iteration is not None else 0,
+    )
+
+def save_predictor(predictor: LeanPredictor, path: Path, source_version: str):
+    """Disimpan sebagai .npz tanpa pickle: indeks kolom + booster UBJ + metadata"""
+    np.savez(
+        path,
+        format=np.int32(PREDICTOR_FORMAT),
+        source_version=np.str_(source_version),
+        columns=predictor.columns,
+        n_features=np.int32(predictor.n_features),
+        iteration_end=np.int32(predictor.iteration_end),
+        booster=np.frombuffer(bytes(predictor.booster.save_raw("ubj")), dtype=np.uint8),
+    )
+
+def load_predictor(path: Path):
+    """Mengembalikan (predictor, source_version)"""
+    with np.load(path, allow_pickle=False) as data:
+        if int(data["format"]) != PREDICTOR_FORMAT:
+            raise ValueError(f"Format lean predictor tidak didukung: {int(data['format'])}")
+        booster = xgb.Booster()
+        booster.load_model(bytearray(data["booster"].tobytes()))
+        predictor = LeanPredictor(
+            columns=data["columns"],
+            booster=booster,
+            n_features=int(data["n_features"]),
+            iteration_end=int(data["iteration_end"]),
+        )
+        return predictor, str(data["source_version"])
@@ -1,10 +1,29 @@
-from fastapi import FastAPI, HTTPException
+import hmac
+import json
+import time
+import traceback
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from connection import prisma
-from schemas import ComparisonResponse, RecommendationRequest
-import ml_core
+from schemas import ComparisonResponse, ComparisonSummary, JobAccepted, JobStatus, RankedProduct, RecommendationRequest
+import admission
+import config
+import inference
+import job_queue
+import metrics
+import model_registry
+import profiling
+import ref_cache
+import review_cache
 import services
 
+if config.PRELOAD_ML_ASSETS:
+    # gunicorn --preload: aset dimuat sekali di master, worker server berbagi lewat fork
+    import inference_preload  # noqa: F401
+
 app = FastAPI(title="Tokopedia Laptop Recommendation API (Profession Based)")
 
 app.add_middleware(
@@ -15,49 +34,290 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Gauge dibaca saat scrape /metrics
+metrics.Gauge("inference_pending_rows", "Ulasan menunggu batch + sedang diproses executor inferensi",
+              inference.pending_rows)
+metrics.Gauge("inference_inflight_batches", "Batch inferensi yang sedang diproses executor",
+              inference.inflight_batches)
+metrics.Gauge("admission_inflight_reviews", "Ulasan milik request yang sudah diterima gate dan belum selesai",
+              lambda: admission.gate.inflight_reviews)
+metrics.Gauge("admission_queued_reviews", "Ulasan milik request yang menunggu di antrean gate",
+              lambda: admission.gate.queued_reviews)
+metrics.Gauge("job_queue_depth", "Job analisis queued + running",
+              lambda: job_queue.queue.last_depth)
+
+def is_admin(token: str) -> bool:
+    return bool(config.ADMIN_TOKEN) and hmac.compare_digest(token, config.ADMIN_TOKEN)
+
+def require_admin(x_admin_token: str = Header(default="")):
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Akses admin ditolak.")
+
+def require_inference():
+    if not inference.is_ready():
+        raise HTTPException(status_code=503, detail="Model ML tidak siap.", headers={"Retry-After": "5"})
+
+async def admit(request: RecommendationRequest) -> admission.Ticket:
+    """Jatah gate untuk semua ulasan request ini; ditolak cepat dengan 429/503 + Retry-After"""
+    try:
+        return await admission.gate.acquire(admission.request_reviews(request))
+    except admission.AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers={"Retry-After": str(e.retry_after)})
+
 @app.on_event("startup")
 async def startup_event():
     print("⏳ Menghubungkan ke Database...")
     await prisma.connect()
     
-    ml_core.load_ml_assets()
+    review_cache.cache.open()
+    # Registry memuat model aktif di background: /healthz & /readyz sudah bisa dijawab selama warmup
+    model_registry.start()
+
+    job_queue.queue.open()
+    job_queue.queue.start(run_recommend_job, is_ready=inference.is_ready)
 
 @app.on_event("shutdown")
 async def shutdown_event():
     print("🔌 Memutuskan koneksi database...")
+    await job_queue.queue.stop()
+    job_queue.queue.close()
+
+    await model_registry.stop()
     await prisma.disconnect()
 
+    await inference.shutdown()
+    review_cache.cache.close()
+
 @app.post("/recommend", response_model=ComparisonResponse)
-async def recommend_laptop(request: RecommendationRequest):
-    if not ml_core.model_optimized:
-        raise HTTPException(status_code=500, detail="Model ML tidak siap.")
+async def recommend_laptop(
+    request: RecommendationRequest,
+    response: Response,
+    x_profile: str = Header(default=""),
+    x_admin_token: str = Header(default=""),
+):
+    require_inference()
+    ticket = await admit(request)
 
-    results = []
-    
-    for candidate in request.candidates:
-        result = await services.process_product_reviews(
-            candidate=candidate, 
+    # Profiling opt-in: header X-Profile (khusus admin) atau request yang di-arm lewat /admin/profiling
+    requested = x_profile == "1" and is_admin(x_admin_token)
+    session = profiling.start(requested=requested)
+    if requested and session is None:
+        # sesi lain aktif atau analisis lain sedang berjalan: profil tidak akan terisolasi
+        response.headers["X-Profile-Skipped"] = "busy"
+    try:
+        with metrics.REQUEST_SECONDS.time(endpoint="recommend"):
+            comparison = await services.compare_candidates(request)
+    finally:
+        ticket.release()
+        if session is not None:
+            summary = profiling.finish(session)
+            response.headers["X-Profile-Id"] = summary["profile_id"]
+            print(f"🔬 Profil request tersimpan: {summary['profile_file']}")
+
+    if comparison is None:
+        raise HTTPException(status_code=400, detail="Tidak ada ulasan valid yang berhasil diproses.")
+    return comparison
+
+@app.post("/recommend/stream")
+async def recommend_laptop_stream(request: RecommendationRequest, accept: str = Header(default="")):
+    """Varian streaming /recommend: setiap ProductAnalysisResult dikirim begitu kandidatnya
+    selesai, diikuti event "summary" berisi pemenang dan ranking.
+
+    Format NDJSON (default) atau Server-Sent Events jika header Accept memuat text/event-stream.
+    """
+    require_inference()
+    ticket = await admit(request)
+
+    use_sse = "text/event-stream" in accept
+
+    def encode(event: str, payload) -> str:
+        payload = jsonable_encoder(payload)
+        if use_sse:
+            return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+        return json.dumps({"event": event, **payload}) + "\n"
+
+    async def event_stream():
+        try:
+            with metrics.REQUEST_SECONDS.time(endpoint="stream"):
+                async for chunk in comparison_events():
+                    yield chunk
+        finally:
+            ticket.release()
+
+    async def comparison_events():
+        refs = ref_cache.RequestRefs()
+        pending = services.PendingWrites()
+        metrics.CANDIDATES_PER_REQUEST.observe(len(request.candidates))
+
+        # Hanya ringkasan ranking yang disimpan; hasil lengkap langsung dikirim ke client
+        ranked = []
+        async for index, result in services.analyze_candidates(request, refs, pending):
+            if not result:
+                continue
+            ranked.append((index, RankedProduct(name=result.name, url=result.url, general_score=result.general_score)))
+            yield encode("candidate", {"index": index, "result": result})
+
+        if not ranked:
+            yield encode("error", {"status_code": 400, "detail": "Tidak ada ulasan valid yang berhasil diproses."})
+            return
+
+        try:
+            await services.flush_writes(await refs.get_user(request.user_email), pending)
+        except Exception:
+            # header 200 & event kandidat sudah terkirim: kegagalan simpan dilaporkan sebagai event
+            traceback.print_exc()
+            yield encode("error", {"status_code": 500, "detail": "Hasil analisis gagal disimpan."})
+            return
+
+        ranking = [product for _, product in services.rank_results(ranked)]
+        summary = ComparisonSummary(
             user_email=request.user_email,
-            metric_id=request.metric_id,
-            brand_id=request.brand_id,
+            winning_product=ranking[0].name,
+            ranking=ranking,
         )
-        if result:
-            results.append(result)
+        yield encode("summary", summary)
 
-        if not results:
-            raise HTTPException(status_code=400, detail="Tidak ada ulasan valid yang berhasil diproses.")
+    media_type = "text/event-stream" if use_sse else "application/x-ndjson"
+    # background: jatah tetap dilepas jika stream tidak pernah dimulai (client putus lebih dulu)
+    return StreamingResponse(event_stream(), media_type=media_type, background=BackgroundTask(ticket.release))
 
-        try:
-            sorted_results = sorted(results, key=lambda x: x.general_score, reverse=True)
-        except AttributeError:
-            sorted_results = sorted(results, key=lambda x: x["general_score"], reverse=True)
+async def run_recommend_job(payload: dict) -> dict:
+    """Handler worker antrean: payload adalah RecommendationRequest yang diserialisasi"""
+    request = RecommendationRequest(**payload)
+    # jumlah worker job sudah dibatasi JOB_WORKERS: selalu masuk, tetapi ulasannya ikut
+    # dihitung sehingga /recommend sinkron ikut menahan diri saat job besar berjalan
+    ticket = await admission.gate.acquire(admission.request_reviews(request), force=True)
+    try:
+        with metrics.REQUEST_SECONDS.time(endpoint="job"):
+            response = await services.compare_candidates(request)
+    finally:
+        ticket.release()
+    if response is None:
+        raise job_queue.PermanentJobError("Tidak ada ulasan valid yang berhasil diproses.")
+    return jsonable_encoder(response)
+
+@app.post("/recommend/jobs", status_code=202, response_model=JobAccepted)
+async def submit_recommend_job(request: RecommendationRequest):
+    """Versi asinkron /recommend untuk perbandingan besar: langsung mengembalikan job id"""
+    try:
+        return await job_queue.queue.submit_async(jsonable_encoder(request))
+    except job_queue.JobQueueFull:
+        raise HTTPException(
+            status_code=429,
+            detail="Antrean analisis penuh, coba lagi nanti.",
+            headers={"Retry-After": "5"},
+        )
+
+@app.get("/recommend/jobs/{job_id}", response_model=JobStatus)
+async def get_recommend_job(job_id: str, wait: float = Query(default=0, ge=0, le=60)):
+    """Status job; wait > 0 = long polling sampai job selesai atau waktu tunggu habis"""
+    job = await job_queue.queue.wait(job_id, wait) if wait else await job_queue.queue.get_async(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job tidak ditemukan.")
+    return job
+
+@app.get("/recommend/jobs/{job_id}/events")
+async def subscribe_recommend_job(job_id: str):
+    """Server-Sent Events: event "status" setiap kali status berubah, lalu ditutup saat job selesai"""
+    if await job_queue.queue.get_async(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job tidak ditemukan.")
+
+    async def event_stream():
+        last_state = None
+        last_sent = time.monotonic()
+        while True:
+            job = await job_queue.queue.wait(job_id, timeout=2)
+            if job is None:
+                return
+            state = (job["status"], job["attempts"])
+            if state != last_state:
+                last_state = state
+                last_sent = time.monotonic()
+                yield f"event: status\ndata: {JobStatus(**job).model_dump_json()}\n\n"
+            elif time.monotonic() - last_sent >= 15:
+                # komentar SSE sebagai keep-alive agar koneksi tidak diputus proxy
+                last_sent = time.monotonic()
+                yield ": keep-alive\n\n"
+            if job["status"] in job_queue.FINISHED_STATUSES:
+                return
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+@app.get("/recommend/jobs")
+async def recommend_job_stats():
+    return await job_queue.queue.stats_async()
 
-        winner = sorted_results[0]
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    if job_queue.queue.is_open():
+        # COUNT(*) SQLite di thread, bukan di callback gauge yang berjalan di event loop
+        await job_queue.queue.depth_async()
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    inference_state = inference.readiness()
+    database_ready = prisma.is_connected()
+    ready = database_ready and inference_state["ready"]
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "database": database_ready, "inference": inference_state},
+    )
+
+@app.get("/admin/models", dependencies=[Depends(require_admin)])
+async def model_status():
+    """Versi model yang sedang melayani, yang sedang dimuat, dan error muat terakhir"""
+    return model_registry.status()
+
+@app.post("/admin/models/reload", status_code=202, dependencies=[Depends(require_admin)])
+async def reload_model():
+    """Membaca ulang baris Model aktif sekarang (tanpa menunggu polling) dan menukar versi jika berubah"""
+    return {"started": model_registry.request_refresh(), **model_registry.status()}
+
+@app.post("/admin/cache/invalidate", dependencies=[Depends(require_admin)])
+async def invalidate_reference_cache():
+    """Dipanggil setelah Model.isActive (atau data Brand) diubah di luar API ini"""
+    model_registry.request_refresh()
+    ref_cache.invalidate_brands()
+    return {"invalidated": ["models", "brands"]}
+
+@app.post("/admin/profiling", dependencies=[Depends(require_admin)])
+async def arm_profiling(requests: int = Query(default=1, ge=0, le=100)):
+    """Memprofil N request /recommend berikutnya yang berjalan tanpa analisis lain (0 = batalkan)"""
+    return {"armed_requests": profiling.arm(requests)}
+
+@app.get("/admin/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+async def get_profile(profile_id: str):
+    """Ringkasan JSON profil: self-time per kategori (Sastrawi, XGBoost, Prisma, ...) + fungsi teratas"""
+    summary = profiling.load_summary(profile_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Profil tidak ditemukan.")
+    return summary
+
+@app.get("/admin/profiles/{profile_id}/download", dependencies=[Depends(require_admin)])
+async def download_profile(profile_id: str):
+    """File pstats gabungan (proses API + worker), bisa dibuka dengan snakeviz / pstats"""
+    path = profiling.profile_file(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profil tidak ditemukan.")
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
+
+@app.get("/inference/stats")
+async def inference_stats():
     return {
-        "user_email": request.user_email,
-        "brand_id": request.brand_id,
-        "winning_product": winner.name, 
-        "details": results,
-        "metric_id": request.metric_id
-    }
\ No newline at end of file
+        "batching": inference.batching_stats(),
+        "stem_cache": inference.stem_cache_stats(),
+    }
+
+@app.get("/admission/stats")
+async def admission_stats():
+    """Status gate (open / saturated / shedding), beban ulasan, dan perkiraan Retry-After"""
+    return admission.gate.stats()
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return review_cache.cache.stats()
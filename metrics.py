@@ -0,0 +1,162 @@
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Tuple
+
+# Bucket default (detik), mengikuti prometheus_client
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+_registry = []
+
+def _format_labels(labelnames: Tuple[str, ...], labelvalues: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: label harus {self.labelnames}, bukan {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _header(self) -> list:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        # metrik tanpa label langsung diekspos bernilai 0, seperti prometheus_client
+        self._values: Dict[Tuple[str, ...], float] = {} if self.labelnames else {(): 0}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        lines = self._header()
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+class Gauge(_Metric):
+    """Gauge yang nilainya dibaca dari callback saat /metrics di-scrape"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, function: Callable[[], float]):
+        super().__init__(name, documentation)
+        self.function = function
+
+    def render(self) -> list:
+        return self._header() + [f"{self.name} {_format_value(self.function())}"]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # per label: [hitungan per bucket (non-kumulatif), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        if not self.labelnames:
+            self._series[()] = [[0] * len(self.buckets), 0.0, 0]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][i] += 1
+                break
+        series[1] += value
+        series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Mengukur durasi wall-clock blok (termasuk await di dalamnya)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> list:
+        lines = self._header()
+        for key, (bucket_counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {repr(float(total))}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+def render() -> str:
+    """Semua metrik dalam format teks eksposisi Prometheus (text/plain; version=0.0.4)"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# --- Metrik jalur /recommend ---
+
+STAGE_SECONDS = Histogram(
+    "recommend_stage_seconds",
+    "Durasi per tahap pipeline /recommend (tahap inferensi diukur per batch di worker)",
+    labelnames=("stage",),
+)
+REQUEST_SECONDS = Histogram(
+    "recommend_request_seconds",
+    "Durasi total satu perbandingan",
+    labelnames=("endpoint",),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+CANDIDATES_PER_REQUEST = Histogram(
+    "recommend_candidates_per_request",
+    "Jumlah kandidat produk per request",
+    buckets=(1, 2, 3, 4, 5, 8, 10, 20, 50),
+)
+INFERENCE_BATCH_ROWS = Histogram(
+    "inference_batch_rows",
+    "Jumlah ulasan per batch yang dikirim ke worker inferensi",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 512, 1000, 2500, 5000),
+)
+REVIEWS_SCORED = Counter("reviews_scored_total", "Ulasan yang diinferensi model (cache miss)")
+REVIEW_CACHE_HITS = Counter("review_cache_hits_total", "Ulasan yang prediksinya diambil dari cache")
+FINGERPRINT_HITS = Counter("fingerprint_hits_total", "Kandidat yang memakai hasil analisis tersimpan (set ulasan tidak berubah)")
+CANDIDATES_SKIPPED = Counter("candidates_skipped_total", "Kandidat yang dilewati", labelnames=("reason",))
+
+# --- Admission control (admission.py) ---
+
+ADMISSION_DECISIONS = Counter(
+    "admission_decisions_total",
+    "Keputusan gate per request: admitted, admitted_after_wait, queue_full, evicted, timeout",
+    labelnames=("decision",),
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "admission_wait_seconds",
+    "Lama request menunggu di antrean gate sebelum diterima atau ditolak",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0),
+)
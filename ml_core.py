@@ -1,49 +1,383 @@
+import hashlib
+import os
 import sys
-import joblib
-import numpy as np
-from typing import List
-from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+import time
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
 from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
 import config
+import stem_cache
+
+# numpy/scipy/xgboost/sklearn diimpor saat aset dimuat, bukan saat modul diimpor,
+# supaya proses API (yang tidak memuat model) tetap ringan
 
 model_optimized = None 
 vectorizer = None
 label_encoder = None
 stemmer = None
 stopword = None
+_model_version = None
+
+# Sumber aset ("bundle" / "pickle" / "artifact") dan lama muat per aset (detik), dilaporkan ke /readyz
+asset_source = None
+load_times = {}
+# Durasi tahap predict_batch terakhir (detik), dikirim balik untuk histogram /metrics
+last_batch_seconds = {}
+
+class Assets(NamedTuple):
+    """Satu set aset serving. Ditukar sebagai satu referensi (_assets) agar prediksi yang
+    sedang berjalan tidak pernah mencampur vectorizer dan model dari versi berbeda.
+    """
+    model: object
+    vectorizer: object
+    label_encoder: object
+    stemmer: object
+    stopword: object
+    source: str
+    load_times: dict
+    artifact_path: Optional[str]
+    # BatchNormalizer dari stopword + stemmer di atas, dibuat load_assets
+    normalizer: object = None
+
+_assets: Optional[Assets] = None
+
+def load_ml_assets(artifact_path: Optional[str] = None):
+    """Fungsi ini dipanggil sekali saat server menyala (di setiap worker inferensi).
+
+    artifact_path = direktori serving bundle milik satu versi
+    di registry model (Model.artifactPath); None = artefak default dari config.
+    """
+    try:
+        install_assets(load_assets(artifact_path))
+    except Exception as e:
+        print(f"❌ Error memuat aset ML: {e}")
+        sys.exit(1)
+
+def load_assets(artifact_path: Optional[str] = None) -> Assets:
+    """Memuat aset tanpa memasangnya sebagai aset aktif (dipakai juga untuk hot-swap inline)"""
+    total_start = time.perf_counter()
+    times = {}
+    ensemble = None
+
+    if artifact_path is not None:
+        assets = _load_from_bundle(resolve_artifact_path(artifact_path), times, fallback=False)
+        source = "artifact"
+    else:
+        assets = None
+        if config.USE_SERVING_BUNDLE and config.SERVING_BUNDLE_DIR.exists():
+            assets = _load_from_bundle(config.SERVING_BUNDLE_DIR, times, fallback=True)
+        source = "bundle"
+        if assets is None:
+            # evaluator NumPy hasil export hanya berlaku untuk artefak default
+            if config.TREE_EVALUATOR == "numpy":
+                ensemble = _load_tree_ensemble(times)
+            assets = _load_from_pickles(times)
+            source = "pickle"
+
+    if config.TREE_EVALUATOR == "numpy":
+        import tree_ensemble
+
+        # bundle sudah berisi evaluator NumPy; jalur pickle memakai export atau dikompilasi dari booster
+        if not isinstance(assets.model, tree_ensemble.TreeEnsemble):
+            assets = assets._replace(model=ensemble or _compile_tree_ensemble(assets.model, times))
+        source += "+numpy"
+
+    import batch_normalizer
+    normalizer = batch_normalizer.from_stopword_remover(assets.stopword, assets.stemmer)
+
+    times["total"] = time.perf_counter() - total_start
+    print(f"✅ Model ML Loaded Successfully ({source}, {times['total']:.2f} detik)")
+    return assets._replace(source=source, load_times=times, artifact_path=artifact_path, normalizer=normalizer)
+
+def install_assets(assets: Assets):
+    """Menjadikan assets sebagai aset aktif proses ini (global lama tetap terisi untuk skrip)"""
+    global _assets, model_optimized, vectorizer, label_encoder, stemmer, stopword, asset_source, load_times
+
+    model_optimized, vectorizer, label_encoder = assets.model, assets.vectorizer, assets.label_encoder
+    stemmer, stopword = assets.stemmer, assets.stopword
+    asset_source, load_times = assets.source, assets.load_times
+    _assets = assets
 
-def load_ml_assets():
-    """Fungsi ini dipanggil sekali saat server menyala"""
-    global model_optimized, vectorizer, label_encoder, stemmer, stopword
-    
+def current_assets() -> Optional[Assets]:
+    return _assets
+
+def assets_loaded(artifact_path: Optional[str] = None) -> bool:
+    return _assets is not None and _assets.artifact_path == artifact_path
+
+def resolve_artifact_path(artifact_path: str) -> Path:
+    """Model.artifactPath boleh absolut atau relatif terhadap root proyek"""
+    path = Path(artifact_path)
+    return path if path.is_absolute() else config.BASE_DIR / path
+
+def _load_from_bundle(path: Path, times: dict, fallback: bool) -> Optional[Assets]:
+    """fallback=True (bundle default): bundle yang tidak bisa dipakai dilewati (None) agar
+    pickle dicoba; checksum penuh sudah dicek saat build, di sini hanya ukuran file.
+    """
+    print(f"🧠 Memuat serving bundle {path.name} (mmap)...")
+    start = time.perf_counter()
+    import artifact_bundle
+    times["imports"] = time.perf_counter() - start
+
+    try:
+        manifest = artifact_bundle.read_manifest(path)
+        ensemble = None
+        if config.TREE_EVALUATOR == "numpy":
+            start = time.perf_counter()
+            ensemble = artifact_bundle.load_tree_ensemble(path, manifest)
+            times["tree_ensemble"] = time.perf_counter() - start
+
+        _, bundle_vectorizer, bundle_label_encoder, bundle_model, bundle_times = artifact_bundle.load_bundle(
+            path, load_model=ensemble is None
+        )
+    except artifact_bundle.BundleError as e:
+        # bundle registry yang rusak harus gagal (versi lama tetap melayani); bundle default cukup dilewati
+        if not fallback:
+            raise
+        print(f"⚠️ Bundle tidak bisa dipakai ({e}), memakai pickle")
+        return None
+    times.update(bundle_times)
+
+    bundle_stemmer, bundle_stopword = _load_nlp(times)
+    return Assets(ensemble or bundle_model, bundle_vectorizer, bundle_label_encoder, bundle_stemmer, bundle_stopword, "bundle", times, None)
+
+def _load_nlp(times: dict):
+    """Stemmer (dengan cache) & stopword remover Sastrawi untuk jalur pickle / bundle"""
     print("🧠 Memuat modul NLP Sastrawi...")
-    stemmer = StemmerFactory().create_stemmer()
+    start = time.perf_counter()
+    stemmer = stem_cache.create_stem_cache(config.STEM_DICT_PATH, config.STEM_CACHE_SIZE)
+    print(f"🧠 Kamus stem prebuilt: {len(stemmer.prebuilt)} kata")
     stopword = StopWordRemoverFactory().create_stop_word_remover()
+    times["nlp"] = time.perf_counter() - start
+    return stemmer, stopword
+
+def _load_from_pickles(times: dict) -> Assets:
+    pickle_stemmer, pickle_stopword = _load_nlp(times)
 
     print("🧠 Memuat model Machine Learning...")
-    try:
-        vectorizer = joblib.load(config.TOKENIZE_DIR / "vectorizer_tfidf.pkl")
-        label_encoder = joblib.load(config.TOKENIZE_DIR / "label_encoder.pkl")
-        
-        model_path = config.MODEL_DIR / "final_pipeline_scenario3.pkl"
-        if model_path.exists():
-            model_optimized = joblib.load(model_path)
-            print("✅ Model ML Loaded Successfully")
-        else:
+    start = time.perf_counter()
+    import joblib
+    times["imports"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pickle_model = _load_lean_predictor()
+    if pickle_model is None:
+        model_path = config.MODEL_PATH
+        if not model_path.exists():
             print(f"❌ CRITICAL: Model tidak ditemukan di {model_path}")
             sys.exit(1)
-            
-    except Exception as e:
-        print(f"❌ Error memuat aset ML: {e}")
-        sys.exit(1)
+        pickle_model = joblib.load(model_path)
+    times["model"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    # output narrow vectorizer hanya bisa dibaca lean predictor (pipeline imblearn butuh lebar penuh)
+    pickle_vectorizer = None if hasattr(pickle_model, "named_steps") else _load_narrow_vectorizer()
+    if pickle_vectorizer is None:
+        pickle_vectorizer = joblib.load(config.VECTORIZER_PATH)
+    pickle_label_encoder = joblib.load(config.LABEL_ENCODER_PATH)
+    times["vectorizer"] = time.perf_counter() - start
+
+    return Assets(pickle_model, pickle_vectorizer, pickle_label_encoder, pickle_stemmer, pickle_stopword, "pickle", times, None)
+
+def _load_lean_predictor():
+    """Lean predictor hasil export jika dibuat dari pipeline yang sama; None = pakai pipeline pickle"""
+    if not config.LEAN_PREDICTOR_PATH.exists():
+        return None
+    import lean_predictor
 
-def preprocess_text(text: str) -> str:
+    predictor, source_version = lean_predictor.load_predictor(config.LEAN_PREDICTOR_PATH)
+    if source_version != get_model_version():
+        print("⚠️ Lean predictor dibuat dari artefak lain (versi berbeda), memakai pipeline pickle")
+        return None
+    print(f"🧠 Memakai lean predictor {config.LEAN_PREDICTOR_PATH.name} ({len(predictor.columns)} kolom)")
+    return predictor
+
+def _load_narrow_vectorizer():
+    """Narrow vectorizer hasil export jika dibuat dari artefak yang sama; None = TfidfVectorizer pickle"""
+    if not config.USE_NARROW_VECTORIZER or not config.NARROW_VECTORIZER_PATH.exists():
+        return None
+    import narrow_vectorizer
+
+    narrow, source_version = narrow_vectorizer.load_vectorizer(config.NARROW_VECTORIZER_PATH)
+    if source_version != get_model_version():
+        print("⚠️ Narrow vectorizer dibuat dari artefak lain (versi berbeda), memakai TfidfVectorizer pickle")
+        return None
+    print(f"🧠 Memakai narrow vectorizer {config.NARROW_VECTORIZER_PATH.name} ({narrow.n_features} kolom)")
+    return narrow
+
+def _load_tree_ensemble(times: dict):
+    """Evaluator NumPy hasil export jika dibuat dari artefak yang sama; None = dikompilasi dari booster"""
+    if not config.TREE_ENSEMBLE_PATH.exists():
+        return None
+    start = time.perf_counter()
+    import tree_ensemble
+
+    ensemble, source_version = tree_ensemble.load_ensemble(config.TREE_ENSEMBLE_PATH)
+    if source_version != get_model_version():
+        print("⚠️ Tree ensemble dibuat dari artefak lain (versi berbeda), dikompilasi ulang dari booster")
+        return None
+    times["tree_ensemble"] = time.perf_counter() - start
+    print(f"🌲 Evaluator NumPy: {len(ensemble.roots)} pohon, {len(ensemble.feature)} node")
+    return ensemble
+
+def _compile_tree_ensemble(model, times: dict):
+    """Booster yang sudah dimuat (lean predictor / pipeline) -> evaluator NumPy"""
+    start = time.perf_counter()
+    import lean_predictor
+    import tree_ensemble
+
+    if not isinstance(model, lean_predictor.LeanPredictor):
+        model = lean_predictor.from_pipeline(model)
+    ensemble = tree_ensemble.compile_booster(model.booster, model.columns, model.n_features, model.iteration_end)
+    times["tree_ensemble"] = time.perf_counter() - start
+    print(f"🌲 Evaluator NumPy dikompilasi dari booster: {len(ensemble.roots)} pohon")
+    return ensemble
+
+def get_model_version() -> str:
+    """Versi model default. Jika serving bundle dipakai = source_version di manifest-nya
+    (pickle tidak perlu ikut di-deploy; setelah training ulang jalankan build_bundle.py),
+    selain itu pickle_version().
+
+    Tidak memuat model maupun numpy, jadi aman dipanggil di proses utama.
+    """
+    global _model_version
+
+    if _model_version is None:
+        _model_version = _bundle_version() or pickle_version()
+    return _model_version
+
+def _bundle_version() -> Optional[str]:
+    if not config.USE_SERVING_BUNDLE or not config.SERVING_BUNDLE_DIR.exists():
+        return None
+    import artifact_bundle
+
+    try:
+        return artifact_bundle.read_manifest(config.SERVING_BUNDLE_DIR)["source_version"]
+    except artifact_bundle.BundleError as e:
+        print(f"⚠️ Manifest bundle tidak bisa dibaca ({e}), versi model dari pickle")
+        return None
+
+def pickle_version() -> str:
+    """sha256 dari pickle vectorizer, label encoder & model (source_version semua artefak export).
+
+    Cukup membaca byte file (tanpa unpickle).
+    """
+    digest = hashlib.sha256()
+    for path in (config.VECTORIZER_PATH, config.LABEL_ENCODER_PATH, config.MODEL_PATH):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+def verify_artifact(artifact_path: Optional[str]):
+    """Cek sha256 penuh bundle registry sekali di proses API sebelum worker-nya dinyalakan
+    (worker hanya mencocokkan ukuran file). Artefak default tidak dicek di sini.
+    """
+    if artifact_path is None:
+        return
+    import artifact_bundle
+
+    path = resolve_artifact_path(artifact_path)
+    artifact_bundle.verify_bundle(path, artifact_bundle.read_manifest(path))
+
+def artifact_version(artifact_path: str) -> str:
+    """Versi default artefak registry (jika Model.version kosong) = sha256 manifest bundle
+    (manifest memuat sha256 setiap file bundle)
+    """
+    path = resolve_artifact_path(artifact_path) / "manifest.json"
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+
+def preprocess_text(text: str, assets: Optional[Assets] = None) -> str:
+    assets = assets or _assets
     text = text.lower()
-    text = stopword.remove(text)
-    text = stemmer.stem(text)
+    text = assets.stopword.remove(text)
+    text = assets.stemmer.stem(text)
     return text
 
+def preprocess_batch(raw_texts: List[str], assets: Optional[Assets] = None) -> List[str]:
+    """preprocess_text untuk banyak ulasan sekaligus (hasil identik, lihat batch_normalizer)"""
+    assets = assets or _assets
+    return assets.normalizer.normalize(raw_texts)
+
+def predict_batch(raw_texts: List[str], assets: Optional[Assets] = None) -> Tuple[List[str], List[str], List[float]]:
+    """Prediksi sentimen untuk banyak ulasan sekaligus.
+
+    Semua ulasan divektorisasi menjadi satu sparse matrix dan model dipanggil sekali
+    (predict_proba); label diambil dari argmax probabilitas. Mengembalikan
+    (clean_texts, labels, confidences) sesuai urutan input.
+    """
+    # referensi diambil sekali: hot-swap di tengah batch tidak mengubah aset batch ini
+    assets = assets or _assets
+
+    start = time.perf_counter()
+    clean_texts = preprocess_batch(raw_texts, assets)
+    if not clean_texts:
+        return [], [], []
+    preprocessed = time.perf_counter()
+
+    vecs = assets.vectorizer.transform(clean_texts)
+    vectorized = time.perf_counter()
+
+    probs = assets.model.predict_proba(vecs)
+    predicted = time.perf_counter()
+
+    last_batch_seconds.update(
+        preprocess_text=preprocessed - start,
+        vectorize=vectorized - preprocessed,
+        predict=predicted - vectorized,
+    )
+
+    pred_idx = probs.argmax(axis=1)
+    labels = [label.lower() for label in assets.label_encoder.inverse_transform(pred_idx)]
+    confidences = probs.max(axis=1).astype(float).tolist()
+
+    return clean_texts, labels, confidences
+
+def worker_stats(assets: Optional[Assets] = None) -> dict:
+    """Statistik proses inferensi ini (dikirim balik ke proses utama bersama hasil prediksi)"""
+    assets = assets or _assets
+    return {
+        "pid": os.getpid(),
+        "asset_source": assets.source,
+        "artifact_path": assets.artifact_path,
+        "load_times": {name: round(seconds, 4) for name, seconds in assets.load_times.items()},
+        "stem_cache": assets.stemmer.stats(),
+        "last_batch_seconds": dict(last_batch_seconds),
+        "memory": memory_usage(),
+    }
+
+def memory_usage() -> dict:
+    """RSS / PSS / USS proses ini dalam KB (Linux, dari /proc/self/smaps_rollup).
+
+    USS (Private_Clean + Private_Dirty) = memori yang hanya dimiliki proses ini; halaman
+    yang masih dibagi copy-on-write dengan proses induk tidak terhitung di sini.
+    """
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            fields = {}
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        return {}
+    return {
+        "rss_kb": fields.get("Rss", 0),
+        "pss_kb": fields.get("Pss", 0),
+        "uss_kb": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+        "shared_kb": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+    }
+
+def predict_batch_job(raw_texts: List[str], assets: Optional[Assets] = None):
+    """Entry point worker: hasil predict_batch + statistik worker"""
+    return predict_batch(raw_texts, assets), worker_stats(assets)
+
+def predict_batch_profiled_job(raw_texts: List[str], assets: Optional[Assets] = None):
+    """Entry point worker untuk request yang diprofil: (hasil, pstats marshal), statistik worker"""
+    import profiling
+
+    return profiling.profile_call(predict_batch, raw_texts, assets), worker_stats(assets)
+
 def extract_keywords_batch(texts: List[str], top_n=5) -> List[str]:
+    import numpy as np
+
     try:
         combined_text = " ".join(texts)
         if not combined_text: return []
@@ -0,0 +1,107 @@
+import asyncio
+from typing import Optional
+from connection import prisma
+import config
+import inference
+import ml_core
+
+# Versi yang terakhir gagal dimuat; tidak dicoba ulang sampai baris Model aktif berubah
+_failed_spec = None
+_last_error = None
+_refresh_lock = asyncio.Lock()
+_refresh_task = None
+_watch_task = None
+
+def spec_from_row(row) -> inference.ModelSpec:
+    """Baris Model -> ModelSpec. Versi kosong diisi hash artefak (sama dengan kunci cache lama)."""
+    if row.artifactPath:
+        version = row.version or ml_core.artifact_version(row.artifactPath)
+    else:
+        version = row.version or ml_core.get_model_version()
+    return inference.ModelSpec(
+        model_id=row.modelId,
+        model_name=row.modelName,
+        version=version,
+        artifact_path=row.artifactPath,
+    )
+
+async def resolve_active_spec() -> Optional[inference.ModelSpec]:
+    """Model aktif terbaru yang punya artifactPath; jika tidak ada, baris default tanpa artefak"""
+    rows = await prisma.model.find_many(where={"isActive": True}, order={"updatedAt": "desc"})
+    for row in rows:
+        if row.artifactPath:
+            return await asyncio.to_thread(spec_from_row, row)
+    for row in rows:
+        if row.modelName == config.DEFAULT_MODEL_NAME:
+            return await asyncio.to_thread(spec_from_row, row)
+    return None
+
+async def refresh():
+    """Membaca baris Model aktif; jika versinya berubah, versi baru dimuat lalu ditukar"""
+    global _failed_spec, _last_error
+
+    async with _refresh_lock:
+        try:
+            spec = await resolve_active_spec()
+        except Exception as e:
+            # database tidak terjangkau atau file artefak baris aktif tidak ada
+            _last_error = f"Registry model gagal membaca baris Model aktif: {type(e).__name__}: {e}"
+            print(f"❌ {_last_error}")
+            return
+        if spec is None:
+            _last_error = "Tidak ada baris Model aktif di database."
+            print(f"❌ {_last_error}")
+            return
+
+        serving = inference.current()
+        if serving is not None and serving.spec == spec:
+            return
+        if spec == _failed_spec:
+            return
+
+        print(f"📦 Memuat model {spec.model_name} versi {spec.version} di background...")
+        if await inference.activate(spec):
+            _failed_spec, _last_error = None, None
+        else:
+            _failed_spec = spec
+            _last_error = f"Gagal memuat versi {spec.version}: {inference.readiness()['error']}"
+            print(f"❌ {_last_error}")
+
+def request_refresh() -> bool:
+    """Memicu refresh di background (endpoint admin); False jika refresh sedang berjalan"""
+    global _refresh_task, _failed_spec
+
+    if _refresh_task is not None and not _refresh_task.done():
+        return False
+    # reload manual boleh mencoba ulang versi yang sebelumnya gagal
+    _failed_spec = None
+    _refresh_task = asyncio.create_task(refresh())
+    return True
+
+async def _watch():
+    while True:
+        await refresh()
+        if config.MODEL_REGISTRY_POLL_SECONDS == 0:
+            return
+        await asyncio.sleep(config.MODEL_REGISTRY_POLL_SECONDS)
+
+def start():
+    """Dipanggil saat startup: memuat model aktif lalu memantau perubahan di background"""
+    global _watch_task
+    _watch_task = asyncio.create_task(_watch())
+
+async def stop():
+    for task in (_watch_task, _refresh_task):
+        if task is not None:
+            task.cancel()
+    await asyncio.gather(*(task for task in (_watch_task, _refresh_task) if task is not None), return_exceptions=True)
+
+def status() -> dict:
+    serving = inference.current()
+    return {
+        "active": serving.readiness() if serving is not None else None,
+        "loading": inference.readiness()["loading"],
+        "last_error": _last_error,
+        "failed_version": _failed_spec.version if _failed_spec is not None else None,
+        "poll_seconds": config.MODEL_REGISTRY_POLL_SECONDS,
+    }
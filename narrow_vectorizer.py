@@ -0,0 +1,135 @@
+import re
+from array import array
+from pathlib import Path
+from typing import List
+import numpy as np
+import scipy.sparse as sp
+
+VECTORIZER_FORMAT = 1
+
+class NarrowVectorizer:
+    """TfidfVectorizer (word, unigram, lowercase, norm l2) + SelectKBest dalam satu transform.
+
+    Output langsung berisi kolom hasil seleksi chi2 (urutan kolom booster), jadi tidak ada
+    matriks selebar vocabulary yang dibuat lalu dipotong. Term yang dibuang selector tetap
+    dikenali (kolom -1) karena bobotnya ikut dihitung di norma l2 baris; tanpa itu nilai
+    TF-IDF kolom terpilih berubah. Norma dijumlah berurutan menurut indeks vocabulary asli,
+    sama seperti normalize() sklearn, sehingga hasilnya identik bit-per-bit.
+    """
+
+    def __init__(self, vocab: np.ndarray, vocab_index: np.ndarray, idf: np.ndarray, columns: np.ndarray, token_pattern: str):
+        # vocab: term UTF-8 (bytes) terurut, vocab_index: indeks vocabulary asli tiap term (lihat
+        # sorted_vocab); idf/columns mengikuti urutan vocabulary asli TfidfVectorizer. Array dipakai
+        # apa adanya (boleh mmap read-only dari serving bundle), tanpa dict term -> indeks di heap.
+        self.vocab = vocab
+        self.vocab_index = np.asarray(vocab_index, dtype=np.int32)
+        self.idf = np.asarray(idf, dtype=np.float64)
+        self.columns = np.asarray(columns, dtype=np.int32)
+        self.token_pattern = re.compile(token_pattern)
+        self.n_features = int((self.columns >= 0).sum())
+
+        self._selected = np.flatnonzero(self.columns >= 0)
+        if not np.array_equal(self.columns[self._selected], np.arange(self.n_features)):
+            raise ValueError("Kolom output harus berurutan mengikuti urutan vocabulary")
+
+    def terms(self) -> np.ndarray:
+        """Semua term dalam urutan vocabulary asli"""
+        terms = np.empty(len(self.vocab), dtype=object)
+        terms[self.vocab_index] = [term.decode("utf-8") for term in self.vocab.tolist()]
+        return terms
+
+    def get_feature_names_out(self) -> np.ndarray:
+        """Nama fitur kolom output (term terpilih saja)"""
+        return self.terms()[self._selected]
+
+    def lookup(self, tokens: List[str]) -> np.ndarray:
+        """Indeks vocabulary asli tiap token, -1 jika tidak ada (pencarian biner di vocab terurut)"""
+        if not tokens:
+            return np.empty(0, dtype=np.int32)
+        # token \w\w+ tidak pernah memuat newline; satu encode untuk semua token sekaligus
+        encoded = np.array("\n".join(tokens).encode("utf-8").split(b"\n"))
+        positions = np.minimum(np.searchsorted(self.vocab, encoded), len(self.vocab) - 1)
+        return np.where(self.vocab[positions] == encoded, self.vocab_index[positions], -1)
+
+    def transform(self, texts: List[str]) -> sp.csr_matrix:
+        findall = self.token_pattern.findall
+        # token unik batch -> nomor urut; hanya token unik yang dicari di vocab
+        unique = {}
+        codes = array("i")
+        row_lengths = np.empty(len(texts), dtype=np.intp)
+        for row, text in enumerate(texts):
+            found = findall(text.lower())
+            codes.extend([unique.setdefault(token, len(unique)) for token in found])
+            row_lengths[row] = len(found)
+
+        term_ids = self.lookup(list(unique))[np.frombuffer(codes, dtype=np.int32)]
+        known = term_ids >= 0
+
+        # hitung token per (baris, term) sekaligus; np.unique mengurutkan per baris lalu per term
+        n_terms = len(self.idf)
+        key_dtype = np.int32 if len(texts) * n_terms < 2 ** 31 else np.int64
+        keys = np.repeat(np.arange(len(texts), dtype=key_dtype), row_lengths)[known] * key_dtype(n_terms)
+        keys += term_ids[known]
+        keys, counts = np.unique(keys, return_counts=True)
+        row_ids, term_ids = np.divmod(keys, n_terms)
+
+        data = counts.astype(np.float64) * self.idf[term_ids]
+        norms = np.sqrt(np.bincount(row_ids, weights=data * data, minlength=len(texts)))
+        norms[norms == 0] = 1.0
+
+        # hanya term terpilih yang keluar sebagai kolom
+        columns = self.columns[term_ids]
+        keep = columns >= 0
+        row_ids = row_ids[keep]
+        values = data[keep] / norms[row_ids]
+        indptr = np.zeros(len(texts) + 1, dtype=np.int32)
+        np.cumsum(np.bincount(row_ids, minlength=len(texts)), out=indptr[1:])
+        return sp.csr_matrix((values, columns[keep], indptr), shape=(len(texts), self.n_features))
+
+def sorted_vocab(terms: List[str]):
+    """Term dalam urutan vocabulary asli -> (vocab bytes UTF-8 terurut, indeks asli tiap term).
+
+    Urutan byte UTF-8 sama dengan urutan perbandingan array bytes NumPy (searchsorted).
+    """
+    order = sorted(range(len(terms)), key=lambda idx: terms[idx].encode("utf-8"))
+    vocab = np.array([terms[idx].encode("utf-8") for idx in order], dtype=bytes)
+    return vocab, np.asarray(order, dtype=np.int32)
+
+def from_terms(terms: List[str], idf: np.ndarray, columns: np.ndarray, token_pattern: str) -> NarrowVectorizer:
+    return NarrowVectorizer(*sorted_vocab([str(term) for term in terms]), idf, columns, token_pattern)
+
+def from_pipeline(vectorizer, pipeline) -> NarrowVectorizer:
+    """TfidfVectorizer hasil training + imblearn Pipeline (smote -> selector -> clf) -> NarrowVectorizer"""
+    support = pipeline.named_steps["selector"].get_support()
+    terms = np.empty(len(vectorizer.vocabulary_), dtype=object)
+    for term, idx in vectorizer.vocabulary_.items():
+        terms[idx] = term
+    columns = np.full(len(support), -1, dtype=np.int32)
+    columns[support] = np.arange(int(support.sum()), dtype=np.int32)
+    return from_terms(terms, vectorizer.idf_, columns, vectorizer.token_pattern)
+
+def save_vectorizer(narrow: NarrowVectorizer, path: Path, source_version: str):
+    """Disimpan sebagai .npz tanpa pickle: tabel term + idf + kolom output + metadata.
+
+    Term (\\w\\w+, tanpa spasi) disimpan sebagai satu blok UTF-8 dipisah newline; array
+    string NumPy memakai lebar tetap 4 byte per karakter term terpanjang.
+    """
+    terms = narrow.terms()
+    np.savez(
+        path,
+        format=np.int32(VECTORIZER_FORMAT),
+        source_version=np.str_(source_version),
+        terms=np.frombuffer("\n".join(terms.tolist()).encode("utf-8"), dtype=np.uint8),
+        idf=narrow.idf,
+        columns=narrow.columns,
+        token_pattern=np.str_(narrow.token_pattern.pattern),
+    )
+
+def load_vectorizer(path: Path):
+    """Mengembalikan (vectorizer, source_version)"""
+    with np.load(path, allow_pickle=False) as data:
+        if int(data["format"]) != VECTORIZER_FORMAT:
+            raise ValueError(f"Format narrow vectorizer tidak didukung: {int(data['format'])}")
+        terms = data["terms"].tobytes().decode("utf-8").split("\n")
+        narrow = from_terms(terms, data["idf"], data["columns"], str(data["token_pattern"]))
+        return narrow, str(data["source_version"])
@@ -0,0 +1,14 @@
+-- Hasil analisis tersimpan untuk fingerprint set ulasan (lihat services.process_product_reviews).
+-- Idempoten: database lama yang dibuat dengan `prisma db push` mungkin sudah memiliki kolom ini.
+
+-- AlterTable
+ALTER TABLE "Metric" ADD COLUMN IF NOT EXISTS "aspectScores" JSONB;
+ALTER TABLE "Metric" ADD COLUMN IF NOT EXISTS "positiveCount" INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE "Metric" ADD COLUMN IF NOT EXISTS "negativeCount" INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE "Metric" ADD COLUMN IF NOT EXISTS "fingerprint" TEXT;
+
+-- DropIndex: fingerprint check kini membaca Metric terbaru per produk
+DROP INDEX IF EXISTS "Metric_productId_fingerprint_idx";
+
+-- CreateIndex
+CREATE INDEX IF NOT EXISTS "Metric_productId_createdAt_idx" ON "Metric"("productId", "createdAt");
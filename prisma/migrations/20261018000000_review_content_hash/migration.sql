@@ -0,0 +1,21 @@
+-- Database lama dibuat dengan `prisma db push` (schema 0_init, tandai dengan
+-- `prisma migrate resolve --applied 0_init`); migration ini menambahkan
+-- contentHash pada Review.
+-- Semua langkah idempoten: kolom/index mungkin sudah ada jika db push dijalankan ulang.
+
+-- AlterTable: contentHash = sha256 hex dari content (sama dengan review_cache.review_hash)
+ALTER TABLE "Review" ADD COLUMN IF NOT EXISTS "contentHash" TEXT;
+UPDATE "Review" SET "contentHash" = encode(sha256(convert_to("content", 'UTF8')), 'hex')
+WHERE "contentHash" IS NULL;
+
+-- Ulasan kembar dalam satu produk: simpan baris terbaru saja
+DELETE FROM "Review" AS older
+USING "Review" AS newer
+WHERE older."productId" = newer."productId"
+  AND older."contentHash" = newer."contentHash"
+  AND older."reviewId" < newer."reviewId";
+
+ALTER TABLE "Review" ALTER COLUMN "contentHash" SET NOT NULL;
+
+-- CreateIndex
+CREATE UNIQUE INDEX IF NOT EXISTS "Review_productId_contentHash_key" ON "Review"("productId", "contentHash");
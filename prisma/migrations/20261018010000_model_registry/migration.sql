@@ -0,0 +1,3 @@
+-- AlterTable: registry model (lihat model_registry.py). Baris tanpa artifactPath memakai artefak default.
+ALTER TABLE "Model" ADD COLUMN IF NOT EXISTS "version" TEXT;
+ALTER TABLE "Model" ADD COLUMN IF NOT EXISTS "artifactPath" TEXT;
@@ -0,0 +1,3 @@
+-- AlterTable: versi analisis (versi model + matcher aspek) yang menghasilkan keyword ulasan.
+-- Baris lama bernilai NULL sehingga dianggap basi dan ditulis ulang pada sync berikutnya.
+ALTER TABLE "Review" ADD COLUMN IF NOT EXISTS "analysisVersion" TEXT;
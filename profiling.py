@@ -0,0 +1,213 @@
+import cProfile
+import contextvars
+import json
+import marshal
+import pstats
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+import admission
+import config
+
+# Sesi profil request yang sedang berjalan; None (default) = profiling mati.
+# Jalur inferensi cukup membaca ContextVar ini, jadi tanpa profiling tidak ada overhead lain.
+_session = contextvars.ContextVar("profile_session", default=None)
+
+# Satu sesi aktif sekaligus: cProfile memprofil seluruh thread event loop, jadi sesi juga
+# hanya dibuka saat tidak ada analisis lain yang berjalan (lihat start)
+_active = False
+# Jumlah request /recommend berikutnya yang diprofil (diatur lewat endpoint admin)
+_armed_requests = 0
+
+_TOP_FUNCTIONS = 25
+
+class ProfileSession:
+    def __init__(self):
+        self.profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.profiler = cProfile.Profile()
+        self.worker_profiles = []
+        self.started = time.perf_counter()
+        # analisis (request / job) yang diterima gate selama sesi berjalan ikut terekam di profil API
+        self.admitted_at_start = admission.gate.admitted
+        self.wall_seconds = None
+        self.token = None
+
+    def add_worker_profile(self, worker_profile: Optional[bytes]):
+        """Hasil marshal pstats dari worker inferensi (lihat ml_core.predict_batch_profiled_job)"""
+        if worker_profile is not None:
+            self.worker_profiles.append(worker_profile)
+
+def current() -> Optional[ProfileSession]:
+    return _session.get()
+
+def arm(requests: int) -> int:
+    global _armed_requests
+    _armed_requests = max(0, requests)
+    return _armed_requests
+
+def armed_requests() -> int:
+    return _armed_requests
+
+def start(requested: bool) -> Optional[ProfileSession]:
+    """Membuka sesi jika diminta lewat header atau sedang di-arm admin; None jika tidak diprofil.
+
+    Dipanggil setelah request diterima admission gate. cProfile merekam semua coroutine di
+    thread event loop, jadi sesi ditolak (None) selama ada analisis lain yang sedang berjalan
+    (request /recommend, /recommend/stream, atau worker job); jatah arm tidak berkurang dan
+    menunggu request berikutnya yang berjalan sendirian.
+    """
+    global _active, _armed_requests
+
+    if _active or not (requested or _armed_requests > 0):
+        return None
+    if admission.gate.inflight_requests > 1:
+        return None
+    if not requested:
+        _armed_requests -= 1
+
+    _active = True
+    session = ProfileSession()
+    session.token = _session.set(session)
+    session.profiler.enable()
+    return session
+
+def finish(session: ProfileSession) -> dict:
+    """Menutup sesi, menyimpan file .prof gabungan + ringkasan JSON, lalu mengembalikan ringkasan"""
+    global _active
+
+    session.profiler.disable()
+    session.wall_seconds = time.perf_counter() - session.started
+    _session.reset(session.token)
+    _active = False
+
+    config.PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    base = config.PROFILE_DIR / session.profile_id
+
+    api_path = Path(f"{base}.api.prof")
+    session.profiler.dump_stats(str(api_path))
+    stats = pstats.Stats(str(api_path))
+    for i, worker_profile in enumerate(session.worker_profiles):
+        worker_path = Path(f"{base}.worker{i}.prof")
+        worker_path.write_bytes(worker_profile)
+        stats.add(str(worker_path))
+
+    profile_path = Path(f"{base}.prof")
+    stats.dump_stats(str(profile_path))
+
+    summary = summarize(stats)
+    summary.update(
+        profile_id=session.profile_id,
+        wall_seconds=round(session.wall_seconds, 4),
+        # > 0: analisis lain mulai di tengah sesi dan ikut terekam di profil proses API
+        concurrent_requests=admission.gate.admitted - session.admitted_at_start,
+        worker_batches=len(session.worker_profiles),
+        profile_file=str(profile_path),
+    )
+    Path(f"{base}.json").write_text(json.dumps(summary, indent=2))
+    return summary
+
+def load_summary(profile_id: str) -> Optional[dict]:
+    path = _profile_path(profile_id, ".json")
+    if path is None or not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+def profile_file(profile_id: str) -> Optional[Path]:
+    path = _profile_path(profile_id, ".prof")
+    return path if path is not None and path.exists() else None
+
+def _profile_path(profile_id: str, suffix: str) -> Optional[Path]:
+    # profile_id berasal dari URL: hanya nama file polos di PROFILE_DIR
+    if not profile_id or Path(profile_id).name != profile_id or profile_id.startswith("."):
+        return None
+    return config.PROFILE_DIR / f"{profile_id}{suffix}"
+
+# --- Ringkasan ---
+
+def _category(func: tuple) -> Optional[str]:
+    filename = func[0].replace("\\", "/")
+    if filename == "~":
+        return None
+    if "/Sastrawi/" in filename or filename.endswith("/stem_cache.py"):
+        return "sastrawi"
+    if "/xgboost/" in filename:
+        return "xgboost"
+    if "/prisma/" in filename:
+        return "prisma"
+    if any(part in filename for part in ("/numpy/", "/scipy/", "/sklearn/")):
+        return "numpy_scipy"
+    if filename.endswith("/selectors.py"):
+        # event loop menunggu I/O (balasan worker inferensi, query Prisma)
+        return "event_loop_wait"
+    if any(part in filename for part in ("/multiprocessing/", "/concurrent/")):
+        return "worker_ipc"
+    if any(part in filename for part in ("/asyncio/", "/starlette/", "/fastapi/", "/anyio/", "/httpx/", "/httpcore/")):
+        return "framework"
+    if Path(filename).parent == config.BASE_DIR:
+        return Path(filename).stem
+    return "other"
+
+def summarize(stats: pstats.Stats) -> dict:
+    """Self-time per kategori (paket/modul) + cumulative time fungsi utama.
+
+    Waktu fungsi builtin (~) dibagi ke kategori pemanggilnya, sehingga mis. regex
+    di stopword remover terhitung sebagai Sastrawi.
+    """
+    by_category = {}
+    for func, (_, _, tottime, _, callers) in stats.stats.items():
+        category = _category(func)
+        if category is not None:
+            by_category[category] = by_category.get(category, 0.0) + tottime
+            continue
+        attributed = 0.0
+        for caller, caller_stats in callers.items():
+            caller_category = _category(caller) or "builtins"
+            by_category[caller_category] = by_category.get(caller_category, 0.0) + caller_stats[2]
+            attributed += caller_stats[2]
+        if tottime > attributed:
+            by_category["builtins"] = by_category.get("builtins", 0.0) + tottime - attributed
+
+    key_functions = {}
+    for func, (_, ncalls, _, cumtime, _) in stats.stats.items():
+        module = Path(func[0]).stem
+        qualified = f"{module}.{func[2]}"
+        if qualified in ("services.process_product_reviews", "services.flush_writes",
+                         "ml_core.preprocess_batch", "ml_core.predict_batch"):
+            key_functions[qualified] = {"calls": ncalls, "cumulative_seconds": round(cumtime, 4)}
+
+    top = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:_TOP_FUNCTIONS]
+    return {
+        "total_profiled_seconds": round(stats.total_tt, 4),
+        "self_seconds_by_category": {
+            category: round(seconds, 4)
+            for category, seconds in sorted(by_category.items(), key=lambda item: item[1], reverse=True)
+        },
+        "key_functions": key_functions,
+        "top_cumulative": [
+            {
+                "function": f"{Path(func[0]).name}:{func[1]}({func[2]})",
+                "calls": ncalls,
+                "self_seconds": round(tottime, 4),
+                "cumulative_seconds": round(cumtime, 4),
+            }
+            for func, (_, ncalls, tottime, cumtime, _) in top
+        ],
+    }
+
+def profile_call(fn, *args, **kwargs):
+    """Menjalankan fn di bawah cProfile (di proses worker); mengembalikan (hasil, pstats marshal).
+
+    Jika profiler lain sudah aktif di thread/proses ini, fn dijalankan tanpa profil.
+    """
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        return fn(*args, **kwargs), None
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        profiler.disable()
+    profiler.create_stats()
+    return result, marshal.dumps(profiler.stats)
@@ -0,0 +1,68 @@
+import asyncio
+import time
+from connection import prisma
+import config
+
+class TTLCache:
+    """Cache async kecil dengan TTL dan single-flight.
+
+    Pemanggil yang meminta key yang sama secara bersamaan menunggu satu lookup yang
+    sama, jadi kandidat paralel dalam satu request tidak memicu query duplikat.
+    Hasil None tidak disimpan. ttl=None berarti tidak pernah kedaluwarsa.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._values = {}
+        self._inflight = {}
+
+    async def get_or_load(self, key, loader):
+        entry = self._values.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at is None or expires_at > time.monotonic():
+                return value
+            del self._values[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(loader())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        value = await asyncio.shield(task)
+        if value is not None:
+            expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+            self._values[key] = (expires_at, value)
+        return value
+
+    def invalidate(self, key=None):
+        if key is None:
+            self._values.clear()
+        else:
+            self._values.pop(key, None)
+
+_brand_ids = TTLCache(config.REF_CACHE_TTL_SECONDS)
+
+async def get_brand_id(brand_name: str) -> int:
+    """Id Brand berdasarkan nama; dibuat jika belum ada (di-cache lintas request)"""
+    async def load():
+        brand = await prisma.brand.upsert(
+            where={"name": brand_name},
+            data={"create": {"name": brand_name}, "update": {}},
+        )
+        return brand.brandId
+
+    return await _brand_ids.get_or_load(brand_name, load)
+
+def invalidate_brands():
+    _brand_ids.invalidate()
+
+class RequestRefs:
+    """Lookup referensi yang hanya berlaku selama satu request (baris User)"""
+
+    def __init__(self):
+        self._users = TTLCache(ttl=None)
+
+    async def get_user(self, email: str):
+        return await self._users.get_or_load(email, lambda: prisma.user.find_unique(where={"email": email}))
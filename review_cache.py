@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List
+import aspect_matcher
+import config
+
+_SQLITE_MAX_VARS = 500
+
+def review_hash(raw_text: str) -> str:
+    return hashlib.sha256(raw_text.encode("utf-8")).hexdigest()
+
+def analysis_version(model_version: str) -> str:
+    """Versi model + versi matcher aspek, karena keyword aspek ikut disimpan di cache"""
+    return f"{model_version}-{aspect_matcher.get_matcher().digest}"
+
+def make_key(raw_text: str, version: str) -> str:
+    """Kunci cache = hash teks mentah + versi yang menghasilkan prediksi"""
+    return f"{version}:{review_hash(raw_text)}"
+
+def review_set_fingerprint(raw_texts: List[str], version: str) -> str:
+    """Sidik jari satu set ulasan produk: tidak bergantung urutan, berubah jika versi berubah"""
+    digest = hashlib.sha256(version.encode("utf-8"))
+    for text_hash in sorted(review_hash(raw_text) for raw_text in raw_texts):
+        digest.update(text_hash.encode("ascii"))
+    return digest.hexdigest()
+
+class ReviewCache:
+    """Cache hasil prediksi per ulasan (label, confidence, keyword aspek).
+
+    Tier 1 adalah LRU di memori, tier 2 adalah SQLite di disk sehingga tetap
+    terisi setelah server restart. Entry dari disk dinaikkan ke memori saat dibaca.
+    Akses SQLite berjalan di thread (asyncio.to_thread) agar event loop tidak ikut menunggu disk;
+    tier disk dibatasi max_disk_rows baris, baris yang paling lama ditulis dibuang lebih dulu.
+    """
+
+    def __init__(self, db_path, max_memory_items: int, max_disk_rows: int = 0):
+        self.db_path = db_path
+        self.max_memory_items = max_memory_items
+        self.max_disk_rows = max_disk_rows
+        self._memory = OrderedDict()
+        self._conn = None
+        self._lock = threading.Lock()
+        # koneksi SQLite dipakai bergantian oleh thread asyncio.to_thread
+        self._disk_lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_evictions = 0
+
+    def open(self):
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS review_predictions ("
+            "key TEXT PRIMARY KEY, label TEXT NOT NULL, confidence REAL NOT NULL, aspects TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def close(self):
+        with self._disk_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _remember(self, key: str, entry: dict):
+        if self.max_memory_items == 0:
+            return
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    async def get_many(self, keys: List[str]) -> Dict[str, dict]:
+        found = {}
+        with self._lock:
+            missing = []
+            for key in dict.fromkeys(keys):
+                entry = self._memory.get(key)
+                if entry is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = entry
+                    self.memory_hits += 1
+                else:
+                    missing.append(key)
+
+        disk_found = await asyncio.to_thread(self._read_disk, missing) if missing else {}
+        with self._lock:
+            for key, entry in disk_found.items():
+                self._remember(key, entry)
+            self.disk_hits += len(disk_found)
+            self.misses += len(missing) - len(disk_found)
+
+        found.update(disk_found)
+        return found
+
+    async def put_many(self, entries: Dict[str, dict]):
+        if not entries:
+            return
+        with self._lock:
+            for key, entry in entries.items():
+                self._remember(key, entry)
+
+        await asyncio.to_thread(self._write_disk, entries)
+
+    def _read_disk(self, keys: List[str]) -> Dict[str, dict]:
+        found = {}
+        with self._disk_lock:
+            if self._conn is None:
+                return found
+            for i in range(0, len(keys), _SQLITE_MAX_VARS):
+                chunk = keys[i:i + _SQLITE_MAX_VARS]
+                rows = self._conn.execute(
+                    "SELECT key, label, confidence, aspects FROM review_predictions "
+                    f"WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, label, confidence, aspects in rows:
+                    found[key] = {"label": label, "confidence": confidence, "aspects": json.loads(aspects)}
+        return found
+
+    def _write_disk(self, entries: Dict[str, dict]):
+        with self._disk_lock:
+            if self._conn is None:
+                return
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO review_predictions (key, label, confidence, aspects) VALUES (?, ?, ?, ?)",
+                [
+                    (key, entry["label"], entry["confidence"], json.dumps(entry["aspects"]))
+                    for key, entry in entries.items()
+                ],
+            )
+            if self.max_disk_rows:
+                # INSERT OR REPLACE selalu memberi rowid baru (MAX(rowid) + 1), jadi rowid mengikuti urutan
+                # tulis: semua baris di luar max_disk_rows rowid terakhir adalah yang paling lama ditulis
+                self.disk_evictions += self._conn.execute(
+                    "DELETE FROM review_predictions "
+                    "WHERE rowid <= (SELECT MAX(rowid) FROM review_predictions) - ?",
+                    (self.max_disk_rows,),
+                ).rowcount
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "memory_items": len(self._memory),
+            "memory_capacity": self.max_memory_items,
+            "disk_capacity": self.max_disk_rows,
+            "disk_evictions": self.disk_evictions,
+        }
+
+cache = ReviewCache(
+    config.REVIEW_CACHE_PATH, config.REVIEW_CACHE_MEMORY_ITEMS, config.REVIEW_CACHE_DISK_MAX_ROWS
+)
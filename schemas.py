@@ -27,4 +27,28 @@ class ComparisonResponse(BaseModel):
     user_email: str
     analysis_type: str = "ASPECT_BASED" 
     winning_product: str
-    details: List[ProductAnalysisResult]
\ No newline at end of file
+    details: List[ProductAnalysisResult]
+
+class RankedProduct(BaseModel):
+    name: str
+    url: str
+    general_score: float
+
+class ComparisonSummary(BaseModel):
+    user_email: str
+    analysis_type: str = "ASPECT_BASED"
+    winning_product: str
+    ranking: List[RankedProduct]
+
+class JobAccepted(BaseModel):
+    job_id: str
+    status: str
+
+class JobStatus(BaseModel):
+    job_id: str
+    status: str
+    attempts: int
+    created_at: float
+    updated_at: float
+    result: Optional[ComparisonResponse] = None
+    error: Optional[str] = None
@@ -1,15 +1,122 @@
+import asyncio
 import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 from connection import prisma
+from prisma import Json
 from prisma.enums import Sentiment
-from schemas import ProductCandidate, ProductAnalysisResult
+from schemas import ProductCandidate, ProductAnalysisResult, RecommendationRequest
+import aspect_matcher
 import config
-import ml_core
+import inference
+import metrics
+import ref_cache
+import review_cache
+
+@dataclass
+class ReviewSync:
+    """Ulasan terkini satu produk, dikunci dengan contentHash (unik per produk)"""
+    product_id: int
+    model_id: int
+    # review_cache.analysis_version: versi model + versi matcher aspek yang menghasilkan keyword
+    analysis_version: str
+    reviews: Dict[str, dict]
+
+@dataclass
+class PendingWrites:
+    """Tulisan DB satu request /recommend yang ditunda sampai semua kandidat selesai,
+    dikunci dengan index kandidat di request"""
+    review_syncs: Dict[int, ReviewSync] = field(default_factory=dict)
+    metrics: Dict[int, dict] = field(default_factory=dict)
 
 def clean_product_name(name: str) -> str:
     name = re.sub(r'【.*?】', '', name)
     return name.strip()
 
-async def process_product_reviews(candidate: ProductCandidate, user_email: str, metric_id: int, brand_id: int):
+async def analyze_candidates(request: RecommendationRequest, refs: ref_cache.RequestRefs, pending: PendingWrites):
+    """Memproses semua kandidat secara paralel (dibatasi MAX_CONCURRENT_CANDIDATES).
+
+    Async generator yang menghasilkan (index kandidat, hasil) sesuai urutan selesai;
+    hasil None berarti kandidat dilewati. Semua kandidat memakai satu versi model yang
+    dipegang sampai generator selesai, walaupun model aktif ditukar di tengah jalan.
+    """
+    semaphore = asyncio.Semaphore(config.MAX_CONCURRENT_CANDIDATES)
+
+    with inference.use_model() as serving:
+        async def process_candidate(index: int, candidate: ProductCandidate):
+            async with semaphore:
+                return index, await process_product_reviews(
+                    index=index,
+                    candidate=candidate, 
+                    user_email=request.user_email,
+                    metric_id=request.metric_id,
+                    brand_id=request.brand_id,
+                    refs=refs,
+                    pending=pending,
+                    serving=serving,
+                )
+
+        tasks = [asyncio.ensure_future(process_candidate(i, c)) for i, c in enumerate(request.candidates)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # client streaming terputus / kandidat lain gagal: hentikan sisa pekerjaan
+            for task in tasks:
+                task.cancel()
+
+def rank_results(indexed_results: List[tuple]) -> List[tuple]:
+    """Urutkan (index, hasil) dari skor tertinggi; skor sama mengikuti urutan kandidat"""
+    return sorted(indexed_results, key=lambda item: (-item[1].general_score, item[0]))
+
+async def compare_candidates(request: RecommendationRequest) -> Optional[dict]:
+    """Satu perbandingan lengkap (analisis semua kandidat + tulis DB) untuk /recommend dan job async.
+
+    Mengembalikan payload ComparisonResponse, atau None jika tidak ada ulasan valid.
+    """
+    refs = ref_cache.RequestRefs()
+    pending = PendingWrites()
+    metrics.CANDIDATES_PER_REQUEST.observe(len(request.candidates))
+
+    # hasil disusun kembali sesuai urutan kandidat di request
+    indexed_results = []
+    async for index, result in analyze_candidates(request, refs, pending):
+        if result:
+            indexed_results.append((index, result))
+    indexed_results.sort(key=lambda item: item[0])
+    results = [result for _, result in indexed_results]
+
+    if not results:
+        return None
+
+    # Satu Analysis + semua Metric + perubahan ulasan ditulis dalam satu transaksi batch
+    await flush_writes(await refs.get_user(request.user_email), pending)
+
+    winner = rank_results(indexed_results)[0][1]
+
+    return {
+        "user_email": request.user_email,
+        "brand_id": request.brand_id,
+        "winning_product": winner.name, 
+        "details": results,
+        "metric_id": request.metric_id
+    }
+
+async def process_product_reviews(
+    index: int,
+    candidate: ProductCandidate,
+    user_email: str,
+    metric_id: int,
+    brand_id: int,
+    refs: ref_cache.RequestRefs,
+    pending: PendingWrites,
+    serving: inference.ServingModel,
+):
+    """Analisis ABSA satu kandidat dengan versi model `serving`.
+
+    Tidak ada tulisan hasil di sini: perubahan ulasan dan Metric dicatat di `pending`
+    lalu pemanggil menuliskannya sekaligus lewat flush_writes() setelah scoring selesai.
+    """
     # 1. SETUP ASPEK (Initialize score 0 untuk setiap kategori)
     aspect_stats = {
         aspect: {"positive": 0, "total": 0} 
@@ -18,98 +125,142 @@ async def process_product_reviews(candidate: ProductCandidate, user_email: str,
     
     print(f"🔍 Memulai Analisis ABSA: {candidate.name[:30]}...")
 
-    # 2. DATABASE PRE-CHECK (Model & User)
-    model_db = await prisma.model.find_first(where={"modelName": "Model XGBoost (Baseline)"})
-    if not model_db:
-        print("❌ ERROR: Model XGBoost tidak ditemukan di database!")
-        return None
-        
-    user_db = await prisma.user.find_unique(where={"email": user_email})
+    # 2. DATABASE PRE-CHECK (User; baris Model sudah dipilih registry model)
+    model_id = serving.spec.model_id
+    with metrics.STAGE_SECONDS.time(stage="prisma_precheck"):
+        user_db = await refs.get_user(user_email)
+
     if not user_db:
         print(f"⚠️ User {user_email} tidak ditemukan!")
+        metrics.CANDIDATES_SKIPPED.inc(reason="user_not_found")
         return None
 
     # 3. PRODUCT PERSISTENCE
     brand_name = clean_product_name(candidate.name.split()[0]) if candidate.name.strip() else "Unknown"
     product_name = clean_product_name(candidate.name)
 
-    product_db = await prisma.product.find_first(where={"url": candidate.url})
-    if not product_db:
-        product_db = await prisma.product.create(
-            data={
-                "name": product_name,
-                "url": candidate.url,
-                "brand": {
-                    "connect_or_create": {
-                        "where": {"name": brand_name}, 
-                        "create": {"name": brand_name}
-                    }
+    with metrics.STAGE_SECONDS.time(stage="product_upsert"):
+        product_db = await prisma.product.find_unique(where={"url": candidate.url})
+        if product_db is None:
+            # Brand hanya dicari/dibuat untuk produk baru. Upsert pada url (@unique): dua request
+            # yang membawa produk baru yang sama tidak gagal di unique constraint
+            product_db = await prisma.product.upsert(
+                where={"url": candidate.url},
+                data={
+                    "create": {
+                        "name": product_name,
+                        "url": candidate.url,
+                        "brandId": await ref_cache.get_brand_id(brand_name),
+                    },
+                    "update": {},
                 },
-            }
-        )
+            )
 
-    # 4. NLP PREDICTION & ASPECT TAGGING LOOP
     total_reviews = len(candidate.reviews)
-    if total_reviews == 0: return None
+    if total_reviews == 0:
+        metrics.CANDIDATES_SKIPPED.inc(reason="no_reviews")
+        return None
+
+    # 4. FINGERPRINT CHECK: set ulasan, versi model & konfigurasi aspek sama dengan analisis terakhir
+    #    -> pakai hasil tersimpan tanpa inferensi maupun tulis ulang ulasan.
+    #    Dibandingkan dengan Metric TERBARU produk saja: Metric lama dengan fingerprint sama
+    #    (set A -> B -> A) tidak cocok dengan baris Review yang tersimpan saat ini.
+    analysis_version = review_cache.analysis_version(serving.spec.version)
+    fingerprint = review_cache.review_set_fingerprint(candidate.reviews, analysis_version)
+
+    with metrics.STAGE_SECONDS.time(stage="fingerprint_check"):
+        previous_metric = await prisma.metric.find_first(
+            where={"productId": product_db.productId},
+            order=[{"createdAt": "desc"}, {"metricId": "desc"}],
+        )
+    if (
+        previous_metric
+        and previous_metric.fingerprint == fingerprint
+        and previous_metric.aspectScores is not None
+    ):
+        print(f"♻️ Ulasan tidak berubah, memakai hasil analisis tersimpan: {candidate.name[:30]}")
+        metrics.FINGERPRINT_HITS.inc()
+        return record_metric_and_build_result(
+            index=index,
+            candidate=candidate,
+            pending=pending,
+            product_db=product_db,
+            model_id=model_id,
+            fingerprint=fingerprint,
+            general_sentiment_pct=previous_metric.generalSentiment,
+            final_aspect_scores=previous_metric.aspectScores,
+            verdict_label=previous_metric.verdict,
+            verdict_summary=previous_metric.topKeywords[0] if previous_metric.topKeywords else "",
+            pos_count=previous_metric.positiveCount,
+            neg_count=previous_metric.negativeCount,
+        )
 
+    # 5. NLP PREDICTION & ASPECT TAGGING LOOP
     pos_count, neg_count = 0, 0
-    reviews_data_to_save = []
-    processed_texts_for_kwd = []
+    reviews_data_to_save = {}
 
-    for raw_text in candidate.reviews:
-        # Preprocessing & Vectorizing
-        clean_text = ml_core.preprocess_text(raw_text) 
-        original_lower = raw_text.lower()      
-        
-        vec = ml_core.vectorizer.transform([clean_text])
-        pred_idx = ml_core.model_optimized.predict(vec)[0]
-        label = ml_core.label_encoder.inverse_transform([pred_idx])[0].lower()
-        
-        # Confidence Score dari XGBoost
-        try:
-            prob = ml_core.model_optimized.predict_proba(vec)[0]
-            confidence_score = float(max(prob))
-        except:
-            confidence_score = 1.0
+    # Cache prediksi: hanya ulasan yang belum pernah dilihat (untuk versi analisis ini) yang diinferensi
+    cache_keys = [review_cache.make_key(raw_text, analysis_version) for raw_text in candidate.reviews]
+    predictions = await review_cache.cache.get_many(cache_keys)
 
-        is_positive = (label == "positif")
+    missed = {key: raw_text for key, raw_text in zip(cache_keys, candidate.reviews) if key not in predictions}
+    metrics.REVIEW_CACHE_HITS.inc(len(cache_keys) - len(missed))
+    if missed:
+        # Preprocessing & prediksi berjalan di worker inferensi agar event loop tetap bebas
+        clean_texts, labels, confidences = await serving.predict(list(missed.values()))
+        metrics.REVIEWS_SCORED.inc(len(missed))
+
+        with metrics.STAGE_SECONDS.time(stage="aspect_match"):
+            matcher = aspect_matcher.get_matcher()
+            new_predictions = {}
+            for (key, raw_text), clean_text, label, confidence_score in zip(missed.items(), clean_texts, labels, confidences):
+                new_predictions[key] = {
+                    "label": label,
+                    "confidence": confidence_score,
+                    "aspects": matcher.match(raw_text.lower(), clean_text),
+                }
+        await review_cache.cache.put_many(new_predictions)
+        predictions.update(new_predictions)
+
+    for raw_text, key in zip(candidate.reviews, cache_keys):
+        prediction = predictions[key]
+
+        is_positive = (prediction["label"] == "positif")
         if is_positive:
             pos_count += 1
-            processed_texts_for_kwd.append(clean_text)
         else:
             neg_count += 1
 
         detected_keywords_from_review = [] 
         
-        for aspect, keywords in config.ASPECT_KEYWORDS.items():
-            matched_words = [k for k in keywords if k in original_lower or k in clean_text]
-            
-            if matched_words:
-                detected_keywords_from_review.extend(matched_words)
-                
-                aspect_stats[aspect]["total"] += 1
-                if is_positive:
-                    aspect_stats[aspect]["positive"] += 1
+        for aspect, matched_words in prediction["aspects"].items():
+            detected_keywords_from_review.extend(matched_words)
+
+            aspect_stats[aspect]["total"] += 1
+            if is_positive:
+                aspect_stats[aspect]["positive"] += 1
 
         final_keywords = list(set(detected_keywords_from_review))
 
-        reviews_data_to_save.append({
+        reviews_data_to_save[review_cache.review_hash(raw_text)] = {
             "content": raw_text,
+            "contentHash": review_cache.review_hash(raw_text),
             "sentiment": Sentiment.POSITIVE if is_positive else Sentiment.NEGATIVE,
-            "confidenceScore": confidence_score,
+            "confidenceScore": prediction["confidence"],
             "keywords": final_keywords,  
             "productId": product_db.productId,
-            "modelId": model_db.modelId,    
+            "modelId": model_id,    
+            "analysisVersion": analysis_version,
             "userId": user_db.id
-        })
+        }
 
-    # 5. DATABASE SYNC (Batch Operations)
+    # 6. DATABASE SYNC: ditulis sekali untuk semua kandidat lewat flush_writes()
     if reviews_data_to_save:
-        async with prisma.tx() as transaction:
-            await transaction.review.delete_many(where={"productId": product_db.productId})
-            await transaction.review.create_many(data=reviews_data_to_save)
+        pending.review_syncs[index] = ReviewSync(
+            product_db.productId, model_id, analysis_version, reviews_data_to_save
+        )
 
-    # 6. CALCULATION & VERDICT GENERATION
+    # 7. CALCULATION & VERDICT GENERATION
     final_aspect_scores = {}
     for aspect, stat in aspect_stats.items():
         score = (stat["positive"] / stat["total"] * 100) if stat["total"] > 0 else 0
@@ -136,34 +287,146 @@ async def process_product_reviews(candidate: ProductCandidate, user_email: str,
     else:
         verdict_label = "Kurang Disarankan"
 
-    # 1. Buat Analysis terlebih dahulu untuk mendapatkan ID-nya
-    new_analysis = await prisma.analysis.create(
-        data={
-            "userId": user_db.id,
-        }
+    return record_metric_and_build_result(
+        index=index,
+        candidate=candidate,
+        pending=pending,
+        product_db=product_db,
+        model_id=model_id,
+        fingerprint=fingerprint,
+        general_sentiment_pct=general_sentiment_pct,
+        final_aspect_scores=final_aspect_scores,
+        verdict_label=verdict_label,
+        verdict_summary=verdict_summary,
+        pos_count=pos_count,
+        neg_count=neg_count,
     )
 
-    # 2. Buat Metric dan hubungkan ke Analysis yang baru saja dibuat
-    await prisma.metric.create(
-        data={
-            "generalSentiment": general_sentiment_pct,
-            "compatibilityScore": general_sentiment_pct,
-            "verdict": verdict_label,
-            "topKeywords": [verdict_summary],
-            "analysisId": new_analysis.analysisId,
-            "productId": product_db.productId,
-            "modelId": model_db.modelId,
-        }
-    )
+def record_metric_and_build_result(
+    index: int,
+    candidate: ProductCandidate,
+    pending: PendingWrites,
+    product_db,
+    model_id: int,
+    fingerprint: str,
+    general_sentiment_pct: float,
+    final_aspect_scores: dict,
+    verdict_label: str,
+    verdict_summary: str,
+    pos_count: int,
+    neg_count: int,
+) -> ProductAnalysisResult:
+    # Metric dicatat dulu; Analysis + semua Metric ditulis sekali oleh flush_writes()
+    pending.metrics[index] = {
+        "generalSentiment": general_sentiment_pct,
+        "compatibilityScore": general_sentiment_pct,
+        "verdict": verdict_label,
+        "topKeywords": [verdict_summary],
+        "aspectScores": Json(final_aspect_scores),
+        "positiveCount": pos_count,
+        "negativeCount": neg_count,
+        "fingerprint": fingerprint,
+        "productId": product_db.productId,
+        "modelId": model_id,
+    }
 
     return ProductAnalysisResult(
         name=candidate.name, 
         url=candidate.url, 
         general_score=general_sentiment_pct,
         aspect_scores=final_aspect_scores, 
-        total_reviews=total_reviews, 
+        total_reviews=pos_count + neg_count, 
         description=verdict_summary,
         positive_count=pos_count, 
         negative_count=neg_count, 
         verdict=verdict_label
-    )
\ No newline at end of file
+    )
+
+async def flush_writes(user_db, pending: PendingWrites):
+    """Menulis semua hasil satu request /recommend dalam satu transaksi:
+    perubahan ulasan semua kandidat + satu Analysis beserta seluruh Metric-nya.
+
+    Diff ulasan dibaca di dalam transaksi yang sama setelah baris Product dikunci, jadi request
+    lain yang menulis ulasan produk yang sama menunggu sampai transaksi ini selesai.
+    """
+    # URL yang sama boleh muncul beberapa kali dalam satu request: kemunculan terakhir menentukan
+    # ulasan tersimpan, dan Metric-nya ditulis paling akhir sehingga menjadi Metric terbaru produk
+    last_index = {metric["productId"]: index for index, metric in sorted(pending.metrics.items())}
+    review_syncs = sorted(
+        (sync for index, sync in pending.review_syncs.items() if last_index[sync.product_id] == index),
+        key=lambda sync: sync.product_id,
+    )
+
+    # seluruh transaksi diukur sebagai write_batch; review_sync_plan adalah bagian bacanya
+    with metrics.STAGE_SECONDS.time(stage="write_batch"):
+        async with prisma.tx() as transaction:
+            with metrics.STAGE_SECONDS.time(stage="review_sync_plan"):
+                review_ops = await plan_review_sync(transaction, review_syncs)
+            await _commit_writes(transaction, user_db, pending, review_ops)
+
+async def _commit_writes(transaction, user_db, pending: PendingWrites, review_ops):
+    stale_reviews = [
+        {"productId": product_id, "contentHash": {"in": stale}}
+        for product_id, stale, _ in review_ops
+        if stale
+    ]
+    if stale_reviews:
+        await transaction.review.delete_many(where={"OR": stale_reviews})
+
+    fresh_reviews = [data for _, _, fresh in review_ops for data in fresh]
+    if fresh_reviews:
+        await transaction.review.create_many(data=fresh_reviews, skip_duplicates=True)
+
+    if pending.metrics:
+        await transaction.analysis.create(
+            data={
+                "userId": user_db.id,
+                "metric": {
+                    "create": [
+                        metric for _, metric in sorted(
+                            pending.metrics.items(), key=lambda item: (item[1]["productId"], item[0])
+                        )
+                    ]
+                },
+            }
+        )
+
+async def plan_review_sync(transaction, review_syncs: List[ReviewSync]):
+    """Diff ulasan terkini dengan yang tersimpan: [(product_id, hash dihapus, data baru)].
+
+    Hanya ulasan baru yang di-insert dan hanya ulasan yang hilang yang dihapus. Ulasan
+    yang tersimpan dari model lain atau versi analisis lain (keyword aspek dari matcher
+    lama) dianggap basi lalu ditulis ulang. Dipanggil di dalam transaksi `transaction`.
+    """
+    if not review_syncs:
+        return []
+
+    product_ids = [sync.product_id for sync in review_syncs]
+    # Kunci baris Product (urut id agar tidak deadlock) sebelum membaca: pada READ COMMITTED
+    # SELECT berikutnya melihat ulasan yang di-commit transaksi lain selama menunggu kunci
+    await transaction.query_raw(
+        'SELECT "productId" FROM "Product" WHERE "productId" = ANY($1) ORDER BY "productId" FOR UPDATE',
+        product_ids,
+    )
+    rows = await transaction.query_raw(
+        'SELECT "productId", "contentHash", "modelId", "analysisVersion" FROM "Review" '
+        'WHERE "productId" = ANY($1)',
+        product_ids,
+    )
+    stored = {}
+    for row in rows:
+        stored.setdefault(row["productId"], {})[row["contentHash"]] = (row["modelId"], row["analysisVersion"])
+
+    review_ops = []
+    for sync in review_syncs:
+        stored_hashes = stored.get(sync.product_id, {})
+        stale = {
+            content_hash for content_hash, version in stored_hashes.items()
+            if content_hash not in sync.reviews or version != (sync.model_id, sync.analysis_version)
+        }
+        fresh = [
+            data for content_hash, data in sync.reviews.items()
+            if content_hash not in stored_hashes or content_hash in stale
+        ]
+        review_ops.append((sync.product_id, sorted(stale), fresh))
+    return review_ops
@@ -0,0 +1,104 @@
+import subprocess
+import sys
+import time
+from pathlib import Path
+import joblib
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# KONFIGURASI PATH
+# ==========================================
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import artifact_bundle
+import config
+import lean_predictor
+import ml_core
+import tree_ensemble
+
+TEST_PATH = config.DATA_DIR / "test" / "data_test_20.csv"
+
+print("--- BUILD SERVING BUNDLE ---")
+
+# 1. Muat artefak sumber (pickle di models/ dan robust_data/tokenize/)
+vectorizer = joblib.load(config.VECTORIZER_PATH)
+label_encoder = joblib.load(config.LABEL_ENCODER_PATH)
+pipeline = joblib.load(config.MODEL_PATH)
+
+steps = list(pipeline.named_steps)
+if steps != ["smote", "selector", "clf"]:
+    print(f"❌ ERROR: Susunan pipeline tidak didukung: {steps}")
+    sys.exit(1)
+
+params = vectorizer.get_params()
+expected = {"analyzer": "word", "ngram_range": (1, 1), "lowercase": True, "norm": "l2",
+            "use_idf": True, "sublinear_tf": False, "binary": False, "stop_words": None,
+            "preprocessor": None, "tokenizer": None, "strip_accents": None}
+unsupported = {name: params[name] for name, value in expected.items() if params[name] != value}
+if unsupported:
+    print(f"❌ ERROR: Parameter vectorizer tidak didukung bundle: {unsupported}")
+    sys.exit(1)
+
+# 2. Tulis bundle (booster UBJSON + array .npy + evaluator NumPy + manifest sha256)
+predictor = lean_predictor.from_pipeline(pipeline)
+ensemble = tree_ensemble.compile_booster(predictor.booster, predictor.columns, predictor.n_features, predictor.iteration_end)
+manifest = artifact_bundle.write_bundle(
+    config.SERVING_BUNDLE_DIR,
+    source_version=ml_core.pickle_version(),
+    vectorizer=vectorizer,
+    label_encoder=label_encoder,
+    predictor=predictor,
+    ensemble=ensemble,
+)
+bundle_bytes = sum(entry["bytes"] for entry in manifest["files"].values())
+pickle_bytes = sum(path.stat().st_size for path in (config.VECTORIZER_PATH, config.LABEL_ENCODER_PATH, config.MODEL_PATH))
+print(f"💾 Bundle disimpan ke: {config.SERVING_BUNDLE_DIR} "
+      f"({len(manifest['files'])} file, {bundle_bytes / 1024:.0f} KB; pickle sumber {pickle_bytes / 1024:.0f} KB)")
+
+# 3. Parity check di split uji robust_data terhadap pipeline pickle. Checksum sha256 dicek penuh
+#    di sini sekali; worker saat serving hanya mencocokkan ukuran file
+_, bundle_vectorizer, bundle_label_encoder, bundle_model, _ = artifact_bundle.load_bundle(config.SERVING_BUNDLE_DIR, verify=True)
+bundle_ensemble = artifact_bundle.load_tree_ensemble(config.SERVING_BUNDLE_DIR, manifest)
+
+texts = pd.read_csv(TEST_PATH)["Cleaned_Review"].fillna("").astype(str).tolist()
+vecs = vectorizer.transform(texts)
+bundle_vecs = bundle_vectorizer.transform(texts)
+
+expected_probs = pipeline.predict_proba(vecs)
+bundle_probs = bundle_model.predict_proba(bundle_vecs)
+if not np.array_equal(expected_probs, bundle_probs):
+    print(f"❌ PARITY GAGAL: selisih probabilitas maksimum {np.abs(expected_probs - bundle_probs).max()}")
+    sys.exit(1)
+if list(bundle_label_encoder.classes_) != list(label_encoder.classes_):
+    print("❌ PARITY GAGAL: kelas label berbeda")
+    sys.exit(1)
+# evaluator NumPy dari array mmap harus sama persis dengan hasil compile_booster
+if not np.array_equal(ensemble.predict_margin(vecs), bundle_ensemble.predict_margin(bundle_vecs)):
+    print("❌ PARITY GAGAL: margin tree ensemble bundle berbeda")
+    sys.exit(1)
+
+print(f"✅ Parity OK: {len(texts)} ulasan uji, probabilitas identik bit-per-bit (xgboost & evaluator NumPy)")
+
+# 4. Waktu muat di proses baru (termasuk impor modul), pickle vs bundle
+LOADERS = {
+    "pickle (joblib)": (
+        "import joblib, config; "
+        "[joblib.load(p) for p in (config.VECTORIZER_PATH, config.LABEL_ENCODER_PATH, config.MODEL_PATH)]"
+    ),
+    "bundle (xgboost)": "import artifact_bundle, config; artifact_bundle.load_bundle(config.SERVING_BUNDLE_DIR)",
+    "bundle (NumPy)": (
+        "import artifact_bundle, config; "
+        "m = artifact_bundle.read_manifest(config.SERVING_BUNDLE_DIR); "
+        "artifact_bundle.load_bundle(config.SERVING_BUNDLE_DIR, load_model=False); "
+        "artifact_bundle.load_tree_ensemble(config.SERVING_BUNDLE_DIR, m)"
+    ),
+}
+for name, code in LOADERS.items():
+    timer = f"import time; t = time.perf_counter(); {code}; print(time.perf_counter() - t)"
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", timer], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    print(f"⏱️ Muat {name}: {float(output.strip().splitlines()[-1]):.3f} detik")
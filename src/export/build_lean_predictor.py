@@ -0,0 +1,69 @@
+import sys
+import time
+from pathlib import Path
+import joblib
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# KONFIGURASI PATH
+# ==========================================
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import config
+import lean_predictor
+import ml_core
+
+TEST_PATH = config.DATA_DIR / "test" / "data_test_20.csv"
+
+print("--- BUILD LEAN PREDICTOR ---")
+
+# 1. Muat pipeline hasil training (imblearn: smote -> selector -> clf)
+vectorizer = joblib.load(config.VECTORIZER_PATH)
+pipeline = joblib.load(config.MODEL_PATH)
+
+steps = list(pipeline.named_steps)
+if steps != ["smote", "selector", "clf"]:
+    print(f"❌ ERROR: Susunan pipeline tidak didukung: {steps}")
+    sys.exit(1)
+
+# 2. Export: indeks kolom chi2 + booster mentah
+predictor = lean_predictor.from_pipeline(pipeline)
+lean_predictor.save_predictor(predictor, config.LEAN_PREDICTOR_PATH, source_version=ml_core.pickle_version())
+print(f"💾 Lean predictor disimpan ke: {config.LEAN_PREDICTOR_PATH} "
+      f"({config.LEAN_PREDICTOR_PATH.stat().st_size / 1024:.0f} KB, {len(predictor.columns)} kolom)")
+
+# 3. Parity check di split uji robust_data: probabilitas harus identik bit-per-bit
+lean, _ = lean_predictor.load_predictor(config.LEAN_PREDICTOR_PATH)
+texts = pd.read_csv(TEST_PATH)["Cleaned_Review"].fillna("").astype(str).tolist()
+vecs = vectorizer.transform(texts)
+
+start = time.perf_counter()
+expected_probs = pipeline.predict_proba(vecs)
+pipeline_seconds = time.perf_counter() - start
+
+start = time.perf_counter()
+lean_probs = lean.predict_proba(vecs)
+lean_seconds = time.perf_counter() - start
+
+if expected_probs.dtype != lean_probs.dtype or not np.array_equal(expected_probs, lean_probs):
+    print(f"❌ PARITY GAGAL: selisih maksimum {np.abs(expected_probs - lean_probs).max()}")
+    sys.exit(1)
+
+print(f"✅ Parity OK: {len(texts)} ulasan uji, probabilitas identik bit-per-bit")
+print(f"⏱️ predict_proba: pipeline {pipeline_seconds * 1000:.1f} ms | lean {lean_seconds * 1000:.1f} ms")
+
+# 4. Overhead per panggilan (batch kecil = kasus umum micro-batch)
+for batch_size in (1, 32, 512):
+    batch = vecs[:batch_size]
+    timings = {}
+    for name, model in (("pipeline", pipeline), ("lean", lean)):
+        model.predict_proba(batch)
+        runs = max(5, 2000 // batch_size)
+        start = time.perf_counter()
+        for _ in range(runs):
+            model.predict_proba(batch)
+        timings[name] = (time.perf_counter() - start) / runs * 1000
+    print(f"   batch {batch_size:>4}: pipeline {timings['pipeline']:.3f} ms | lean {timings['lean']:.3f} ms")
@@ -0,0 +1,107 @@
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+import joblib
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# KONFIGURASI PATH
+# ==========================================
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import config
+import lean_predictor
+import ml_core
+import narrow_vectorizer
+
+TEST_PATH = config.DATA_DIR / "test" / "data_test_20.csv"
+
+print("--- BUILD NARROW VECTORIZER ---")
+
+# 1. Muat artefak sumber (TfidfVectorizer + pipeline smote -> selector -> clf)
+vectorizer = joblib.load(config.VECTORIZER_PATH)
+pipeline = joblib.load(config.MODEL_PATH)
+
+steps = list(pipeline.named_steps)
+if steps != ["smote", "selector", "clf"]:
+    print(f"❌ ERROR: Susunan pipeline tidak didukung: {steps}")
+    sys.exit(1)
+
+params = vectorizer.get_params()
+expected = {"analyzer": "word", "ngram_range": (1, 1), "lowercase": True, "norm": "l2",
+            "use_idf": True, "sublinear_tf": False, "binary": False, "stop_words": None,
+            "preprocessor": None, "tokenizer": None, "strip_accents": None}
+unsupported = {name: params[name] for name, value in expected.items() if params[name] != value}
+if unsupported:
+    print(f"❌ ERROR: Parameter vectorizer tidak didukung narrow vectorizer: {unsupported}")
+    sys.exit(1)
+
+# 2. Export: vocabulary + idf + kolom output hasil seleksi chi2
+narrow = narrow_vectorizer.from_pipeline(vectorizer, pipeline)
+narrow_vectorizer.save_vectorizer(narrow, config.NARROW_VECTORIZER_PATH, source_version=ml_core.pickle_version())
+print(f"💾 Narrow vectorizer disimpan ke: {config.NARROW_VECTORIZER_PATH} "
+      f"({config.NARROW_VECTORIZER_PATH.stat().st_size / 1024:.0f} KB, {narrow.n_features} dari {len(narrow.idf)} term "
+      f"jadi kolom; TfidfVectorizer pickle {config.VECTORIZER_PATH.stat().st_size / 1024:.0f} KB)")
+
+# 3. Parity check di split uji robust_data: matriks harus identik dengan TfidfVectorizer -> selector
+narrow, _ = narrow_vectorizer.load_vectorizer(config.NARROW_VECTORIZER_PATH)
+selector = pipeline.named_steps["selector"]
+texts = pd.read_csv(TEST_PATH)["Cleaned_Review"].fillna("").astype(str).tolist()
+
+expected_vecs = selector.transform(vectorizer.transform(texts)).tocsr()
+expected_vecs.sort_indices()
+narrow_vecs = narrow.transform(texts)
+
+same_matrix = (
+    expected_vecs.shape == narrow_vecs.shape
+    and expected_vecs.dtype == narrow_vecs.dtype
+    and np.array_equal(expected_vecs.indptr, narrow_vecs.indptr)
+    and np.array_equal(expected_vecs.indices, narrow_vecs.indices)
+    and np.array_equal(expected_vecs.data, narrow_vecs.data)
+)
+if not same_matrix:
+    print(f"❌ PARITY GAGAL: matriks TF-IDF berbeda (selisih maksimum {abs(expected_vecs - narrow_vecs).max()})")
+    sys.exit(1)
+if list(narrow.get_feature_names_out()) != list(vectorizer.get_feature_names_out()[selector.get_support()]):
+    print("❌ PARITY GAGAL: nama fitur berbeda")
+    sys.exit(1)
+
+expected_probs = pipeline.predict_proba(vectorizer.transform(texts))
+narrow_probs = lean_predictor.from_pipeline(pipeline).predict_proba(narrow_vecs)
+if not np.array_equal(expected_probs, narrow_probs):
+    print(f"❌ PARITY GAGAL: selisih probabilitas maksimum {np.abs(expected_probs - narrow_probs).max()}")
+    sys.exit(1)
+
+print(f"✅ Parity OK: {len(texts)} ulasan uji, matriks TF-IDF & probabilitas identik bit-per-bit")
+
+# 4. Waktu transform per batch dan alokasi memori (muat + transform)
+for batch_size in (1, 32, 512):
+    batch = texts[:batch_size]
+    runs = max(5, 2000 // batch_size)
+    timings = {}
+    for name, fn in (
+        ("tfidf+selector", lambda: selector.transform(vectorizer.transform(batch))),
+        ("narrow", lambda: narrow.transform(batch)),
+    ):
+        fn()
+        start = time.perf_counter()
+        for _ in range(runs):
+            fn()
+        timings[name] = (time.perf_counter() - start) / runs * 1000
+    print(f"   batch {batch_size:>4}: tfidf+selector {timings['tfidf+selector']:.3f} ms | narrow {timings['narrow']:.3f} ms")
+
+for name, fn in (
+    ("muat TfidfVectorizer pickle", lambda: joblib.load(config.VECTORIZER_PATH)),
+    ("muat narrow vectorizer", lambda: narrow_vectorizer.load_vectorizer(config.NARROW_VECTORIZER_PATH)),
+    (f"transform {len(texts)} ulasan, tfidf+selector", lambda: selector.transform(vectorizer.transform(texts))),
+    (f"transform {len(texts)} ulasan, narrow", lambda: narrow.transform(texts)),
+):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"   puncak alokasi {name}: {peak / 1024:.0f} KB")
@@ -0,0 +1,52 @@
+import json
+import sys
+import time
+from pathlib import Path
+import pandas as pd
+from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
+
+# ==========================================
+# KONFIGURASI PATH
+# ==========================================
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import batch_normalizer
+import config
+import stem_cache
+
+DATASET_PATH = config.DATA_DIR / "dataset" / "trimmed_sentiment_dataset.csv"
+
+print("--- BUILD KAMUS STEM (PRE-STEM SELURUH KOSAKATA DATASET) ---")
+
+if not DATASET_PATH.exists():
+    print(f"❌ ERROR: Dataset tidak ditemukan → {DATASET_PATH}")
+    sys.exit(1)
+
+df = pd.read_csv(DATASET_PATH)
+# stemmer belum dipakai: tokenize() berhenti tepat sebelum stemming
+normalizer = batch_normalizer.BatchNormalizer(StopWordRemoverFactory().get_stop_words(), stemmer=None)
+
+# 1. Kumpulkan kosakata persis seperti token yang sampai ke stemmer:
+#    - serving  : Review mentah -> lower -> stopword.remove (ml_core.preprocess_batch)
+#    - training : Cleaned_Review -> stopword.remove (src/utils/preprocessing.py)
+vocabulary = set()
+for tokens in normalizer.tokenize(df["Review"].fillna("").astype(str).tolist(), lowercase=True):
+    vocabulary.update(tokens)
+for tokens in normalizer.tokenize(df["Cleaned_Review"].fillna("").astype(str).tolist(), lowercase=False):
+    vocabulary.update(tokens)
+vocabulary.discard('')
+print(f"✅ Kosakata unik: {len(vocabulary)} kata")
+
+# 2. Stem setiap kata sekali saja
+word_stemmer = stem_cache.create_word_stemmer()
+start_time = time.time()
+stem_dictionary = {word: word_stemmer.stem_word(word) for word in sorted(vocabulary)}
+print(f"✅ Stemming selesai dalam {time.time() - start_time:.1f} detik")
+
+# 3. Simpan artefak (dimuat oleh ml_core.load_ml_assets)
+with open(config.STEM_DICT_PATH, "w", encoding="utf-8") as f:
+    json.dump(stem_dictionary, f, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+
+print(f"💾 Kamus stem disimpan ke: {config.STEM_DICT_PATH}")
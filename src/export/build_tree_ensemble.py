@@ -0,0 +1,68 @@
+import sys
+from pathlib import Path
+import joblib
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# KONFIGURASI PATH
+# ==========================================
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import config
+import lean_predictor
+import ml_core
+import tree_ensemble
+
+TEST_PATH = config.DATA_DIR / "test" / "data_test_20.csv"
+
+print("--- BUILD TREE ENSEMBLE (evaluator NumPy) ---")
+
+# 1. Kompilasi booster pipeline ke array datar
+vectorizer = joblib.load(config.VECTORIZER_PATH)
+pipeline = joblib.load(config.MODEL_PATH)
+predictor = lean_predictor.from_pipeline(pipeline)
+ensemble = tree_ensemble.compile_booster(
+    predictor.booster, predictor.columns, predictor.n_features, predictor.iteration_end
+)
+tree_ensemble.save_ensemble(ensemble, config.TREE_ENSEMBLE_PATH, source_version=ml_core.pickle_version())
+print(f"💾 Tree ensemble disimpan ke: {config.TREE_ENSEMBLE_PATH} "
+      f"({config.TREE_ENSEMBLE_PATH.stat().st_size / 1024:.0f} KB, {len(ensemble.roots)} pohon, "
+      f"{len(ensemble.feature)} node, kedalaman {ensemble.max_depth})")
+
+# 2. Parity check di split uji robust_data terhadap pipeline
+ensemble, _ = tree_ensemble.load_ensemble(config.TREE_ENSEMBLE_PATH)
+texts = pd.read_csv(TEST_PATH)["Cleaned_Review"].fillna("").astype(str).tolist()
+vecs = vectorizer.transform(texts)
+
+# margin (jumlah leaf) harus identik bit-per-bit
+expected_margins = predictor.booster.inplace_predict(predictor.select(vecs), predict_type="margin")
+if not np.array_equal(expected_margins, ensemble.predict_margin(vecs)):
+    print("❌ PARITY GAGAL: margin berbeda dari XGBoost")
+    sys.exit(1)
+# batch kecil memakai jalur tanpa penyaringan fitur: dicek per baris
+single_margins = np.vstack([ensemble.predict_margin(vecs[i:i + 1]) for i in range(vecs.shape[0])])
+if not np.array_equal(expected_margins, single_margins):
+    print("❌ PARITY GAGAL: margin batch 1 berbeda dari XGBoost")
+    sys.exit(1)
+
+# probabilitas: paling jauh 1 ulp (exp libm vs exp NumPy), label identik
+expected_probs = pipeline.predict_proba(vecs)
+numpy_probs = ensemble.predict_proba(vecs)
+if expected_probs.dtype != numpy_probs.dtype:
+    print(f"❌ PARITY GAGAL: dtype {numpy_probs.dtype} != {expected_probs.dtype}")
+    sys.exit(1)
+try:
+    np.testing.assert_array_max_ulp(expected_probs, numpy_probs, maxulp=1)
+except AssertionError as e:
+    print(f"❌ PARITY GAGAL: selisih probabilitas > 1 ulp\n{e}")
+    sys.exit(1)
+if not np.array_equal(expected_probs.argmax(axis=1), numpy_probs.argmax(axis=1)):
+    print("❌ PARITY GAGAL: label prediksi berbeda")
+    sys.exit(1)
+
+differing = int((expected_probs != numpy_probs).sum())
+print(f"✅ Parity OK: {len(texts)} ulasan uji, margin identik bit-per-bit, label identik, "
+      f"{differing}/{expected_probs.size} probabilitas berbeda 1 ulp")
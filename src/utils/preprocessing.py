@@ -1,7 +1,16 @@
+import sys
 import pandas as pd
-from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+from pathlib import Path
 from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
 
+# Stemmer dibagi dengan server (stem_cache.py di root proyek)
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import batch_normalizer
+import config
+import stem_cache
+
 # 1. Load Data
 df = pd.read_csv('trimmed_sentiment_dataset.csv')
 
@@ -9,24 +18,21 @@ df = pd.read_csv('trimmed_sentiment_dataset.csv')
 df = df.dropna(subset=['Cleaned_Review'])
 
 # 2. Siapkan Stemmer & Stopword Remover
-factory_stem = StemmerFactory()
-stemmer = factory_stem.create_stemmer()
+# Kamus stem prebuilt + LRU, hasil identik dengan StemmerFactory().create_stemmer()
+stemmer = stem_cache.create_stem_cache(config.STEM_DICT_PATH, config.STEM_CACHE_SIZE)
 
 factory_stop = StopWordRemoverFactory()
 stopword = factory_stop.create_stop_word_remover()
 
-# 3. Fungsi Preprocessing Lanjutan
-def finish_preprocessing(text):
-    # a. Stopword Removal
-    text = stopword.remove(text)
-    # b. Stemming
-    text = stemmer.stem(text)
-    return text
+# 3. Preprocessing Lanjutan: Stopword Removal + Stemming untuk seluruh kolom sekaligus
+# (hasil identik dengan stopword.remove(text) lalu stemmer.stem(text) per baris)
+normalizer = batch_normalizer.from_stopword_remover(stopword, stemmer)
 
-print("Sedang memproses Stopword & Stemming... (Bisa memakan waktu beberapa menit)")
-# Terapkan ke kolom Cleaned_Review
-df['Cleaned_Review'] = df['Cleaned_Review'].apply(finish_preprocessing)
+print("Sedang memproses Stopword & Stemming...")
+# Terapkan ke kolom Cleaned_Review (tanpa lower di awal, sama seperti sebelumnya)
+df['Cleaned_Review'] = normalizer.normalize(df['Cleaned_Review'].astype(str).tolist(), lowercase=False)
 
 # 4. Simpan hasilnya
 df.to_csv('dataset_fix_preprocessed.csv', index=False)
-print("Selesai! File tersimpan sebagai 'dataset_fix_preprocessed.csv'")
\ No newline at end of file
+print("Selesai! File tersimpan sebagai 'dataset_fix_preprocessed.csv'")
+print(f"Statistik cache stem: {stemmer.stats()}")
\ No newline at end of file
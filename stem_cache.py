@@ -0,0 +1,107 @@
+import json
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict
+from Sastrawi.Stemmer.Stemmer import Stemmer
+from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+
+# Sama persis dengan Sastrawi.Stemmer.Filter.TextNormalizer.normalize_text
+_NON_ALNUM = re.compile(r'[^a-z0-9 -]', re.IGNORECASE | re.MULTILINE)
+_MULTI_SPACE = re.compile(r'( +)', re.IGNORECASE | re.MULTILINE)
+
+def normalize_text(text: str) -> str:
+    result = text.lower()
+    result = _NON_ALNUM.sub(' ', result)
+    result = _MULTI_SPACE.sub(' ', result)
+    return result.strip()
+
+class SetDictionary:
+    """Pengganti ArrayDictionary Sastrawi: contains() memakai set, bukan scan list ~30rb kata"""
+
+    def __init__(self, words):
+        self.words = {word for word in words if word and word.strip() != ''}
+
+    def contains(self, word: str) -> bool:
+        return word in self.words
+
+    def count(self) -> int:
+        return len(self.words)
+
+def create_word_stemmer(root_words=None) -> Stemmer:
+    """Stemmer Sastrawi tanpa CachedStemmer bawaan (cache-nya tidak dibatasi).
+
+    root_words default-nya kamus kata dasar bawaan Sastrawi.
+    """
+    if root_words is None:
+        root_words = StemmerFactory().get_words()
+    return Stemmer(SetDictionary(root_words))
+
+def load_stem_dictionary(path: Path) -> Dict[str, str]:
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+class StemCache:
+    """Stemming per token dengan dua lapis cache.
+
+    Kamus prebuilt (hasil src/export/build_stem_dictionary.py) dibaca lebih dulu,
+    lalu LRU berukuran tetap untuk kata di luar kosakata dataset. Hasil stem() identik
+    dengan stemmer.stem(text) milik Sastrawi. Aman dipakai bersamaan dari beberapa thread
+    (mode inline INFERENCE_WORKERS=0 menjalankan preprocessing di thread pool).
+    """
+
+    def __init__(self, word_stemmer: Stemmer, maxsize: int, prebuilt: Dict[str, str] = None):
+        self.word_stemmer = word_stemmer
+        self.maxsize = maxsize
+        self.prebuilt = prebuilt or {}
+        self._lru = OrderedDict()
+        # get + move_to_end + eviction LRU harus atomik terhadap thread lain
+        self._lock = threading.Lock()
+
+        self.prebuilt_hits = 0
+        self.lru_hits = 0
+        self.misses = 0
+
+    def stem_word(self, word: str) -> str:
+        stem = self.prebuilt.get(word)
+        if stem is not None:
+            self.prebuilt_hits += 1
+            return stem
+
+        with self._lock:
+            stem = self._lru.get(word)
+            if stem is not None:
+                self._lru.move_to_end(word)
+                self.lru_hits += 1
+                return stem
+            self.misses += 1
+
+        # stemming berjalan tanpa lock; dua thread yang meleset pada kata sama menghasilkan stem sama
+        stem = self.word_stemmer.stem_word(word)
+        if self.maxsize:
+            with self._lock:
+                self._lru[word] = stem
+                self._lru.move_to_end(word)
+                if len(self._lru) > self.maxsize:
+                    self._lru.popitem(last=False)
+        return stem
+
+    def stem(self, text: str) -> str:
+        return ' '.join(self.stem_word(word) for word in normalize_text(text).split(' '))
+
+    def stats(self) -> dict:
+        lookups = self.prebuilt_hits + self.lru_hits + self.misses
+        return {
+            "prebuilt_hits": self.prebuilt_hits,
+            "lru_hits": self.lru_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.prebuilt_hits + self.lru_hits) / lookups, 4) if lookups else 0.0,
+            "prebuilt_words": len(self.prebuilt),
+            "lru_items": len(self._lru),
+        }
+
+def create_stem_cache(dict_path: Path, maxsize: int) -> StemCache:
+    return StemCache(create_word_stemmer(), maxsize, load_stem_dictionary(dict_path))
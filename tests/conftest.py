@@ -0,0 +1,93 @@
+"""Fixture bersama: artefak yang di-commit di models/ dan sampel tetap split uji robust_data.
+
+Tes parity membandingkan jalur serving hasil export dengan pipeline pickle asli, jadi
+artefak export yang basi (dibuat dari pickle lain) langsung ketahuan.
+"""
+import sys
+import warnings
+from pathlib import Path
+from types import SimpleNamespace
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import artifact_bundle
+import config
+import lean_predictor
+import narrow_vectorizer
+import tree_ensemble
+
+TEST_PATH = config.DATA_DIR / "test" / "data_test_20.csv"
+# Sampel tetap (random_state) dari split uji agar hasil tes stabil antar run
+SAMPLE_SIZE = 256
+SAMPLE_SEED = 20
+# Toleransi probabilitas float32 evaluator NumPy terhadap XGBoost: margin identik, tetapi
+# softmax-nya boleh beda 1 ulp (expf libm vs exp yang dibulatkan, lihat tree_ensemble._softmax)
+PROB_MAX_ULP = 1
+
+@pytest.fixture(scope="session")
+def test_reviews() -> pd.DataFrame:
+    df = pd.read_csv(TEST_PATH)
+    return df.sample(n=SAMPLE_SIZE, random_state=SAMPLE_SEED).fillna("").reset_index(drop=True)
+
+@pytest.fixture(scope="session")
+def texts(test_reviews) -> list:
+    """Cleaned_Review: teks yang sudah dipreprocess, input vectorizer"""
+    return test_reviews["Cleaned_Review"].astype(str).tolist()
+
+@pytest.fixture(scope="session")
+def vectorizer():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return joblib.load(config.VECTORIZER_PATH)
+
+@pytest.fixture(scope="session")
+def label_encoder():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return joblib.load(config.LABEL_ENCODER_PATH)
+
+@pytest.fixture(scope="session")
+def pipeline():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return joblib.load(config.MODEL_PATH)
+
+@pytest.fixture(scope="session")
+def expected(pipeline, vectorizer, label_encoder, texts):
+    """(probabilitas, label) pipeline pickle asli untuk sampel uji"""
+    probs = pipeline.predict_proba(vectorizer.transform(texts))
+    return probs, label_encoder.inverse_transform(np.argmax(probs, axis=1))
+
+@pytest.fixture(scope="session")
+def export_artifacts():
+    """Artefak export terpisah (src/export/build_*.py) beserta versi pickle sumbernya"""
+    predictor, predictor_version = lean_predictor.load_predictor(config.LEAN_PREDICTOR_PATH)
+    narrow, narrow_version = narrow_vectorizer.load_vectorizer(config.NARROW_VECTORIZER_PATH)
+    ensemble, ensemble_version = tree_ensemble.load_ensemble(config.TREE_ENSEMBLE_PATH)
+    return SimpleNamespace(
+        predictor=predictor,
+        narrow=narrow,
+        ensemble=ensemble,
+        source_versions={"predictor": predictor_version, "narrow": narrow_version, "ensemble": ensemble_version},
+    )
+
+@pytest.fixture(scope="session")
+def bundle_artifacts():
+    """Komponen yang sama dibaca dari serving bundle (array mmap, layout evaluasi tersimpan)"""
+    manifest, narrow, _, predictor, _ = artifact_bundle.load_bundle(config.SERVING_BUNDLE_DIR)
+    return SimpleNamespace(
+        predictor=predictor,
+        narrow=narrow,
+        ensemble=artifact_bundle.load_tree_ensemble(config.SERVING_BUNDLE_DIR, manifest),
+        source_versions=dict.fromkeys(("predictor", "narrow", "ensemble"), manifest["source_version"]),
+    )
+
+@pytest.fixture(scope="session", params=["export", "bundle"])
+def serving_artifacts(request):
+    """Tes parity dijalankan untuk artefak export maupun serving bundle"""
+    return request.getfixturevalue(f"{request.param}_artifacts")
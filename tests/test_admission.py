@@ -0,0 +1,124 @@
+"""AdmissionGate: jatah ulasan, antrean prioritas, penggeseran dan timeout."""
+import asyncio
+
+import pytest
+
+import admission
+
+def make_gate(pending=10, queued=20, wait=1.0):
+    return admission.AdmissionGate(max_pending_reviews=pending, max_queued_reviews=queued, max_wait_seconds=wait)
+
+async def settle():
+    # beri kesempatan waiter yang future-nya baru diisi untuk berjalan
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+def test_admits_while_reviews_fit():
+    async def main():
+        gate = make_gate(pending=10)
+        first = await gate.acquire(6)
+        second = await gate.acquire(4)
+        assert (gate.inflight_requests, gate.inflight_reviews) == (2, 10)
+
+        first.release()
+        first.release()  # idempoten
+        second.release()
+        assert (gate.inflight_requests, gate.inflight_reviews) == (0, 0)
+
+    asyncio.run(main())
+
+def test_waiters_are_admitted_smallest_first():
+    async def main():
+        gate = make_gate(pending=10)
+        running = await gate.acquire(10)
+        order = []
+
+        async def request(reviews):
+            ticket = await gate.acquire(reviews)
+            order.append(reviews)
+            return ticket
+
+        large = asyncio.create_task(request(8))
+        await settle()
+        small = asyncio.create_task(request(2))
+        await settle()
+        assert gate.stats()["queued_requests"] == 2
+
+        running.release()
+        tickets = await asyncio.gather(large, small)
+        # 2 + 8 muat bersamaan, tetapi yang kecil masuk lebih dulu
+        assert order == [2, 8]
+        for ticket in tickets:
+            ticket.release()
+
+    asyncio.run(main())
+
+def test_full_queue_rejects_or_evicts_larger_waiters():
+    async def main():
+        gate = make_gate(pending=10, queued=10)
+        running = await gate.acquire(10)
+        large = asyncio.create_task(gate.acquire(9))
+        await settle()
+
+        # antrean penuh untuk request sebesar ini dan tidak ada waiter yang lebih besar: 429
+        with pytest.raises(admission.AdmissionRejected) as rejected:
+            await gate.acquire(10)
+        assert (rejected.value.status_code, rejected.value.reason) == (429, "queue_full")
+
+        # request kecil menggeser waiter besar
+        small = asyncio.create_task(gate.acquire(3))
+        await settle()
+        with pytest.raises(admission.AdmissionRejected) as evicted:
+            await large
+        assert evicted.value.reason == "evicted"
+        assert gate.queued_reviews == 3
+
+        running.release()
+        (await small).release()
+        assert gate.stats()["evicted"] == 1
+
+    asyncio.run(main())
+
+def test_wait_timeout_rejects_with_503():
+    async def main():
+        gate = make_gate(pending=5, wait=0.05)
+        running = await gate.acquire(5)
+        with pytest.raises(admission.AdmissionRejected) as rejected:
+            await gate.acquire(1)
+        assert rejected.value.status_code == 503
+        assert rejected.value.retry_after >= 1
+        assert gate.queued_reviews == 0
+        running.release()
+
+    asyncio.run(main())
+
+def test_forced_and_oversized_requests():
+    async def main():
+        gate = make_gate(pending=10)
+        running = await gate.acquire(10)
+        # worker job selalu masuk tetapi tetap dihitung
+        forced = await gate.acquire(4, force=True)
+        assert gate.inflight_reviews == 14
+        forced.release()
+        running.release()
+
+        # lebih besar dari kapasitas: dihitung sebesar kapasitas, jalan saat gate kosong
+        oversized = await gate.acquire(50)
+        assert (oversized.reviews, oversized.charge, gate.inflight_reviews) == (50, 10, 10)
+        oversized.release()
+
+    asyncio.run(main())
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def main():
+        gate = make_gate(pending=5)
+        running = await gate.acquire(5)
+        waiter = asyncio.create_task(gate.acquire(2))
+        await settle()
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert (gate.queued_reviews, gate.stats()["queued_requests"]) == (0, 0)
+        running.release()
+        assert gate.inflight_reviews == 0
+
+    asyncio.run(main())
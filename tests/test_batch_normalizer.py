@@ -0,0 +1,45 @@
+import pytest
+import batch_normalizer
+import ml_core
+
+@pytest.fixture(scope="module")
+def assets():
+    return ml_core.load_assets()
+
+@pytest.fixture(scope="module")
+def raw_reviews(test_reviews):
+    """Review: teks mentah seperti yang diterima /recommend"""
+    return test_reviews["Review"].astype(str).tolist()
+
+def test_serving_matches_preprocess_text(assets, raw_reviews):
+    expected = [ml_core.preprocess_text(text, assets) for text in raw_reviews]
+    assert assets.normalizer.normalize(raw_reviews) == expected
+    assert ml_core.preprocess_batch(raw_reviews, assets) == expected
+
+def test_training_matches_sastrawi(assets, texts):
+    # src/utils/preprocessing.py: stopword.remove + stemmer.stem tanpa lower di awal
+    expected = [assets.stemmer.stem(assets.stopword.remove(text)) for text in texts]
+    assert assets.normalizer.normalize(texts, lowercase=False) == expected
+
+@pytest.mark.parametrize("batch_size", [1, 7])
+def test_batch_size_does_not_change_output(assets, raw_reviews, batch_size):
+    expected = assets.normalizer.normalize(raw_reviews)
+    batched = []
+    for start in range(0, len(raw_reviews), batch_size):
+        batched.extend(assets.normalizer.normalize(raw_reviews[start:start + batch_size]))
+    assert batched == expected
+
+def test_consecutive_stopwords_quirk(assets):
+    # StopWordRemover Sastrawi menghapus dari list yang sedang diiterasi: stopword kedua
+    # dari dua yang berurutan terlewati dan tetap ada di output
+    assert {"yang", "dan"} <= assets.normalizer.stopwords
+    text = "laptop yang dan baterai awet"
+    assert assets.stopword.remove(text) == "laptop dan baterai awet"
+    assert batch_normalizer.remove_stopwords(text.split(" "), assets.normalizer.stopwords) == [
+        "laptop", "dan", "baterai", "awet"
+    ]
+    assert assets.normalizer.normalize([text]) == [ml_core.preprocess_text(text, assets)]
+
+@pytest.mark.parametrize("text", ["", "   ", "!!!", "Yang", "harga-nya MURAH,, cepat\tsampai"])
+def test_edge_cases_match_preprocess_text(assets, text):
+    assert assets.normalizer.normalize([text]) == [ml_core.preprocess_text(text, assets)]
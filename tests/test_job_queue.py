@@ -0,0 +1,156 @@
+"""JobQueue SQLite: lease, klaim ulang job yang pemiliknya mati, retry dan batas kedalaman."""
+import asyncio
+
+import pytest
+
+import job_queue
+
+def make_queue(path, **overrides):
+    settings = dict(
+        workers=1, max_depth=10, max_attempts=3, retry_backoff=0.0, result_ttl=60.0, lease_seconds=0.3,
+    )
+    settings.update(overrides)
+    queue = job_queue.JobQueue(path, **settings)
+    queue.open()
+    return queue
+
+def always_ready():
+    return True
+
+def test_job_runs_and_wait_returns_the_result(tmp_path):
+    async def main():
+        queue = make_queue(tmp_path / "jobs.sqlite3")
+
+        async def handler(payload):
+            return {"double": payload["n"] * 2}
+
+        queue.start(handler, always_ready)
+        job = await queue.submit_async({"n": 21})
+        done = await queue.wait(job["job_id"], timeout=5)
+        await queue.stop()
+        return queue, done
+
+    queue, done = asyncio.run(main())
+    assert (done["status"], done["result"], done["attempts"]) == ("done", {"double": 42}, 1)
+    assert queue._changed == {}
+
+def test_failures_are_retried_until_max_attempts(tmp_path):
+    async def main():
+        queue = make_queue(tmp_path / "jobs.sqlite3", max_attempts=2)
+        calls = []
+
+        async def handler(payload):
+            calls.append(payload["kind"])
+            if payload["kind"] == "permanent":
+                raise job_queue.PermanentJobError("tidak ada ulasan")
+            if payload["kind"] == "broken":
+                raise RuntimeError("selalu gagal")
+            if calls.count("flaky") == 1:
+                raise RuntimeError("gagal sementara")
+            return {}
+
+        queue.start(handler, always_ready)
+        jobs = {kind: await queue.submit_async({"kind": kind}) for kind in ("flaky", "broken", "permanent")}
+        results = {kind: await queue.wait(job["job_id"], timeout=5) for kind, job in jobs.items()}
+        await queue.stop()
+        return queue, results, calls
+
+    queue, results, calls = asyncio.run(main())
+    assert (results["flaky"]["status"], results["flaky"]["attempts"]) == ("done", 2)
+    assert (results["broken"]["status"], results["broken"]["attempts"]) == ("failed", 2)
+    assert results["broken"]["error"] == "selalu gagal"
+    # kegagalan permanen tidak diulang
+    assert (results["permanent"]["status"], calls.count("permanent")) == ("failed", 1)
+    assert queue.retried == 2
+
+def test_running_job_is_not_stolen_while_its_lease_is_renewed(tmp_path):
+    async def main():
+        path = tmp_path / "jobs.sqlite3"
+        owner, sibling = make_queue(path), make_queue(path)
+        runs = []
+
+        async def slow(payload):
+            runs.append(payload["n"])
+            await asyncio.sleep(1.0)
+            return {}
+
+        owner.start(slow, always_ready)
+        job = await owner.submit_async({"n": 1})
+        await asyncio.sleep(0.1)
+        # proses lain menyala di tengah job: lease diperpanjang heartbeat, jadi tidak diklaim
+        sibling.start(slow, always_ready)
+        done = await sibling.wait(job["job_id"], timeout=5)
+        await asyncio.gather(owner.stop(), sibling.stop())
+        return done, runs, sibling
+
+    done, runs, sibling = asyncio.run(main())
+    assert (done["status"], done["attempts"], runs) == ("done", 1, [1])
+    assert sibling.reclaimed == 0
+
+def test_expired_lease_is_reclaimed_by_another_process(tmp_path):
+    async def main():
+        path = tmp_path / "jobs.sqlite3"
+        crashed, survivor = make_queue(path), make_queue(path)
+        runs = []
+
+        async def handler(payload):
+            runs.append(payload["n"])
+            await asyncio.sleep(10 if len(runs) == 1 else 0)
+            return {"n": payload["n"]}
+
+        crashed.start(handler, always_ready)
+        job = await crashed.submit_async({"n": 7})
+        await asyncio.sleep(0.1)
+        # proses mati: task berhenti tanpa melepas job (heartbeat ikut berhenti)
+        for task in crashed._tasks:
+            task.cancel()
+        await asyncio.gather(*crashed._tasks, return_exceptions=True)
+
+        survivor.start(handler, always_ready)
+        done = await survivor.wait(job["job_id"], timeout=5)
+        await survivor.stop()
+        return done, runs, survivor
+
+    done, runs, survivor = asyncio.run(main())
+    assert (done["status"], done["result"], done["attempts"]) == ("done", {"n": 7}, 2)
+    assert runs == [7, 7]
+    assert survivor.reclaimed == 1
+
+def test_stop_returns_owned_jobs_to_the_queue(tmp_path):
+    async def main():
+        queue = make_queue(tmp_path / "jobs.sqlite3", lease_seconds=30)
+
+        async def handler(payload):
+            await asyncio.sleep(10)
+
+        queue.start(handler, always_ready)
+        job = await queue.submit_async({})
+        await asyncio.sleep(0.1)
+        await queue.stop()
+        return queue.get(job["job_id"])
+
+    assert asyncio.run(main())["status"] == "queued"
+
+def test_submit_rejects_when_the_queue_is_full(tmp_path):
+    queue = make_queue(tmp_path / "jobs.sqlite3", max_depth=2)
+    queue.submit({})
+    queue.submit({})
+    with pytest.raises(job_queue.JobQueueFull):
+        queue.submit({})
+    assert (queue.depth(), queue.last_depth, queue.rejected) == (2, 2, 1)
+
+def test_waiter_entry_is_dropped_on_timeout_and_disconnect(tmp_path):
+    async def main():
+        queue = make_queue(tmp_path / "jobs.sqlite3")
+        job = await queue.submit_async({})
+        timed_out = await queue.wait(job["job_id"], timeout=0.05)
+
+        waiter = asyncio.create_task(queue.wait(job["job_id"], timeout=5))
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        return queue, timed_out
+
+    queue, timed_out = asyncio.run(main())
+    assert timed_out["status"] == "queued"
+    assert queue._changed == {}
@@ -0,0 +1,20 @@
+import numpy as np
+import lean_predictor
+import ml_core
+
+def test_built_from_current_pickles(serving_artifacts):
+    assert serving_artifacts.source_versions["predictor"] == ml_core.pickle_version()
+
+def test_predict_proba_matches_pipeline(serving_artifacts, expected, vectorizer, label_encoder, texts):
+    expected_probs, expected_labels = expected
+
+    # booster yang sama tanpa wrapper imblearn: probabilitas identik, bukan sekadar mirip
+    probs = serving_artifacts.predictor.predict_proba(vectorizer.transform(texts))
+    np.testing.assert_array_equal(probs, expected_probs)
+    labels = label_encoder.inverse_transform(np.argmax(probs, axis=1))
+    assert list(labels) == list(expected_labels)
+
+def test_from_pipeline_selects_same_columns(serving_artifacts, pipeline):
+    support = pipeline.named_steps["selector"].get_support()
+    np.testing.assert_array_equal(serving_artifacts.predictor.columns, np.flatnonzero(support))
+    np.testing.assert_array_equal(lean_predictor.from_pipeline(pipeline).columns, serving_artifacts.predictor.columns)
@@ -0,0 +1,80 @@
+"""Harness load test (benchmarks/): database in-memory dan satu skenario end-to-end kecil."""
+import asyncio
+import json
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import PROJECT_ROOT
+
+sys.path.insert(0, str(PROJECT_ROOT / "benchmarks"))
+
+import local_db
+
+def run(coro):
+    return asyncio.run(coro)
+
+def write_analysis(db, *metrics):
+    async def write():
+        async with db.tx() as transaction:
+            await transaction.analysis.create(data={"userId": 1, "metric": {"create": list(metrics)}})
+
+    run(write())
+
+def metric(product_id, fingerprint):
+    return {"productId": product_id, "fingerprint": fingerprint, "aspectScores": SimpleNamespace(data={})}
+
+def test_metric_lookup_returns_the_newest_metric_of_the_product():
+    db = local_db.LocalPrisma()
+    for fingerprint in ("A", "B", "A", "B"):
+        write_analysis(db, metric(1, fingerprint))
+    write_analysis(db, metric(2, "C"))
+
+    latest = run(db.metric.find_first(where={"productId": 1}, order=[{"createdAt": "desc"}]))
+    assert latest.fingerprint == "B"
+    assert latest.aspectScores == {}
+    assert run(db.metric.find_first(where={"productId": 3})) is None
+
+def test_metrics_of_one_analysis_keep_their_write_order():
+    db = local_db.LocalPrisma()
+    write_analysis(db, metric(1, "A"), metric(1, "B"))
+
+    assert run(db.metric.find_first(where={"productId": 1})).fingerprint == "B"
+
+def test_remember_metrics_off_never_returns_a_metric():
+    db = local_db.LocalPrisma(remember_metrics=False)
+    write_analysis(db, metric(1, "A"))
+
+    assert run(db.metric.find_first(where={"productId": 1})) is None
+
+def test_product_upsert_creates_once():
+    db = local_db.LocalPrisma()
+    data = {"create": {"name": "Laptop", "url": "https://example.com/a", "brandId": 1}, "update": {}}
+
+    created = run(db.product.upsert(where={"url": "https://example.com/a"}, data=data))
+    again = run(db.product.upsert(where={"url": "https://example.com/a"}, data=data))
+    assert again is created
+    assert run(db.product.find_unique(where={"url": "https://example.com/a"})) is created
+    assert run(db.product.find_unique(where={"url": "https://example.com/b"})) is None
+
+def test_load_test_runs_end_to_end(tmp_path):
+    # server benchmark mengimpor main -> services -> prisma-client-py (hasil `prisma generate`);
+    # folder prisma/ di root repo sendiri hanya namespace package tanpa enums
+    pytest.importorskip("prisma.enums")
+    output = tmp_path / "load_test.json"
+    subprocess.run(
+        [
+            sys.executable, str(PROJECT_ROOT / "benchmarks" / "load_test.py"),
+            "--candidates", "2", "--reviews", "5", "--concurrency", "2",
+            "--requests", "4", "--warmup", "1", "--cache", "warm", "--db-latency-ms", "0",
+            "--output", str(output),
+        ],
+        cwd=PROJECT_ROOT,
+        check=True,
+        timeout=300,
+    )
+
+    scenarios = json.loads(output.read_text())["scenarios"]
+    assert [(scenario["ok"], scenario["errors"]) for scenario in scenarios] == [(4, {})]
@@ -0,0 +1,52 @@
+"""MicroBatcher: batch lintas pemanggil dengan batas max_rows per batch."""
+import asyncio
+
+import inference
+
+class FakeServing:
+    """Pengganti ServingModel.run: mencatat ukuran setiap batch dan berapa yang berjalan bersamaan"""
+
+    def __init__(self):
+        self.worker_stats = {}
+        self.batch_sizes = []
+        self.running = 0
+        self.max_running = 0
+
+    async def run(self, fn, texts):
+        self.batch_sizes.append(len(texts))
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        labels = [f"label-{text}" for text in texts]
+        return (list(texts), labels, [1.0] * len(texts)), {"pid": 1, "last_batch_seconds": {}}
+
+def run_batcher(max_rows, callers, window_ms=5):
+    serving = FakeServing()
+
+    async def main():
+        batcher = inference.MicroBatcher(serving, window_ms=window_ms, max_rows=max_rows)
+        return await asyncio.gather(*(batcher.predict(texts) for texts in callers))
+
+    return serving, asyncio.run(main())
+
+def texts(prefix, count):
+    return [f"{prefix}{i}" for i in range(count)]
+
+def test_callers_share_one_batch_within_the_window():
+    serving, results = run_batcher(10, [texts("a", 3), texts("b", 4)])
+
+    assert serving.batch_sizes == [7]
+    assert results[1][1] == [f"label-b{i}" for i in range(4)]
+
+def test_batches_never_exceed_max_rows_and_run_concurrently():
+    callers = [texts("a", 3), texts("b", 4), texts("c", 25), texts("d", 2)]
+    serving, results = run_batcher(10, callers)
+
+    assert max(serving.batch_sizes) <= 10
+    assert sum(serving.batch_sizes) == 34
+    assert serving.max_running > 1
+    for caller, (clean_texts, labels, confidences) in zip(callers, results):
+        assert clean_texts == caller
+        assert labels == [f"label-{text}" for text in caller]
+        assert len(confidences) == len(caller)
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+import lean_predictor
+import ml_core
+
+@pytest.fixture(scope="module")
+def narrow(serving_artifacts):
+    # bundle: vocab terurut dari array mmap, dicari dengan searchsorted
+    return serving_artifacts.narrow
+
+def test_built_from_current_pickles(serving_artifacts):
+    assert serving_artifacts.source_versions["narrow"] == ml_core.pickle_version()
+
+def test_matrix_matches_tfidf_selector(narrow, pipeline, vectorizer, texts):
+    expected = pipeline.named_steps["selector"].transform(vectorizer.transform(texts)).tocsr()
+    expected.sort_indices()
+    actual = narrow.transform(texts)
+
+    assert actual.shape == expected.shape
+    assert actual.dtype == expected.dtype
+    np.testing.assert_array_equal(actual.indptr, expected.indptr)
+    np.testing.assert_array_equal(actual.indices, expected.indices)
+    np.testing.assert_array_equal(actual.data, expected.data)
+
+def test_feature_names_match_selector(narrow, pipeline, vectorizer):
+    support = pipeline.named_steps["selector"].get_support()
+    assert list(narrow.get_feature_names_out()) == list(vectorizer.get_feature_names_out()[support])
+
+def test_predictions_match_pipeline(narrow, pipeline, expected, label_encoder, texts):
+    expected_probs, expected_labels = expected
+    probs = lean_predictor.from_pipeline(pipeline).predict_proba(narrow.transform(texts))
+    np.testing.assert_array_equal(probs, expected_probs)
+    labels = label_encoder.inverse_transform(np.argmax(probs, axis=1))
+    assert list(labels) == list(expected_labels)
+
+def test_lookup_unknown_and_empty(narrow, vectorizer):
+    known = next(iter(vectorizer.vocabulary_))
+    ids = narrow.lookup([known, "kata_yang_tidak_ada_di_vocab", known + "x" * 64])
+    assert ids.tolist() == [vectorizer.vocabulary_[known], -1, -1]
+    assert narrow.transform(["", "?!"]).nnz == 0
+    assert narrow.transform([]).shape == (0, narrow.n_features)
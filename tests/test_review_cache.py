@@ -0,0 +1,35 @@
+"""Cache prediksi ulasan dua tier: LRU memori + SQLite di disk dengan batas baris."""
+import asyncio
+
+import review_cache
+
+def entry(label):
+    return {"label": label, "confidence": 0.5, "aspects": {"baterai": ["baterai"]}}
+
+def open_cache(tmp_path, memory_items=0, disk_rows=0):
+    cache = review_cache.ReviewCache(tmp_path / "reviews.sqlite3", memory_items, max_disk_rows=disk_rows)
+    cache.open()
+    return cache
+
+def test_disk_tier_survives_reopen(tmp_path):
+    cache = open_cache(tmp_path, memory_items=10)
+    asyncio.run(cache.put_many({"a": entry("positif"), "b": entry("negatif")}))
+    cache.close()
+
+    reopened = open_cache(tmp_path, memory_items=10)
+    assert asyncio.run(reopened.get_many(["a", "b", "c"])) == {"a": entry("positif"), "b": entry("negatif")}
+    assert (reopened.disk_hits, reopened.misses) == (2, 1)
+    # entry dari disk dinaikkan ke memori
+    asyncio.run(reopened.get_many(["a"]))
+    assert reopened.memory_hits == 1
+
+def test_disk_tier_evicts_the_oldest_writes(tmp_path):
+    cache = open_cache(tmp_path, disk_rows=3)
+    for key in ("a", "b", "c", "d"):
+        asyncio.run(cache.put_many({key: entry("positif")}))
+    # ditulis ulang: kini menjadi baris terbaru
+    asyncio.run(cache.put_many({"b": entry("negatif")}))
+    asyncio.run(cache.put_many({"e": entry("positif")}))
+
+    assert sorted(asyncio.run(cache.get_many(["a", "b", "c", "d", "e"]))) == ["b", "d", "e"]
+    assert cache.stats()["disk_evictions"] == 2
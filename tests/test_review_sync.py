@@ -0,0 +1,108 @@
+"""plan_review_sync / flush_writes terhadap database in-memory benchmark (benchmarks/local_db.py)."""
+import asyncio
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import PROJECT_ROOT
+
+# services mengimpor prisma-client-py hasil `prisma generate`
+pytest.importorskip("prisma.enums")
+
+sys.path.insert(0, str(PROJECT_ROOT / "benchmarks"))
+
+import local_db
+import services
+
+MODEL_ID = 1
+VERSION = "model-a-matcher"
+
+def review(product_id, text, model_id=MODEL_ID, version=VERSION):
+    return {
+        "content": text,
+        "contentHash": f"hash-{text}",
+        "productId": product_id,
+        "modelId": model_id,
+        "analysisVersion": version,
+    }
+
+def sync(product_id, texts, model_id=MODEL_ID, version=VERSION):
+    return services.ReviewSync(
+        product_id, model_id, version,
+        {f"hash-{text}": review(product_id, text, model_id, version) for text in texts},
+    )
+
+def stored_texts(db, product_id):
+    return sorted(row["content"] for row in db.reviews.get(product_id, {}).values())
+
+def plan(db, review_syncs):
+    async def run():
+        async with db.tx() as transaction:
+            return await services.plan_review_sync(transaction, review_syncs)
+
+    return asyncio.run(run())
+
+def flush(db, pending):
+    asyncio.run(services.flush_writes(SimpleNamespace(id=1), pending))
+
+@pytest.fixture
+def db(monkeypatch):
+    db = local_db.LocalPrisma()
+    db.products["https://example.com/1"] = SimpleNamespace(productId=1, url="https://example.com/1")
+    db.products["https://example.com/2"] = SimpleNamespace(productId=2, url="https://example.com/2")
+    db._apply_create_reviews([review(1, text) for text in ("a", "b", "c")])
+    monkeypatch.setattr(services, "prisma", db)
+    return db
+
+def test_only_changed_reviews_are_written(db):
+    (product_id, stale, fresh), = plan(db, [sync(1, ["b", "c", "d"])])
+
+    assert (product_id, stale) == (1, ["hash-a"])
+    assert [row["content"] for row in fresh] == ["d"]
+
+def test_unchanged_reviews_produce_no_writes(db):
+    assert plan(db, [sync(1, ["a", "b", "c"]), sync(2, [])]) == [(1, [], []), (2, [], [])]
+
+@pytest.mark.parametrize("model_id, version", [(2, VERSION), (MODEL_ID, "model-a-matcher-v3")])
+def test_other_model_or_analysis_version_is_rewritten(db, model_id, version):
+    (_, stale, fresh), = plan(db, [sync(1, ["a", "b"], model_id=model_id, version=version)])
+
+    assert stale == ["hash-a", "hash-b", "hash-c"]
+    assert sorted(row["content"] for row in fresh) == ["a", "b"]
+
+def test_flush_writes_applies_reviews_and_metrics_together(db):
+    pending = services.PendingWrites()
+    pending.review_syncs[0] = sync(1, ["c", "d"])
+    pending.review_syncs[1] = sync(2, ["x"])
+    pending.metrics[0] = {"productId": 1, "fingerprint": "f1"}
+    pending.metrics[1] = {"productId": 2, "fingerprint": "f2"}
+    flush(db, pending)
+
+    assert stored_texts(db, 1) == ["c", "d"]
+    assert stored_texts(db, 2) == ["x"]
+    assert db.analyses == 1
+    assert db.product_locks and not any(lock.locked() for lock in db.product_locks.values())
+
+def test_last_occurrence_of_a_duplicate_candidate_wins(db):
+    pending = services.PendingWrites()
+    pending.review_syncs[0] = sync(1, ["x"])
+    pending.review_syncs[2] = sync(1, ["y"])
+    pending.metrics[0] = {"productId": 1, "fingerprint": "fx"}
+    pending.metrics[2] = {"productId": 1, "fingerprint": "fy"}
+    flush(db, pending)
+
+    assert stored_texts(db, 1) == ["y"]
+    # Metric kemunculan terakhir ditulis paling akhir = Metric terbaru produk
+    assert db.metrics[1][0].fingerprint == "fy"
+
+def test_fingerprint_hit_as_last_occurrence_keeps_stored_reviews(db):
+    pending = services.PendingWrites()
+    pending.review_syncs[0] = sync(1, ["x"])
+    # kemunculan kedua memakai hasil tersimpan (tanpa review sync)
+    pending.metrics[0] = {"productId": 1, "fingerprint": "fx"}
+    pending.metrics[1] = {"productId": 1, "fingerprint": "fabc"}
+    flush(db, pending)
+
+    assert stored_texts(db, 1) == ["a", "b", "c"]
+    assert db.metrics[1][0].fingerprint == "fabc"
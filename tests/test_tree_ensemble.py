@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+import lean_predictor
+import ml_core
+import tree_ensemble
+from conftest import PROB_MAX_ULP
+
+@pytest.fixture(scope="module")
+def booster_margins(pipeline, vectorizer, texts):
+    predictor = lean_predictor.from_pipeline(pipeline)
+    return predictor.booster.inplace_predict(predictor.select(vectorizer.transform(texts)), predict_type="margin")
+
+def test_built_from_current_pickles(serving_artifacts):
+    assert serving_artifacts.source_versions["ensemble"] == ml_core.pickle_version()
+
+def test_margins_match_booster(serving_artifacts, booster_margins, vectorizer, texts):
+    ensemble = serving_artifacts.ensemble
+    vecs = vectorizer.transform(texts)
+    np.testing.assert_array_equal(ensemble.predict_margin(vecs), booster_margins)
+    # batch kecil menelusuri semua pohon tanpa penyaringan fitur: dicek per baris juga
+    single = np.vstack([ensemble.predict_margin(vecs[i:i + 1]) for i in range(vecs.shape[0])])
+    np.testing.assert_array_equal(single, booster_margins)
+
+def test_predict_proba_matches_pipeline(serving_artifacts, expected, vectorizer, label_encoder, texts):
+    expected_probs, expected_labels = expected
+    probs = serving_artifacts.ensemble.predict_proba(vectorizer.transform(texts))
+    assert probs.dtype == expected_probs.dtype
+    np.testing.assert_array_max_ulp(probs, expected_probs, maxulp=PROB_MAX_ULP)
+    labels = label_encoder.inverse_transform(np.argmax(probs, axis=1))
+    assert list(labels) == list(expected_labels)
+
+def test_bundle_layout_matches_compiled(export_artifacts, bundle_artifacts):
+    # layout evaluasi bundle dibaca dari array mmap, bukan dihitung ulang
+    compiled = export_artifacts.ensemble.layout()
+    stored = bundle_artifacts.ensemble.layout()
+    assert list(stored) == list(tree_ensemble.LAYOUT_ARRAYS)
+    for name in tree_ensemble.LAYOUT_ARRAYS:
+        np.testing.assert_array_equal(stored[name], compiled[name], err_msg=name)
@@ -0,0 +1,300 @@
+import json
+from pathlib import Path
+from typing import Optional
+import numpy as np
+import scipy.sparse as sp
+
+ENSEMBLE_FORMAT = 1
+# Baris per potongan evaluasi: matriks padat (baris x kolom terpilih) float32 per potongan
+_CHUNK_ROWS = 1024
+# Sampai ukuran ini semua pasangan baris x pohon ditelusuri tanpa penyaringan fitur
+_SMALL_BATCH_ROWS = 16
+# Array turunan yang dibaca saat evaluasi (lihat TreeEnsemble.layout)
+LAYOUT_ARRAYS = ("remap", "node_column", "node_threshold", "node_left", "default_leaf",
+                 "feature_trees_indptr", "feature_trees_indices", "feature_trees_data")
+
+class TreeEnsemble:
+    """Booster XGBoost (gbtree, multi:softprob) yang dikompilasi ke array NumPy datar.
+
+    Semua node dari semua pohon ada di satu array per atribut (fitur, threshold, anak kiri/kanan,
+    arah default untuk nilai kosong, nilai leaf). Node dinomori ulang sehingga anak kanan selalu
+    anak kiri + 1, dan leaf menunjuk dirinya sendiri; satu batch dievaluasi level demi level
+    sebanyak max_depth langkah untuk semua pasangan baris x pohon sekaligus, tanpa xgboost
+    maupun sklearn. Pasangan yang tidak memakai satu pun fitur baris langsung memakai leaf default.
+
+    Nilai kosong (fitur tidak ada di baris CSR) mengikuti arah default node. Agar tidak perlu
+    isnan per node, setiap baris dibentangkan dua kali: salinan kiri mengisi nilai kosong
+    dengan -inf (selalu ke kiri) dan salinan kanan dengan +inf (selalu ke kanan); node membaca
+    salinan yang sesuai arah default-nya.
+
+    Urutan aritmetika mengikuti predictor CPU XGBoost (float32, pohon dijumlah berurutan
+    mulai dari base margin) sehingga margin identik bit-per-bit; lihat _softmax untuk
+    probabilitasnya.
+    """
+
+    def __init__(self, columns, n_features: int, feature, threshold, left, right, default_left,
+                 leaf_value, roots, tree_class, base_margin, max_depth: int, layout: Optional[dict] = None):
+        self.columns = np.asarray(columns, dtype=np.int32)
+        self.n_features = n_features
+        self.feature = np.asarray(feature, dtype=np.int32)
+        self.threshold = np.asarray(threshold, dtype=np.float32)
+        self.left = np.asarray(left, dtype=np.int32)
+        self.right = np.asarray(right, dtype=np.int32)
+        self.default_left = np.asarray(default_left, dtype=bool)
+        self.leaf_value = np.asarray(leaf_value, dtype=np.float32)
+        self.roots = np.asarray(roots, dtype=np.int32)
+        self.tree_class = np.asarray(tree_class, dtype=np.int32)
+        self.base_margin = np.asarray(base_margin, dtype=np.float32)
+        self.max_depth = max_depth
+        self.num_class = len(self.base_margin)
+
+        if layout is None:
+            layout = self._build_layout()
+        # dtype sudah sesuai (mis. array mmap dari serving bundle): dipakai langsung tanpa salinan
+        self._remap = np.asarray(layout["remap"], dtype=np.int32)
+        self._node_column = np.asarray(layout["node_column"], dtype=np.intp)
+        self._node_threshold = np.asarray(layout["node_threshold"], dtype=np.float32)
+        self._left = np.asarray(layout["node_left"], dtype=np.intp)
+        self._default_leaf = np.asarray(layout["default_leaf"], dtype=np.intp)
+        self._feature_trees = sp.csr_matrix(
+            (layout["feature_trees_data"], layout["feature_trees_indices"], layout["feature_trees_indptr"]),
+            shape=(len(self.columns), len(self.roots)),
+            copy=False,
+        )
+
+    def layout(self) -> dict:
+        """Array turunan dalam bentuk akhir untuk evaluasi; disimpan serving bundle supaya
+        worker cukup mmap tanpa menghitung ulang atau menyalinnya ke heap.
+        """
+        return {
+            "remap": self._remap,
+            "node_column": self._node_column.astype(np.int64),
+            "node_threshold": self._node_threshold,
+            "node_left": self._left.astype(np.int64),
+            "default_leaf": self._default_leaf.astype(np.int64),
+            "feature_trees_indptr": self._feature_trees.indptr,
+            "feature_trees_indices": self._feature_trees.indices,
+            "feature_trees_data": self._feature_trees.data,
+        }
+
+    def _build_layout(self) -> dict:
+        remap = np.full(self.n_features, -1, dtype=np.int32)
+        remap[self.columns] = np.arange(len(self.columns), dtype=np.int32)
+
+        is_leaf = self.left == np.arange(len(self.left))
+        if not np.array_equal(self.right[~is_leaf], self.left[~is_leaf] + 1):
+            raise ValueError("Anak kanan harus anak kiri + 1 (pakai compile_booster)")
+        # kolom yang dibaca node di matriks [nilai kosong=-inf | nilai kosong=+inf];
+        # leaf membaca kolom 0 dengan threshold +inf sehingga selalu tetap di tempat
+        n_columns = len(self.columns)
+        # indeks bertipe intp: np.take / fancy indexing tidak perlu mengonversi setiap level
+        node_column = np.where(is_leaf, 0, self.feature + np.where(self.default_left, 0, n_columns)).astype(np.intp)
+        node_threshold = np.where(is_leaf, np.inf, self.threshold).astype(np.float32)
+        node_left = self.left.astype(np.intp)
+
+        # Leaf tujuan setiap pohon jika semua fiturnya kosong (jalur default)
+        missing_row = np.concatenate([np.full(n_columns, -np.inf), np.full(n_columns, np.inf)]).astype(np.float32)
+        node = self.roots.astype(np.intp)
+        for _ in range(self.max_depth):
+            node = node_left[node] + (missing_row[node_column[node]] >= node_threshold[node])
+
+        # Fitur -> pohon yang memakainya. Baris TF-IDF hanya punya sedikit fitur, jadi kebanyakan
+        # pasangan (baris, pohon) pasti berakhir di leaf default dan tidak perlu ditelusuri
+        tree_of_node = np.repeat(np.arange(len(self.roots)), np.diff(np.append(self.roots, len(self.left))))
+        used = sp.csr_matrix(
+            (np.ones(int((~is_leaf).sum()), dtype=np.int32), (self.feature[~is_leaf], tree_of_node[~is_leaf])),
+            shape=(n_columns, len(self.roots)),
+        )
+        used.data[:] = 1
+
+        return {
+            "remap": remap,
+            "node_column": node_column,
+            "node_threshold": node_threshold,
+            "node_left": node_left,
+            "default_leaf": node,
+            "feature_trees_indptr": used.indptr,
+            "feature_trees_indices": used.indices,
+            "feature_trees_data": used.data,
+        }
+
+    def predict_margin(self, X: sp.csr_matrix) -> np.ndarray:
+        """Jumlah nilai leaf per kelas + base margin (sama dengan predict_type="margin")"""
+        margins = np.empty((X.shape[0], self.num_class), dtype=np.float32)
+        for start in range(0, X.shape[0], _CHUNK_ROWS):
+            stop = min(start + _CHUNK_ROWS, X.shape[0])
+            margins[start:stop] = self._chunk_margins(X, start, stop)
+        return margins
+
+    def predict_proba(self, X: sp.csr_matrix) -> np.ndarray:
+        return _softmax(self.predict_margin(X))
+
+    def _chunk_margins(self, X: sp.csr_matrix, start: int, stop: int) -> np.ndarray:
+        n_rows, n_columns = stop - start, len(self.columns)
+        lo, hi = X.indptr[start], X.indptr[stop]
+        if X.shape[1] == n_columns:
+            # sudah berisi kolom terpilih saja (output NarrowVectorizer)
+            mapped = X.indices[lo:hi]
+        else:
+            mapped = self._remap[X.indices[lo:hi]]
+        keep = mapped >= 0
+        row_ids = np.repeat(np.arange(n_rows), np.diff(X.indptr[start:stop + 1]))[keep]
+        columns = mapped[keep]
+        values = X.data[lo:hi][keep]
+
+        # matriks padat [kosong=-inf | kosong=+inf]
+        dense = np.empty((n_rows, 2 * n_columns), dtype=np.float32)
+        dense[:, :n_columns] = -np.inf
+        dense[:, n_columns:] = np.inf
+        dense[row_ids, columns] = values
+        dense[row_ids, columns + n_columns] = values
+        flat = dense.ravel()
+
+        if n_rows <= _SMALL_BATCH_ROWS:
+            # batch kecil: menelusuri semua pasangan lebih murah daripada menyaringnya
+            pair_rows = np.repeat(np.arange(n_rows), len(self.roots))
+            pair_trees = np.tile(np.arange(len(self.roots)), n_rows)
+        else:
+            # hanya pasangan (baris, pohon) yang memakai minimal satu fitur baris itu
+            present = sp.csr_matrix((np.ones(len(columns), dtype=np.int32), (row_ids, columns)), shape=(n_rows, n_columns))
+            pairs = (present @ self._feature_trees).tocoo()
+            pair_rows, pair_trees = pairs.row, pairs.col
+
+        node = self.roots[pair_trees].astype(np.intp)
+        row_offset = pair_rows.astype(np.intp) * (2 * n_columns)
+        for _ in range(self.max_depth):
+            value = flat[row_offset + self._node_column[node]]
+            # value < threshold -> kiri, selain itu kanan (= kiri + 1)
+            node = self._left[node] + (value >= self._node_threshold[node])
+
+        leaf_nodes = np.repeat(self._default_leaf[None, :], n_rows, axis=0)
+        leaf_nodes[pair_rows, pair_trees] = node
+
+        # (baris, ronde, kelas): add.accumulate menjumlah berurutan (bukan pairwise),
+        # sama dengan urutan penjumlahan pohon di XGBoost
+        leaves = self.leaf_value[leaf_nodes].reshape(n_rows, -1, self.num_class)
+        base = np.broadcast_to(self.base_margin, (n_rows, 1, self.num_class))
+        return np.add.accumulate(np.concatenate([base, leaves], axis=1), axis=1)[:, -1]
+
+def _softmax(margins: np.ndarray) -> np.ndarray:
+    """Softmax per baris dengan urutan operasi XGBoost: exp float32, jumlah double, bagi float32.
+
+    exp dihitung di float64 lalu dibulatkan (pembulatan benar); expf libm sesekali meleset
+    1 ulp, jadi probabilitas bisa berbeda 1 ulp dari XGBoost walaupun margin identik.
+    """
+    shifted = margins - margins.max(axis=1, keepdims=True)
+    exps = np.exp(shifted.astype(np.float64)).astype(np.float32)
+    total = exps[:, 0].astype(np.float64)
+    for k in range(1, exps.shape[1]):
+        total += exps[:, k]
+    return exps / total.astype(np.float32)[:, None]
+
+def compile_booster(booster, columns, n_features: int, iteration_end: int = 0) -> TreeEnsemble:
+    """Booster XGBoost -> TreeEnsemble (butuh xgboost, dipanggil saat export saja)"""
+    model = json.loads(bytes(booster.save_raw("json")))
+    learner = model["learner"]
+    objective = learner["objective"]["name"]
+    if objective != "multi:softprob":
+        raise ValueError(f"Objective tidak didukung: {objective}")
+    gbtree = learner["gradient_booster"]
+    if gbtree["name"] != "gbtree":
+        raise ValueError(f"Booster tidak didukung: {gbtree['name']}")
+
+    num_class = int(learner["learner_model_param"]["num_class"])
+    base_margin = np.asarray(json.loads(learner["learner_model_param"]["base_score"]), dtype=np.float32)
+    if base_margin.ndim == 0:
+        base_margin = np.full(num_class, base_margin, dtype=np.float32)
+
+    trees = gbtree["model"]["trees"]
+    tree_info = gbtree["model"]["tree_info"]
+    if iteration_end:
+        trees, tree_info = trees[:iteration_end * num_class], tree_info[:iteration_end * num_class]
+    if list(tree_info) != [i % num_class for i in range(len(tree_info))]:
+        raise ValueError("Urutan pohon per kelas tidak didukung (harus satu pohon per kelas per ronde)")
+
+    feature, threshold, left, right, default_left, leaf_value, roots = [], [], [], [], [], [], []
+    max_depth = 0
+    offset = 0
+    for tree in trees:
+        if any(tree["split_type"]) or int(tree["tree_param"]["size_leaf_vector"]) > 1:
+            raise ValueError("Split kategorikal / leaf vektor tidak didukung")
+        children = list(zip(tree["left_children"], tree["right_children"]))
+
+        # penomoran ulang BFS: kedua anak satu node selalu bersebelahan (kanan = kiri + 1)
+        order = [0]
+        new_id = {0: 0}
+        depth = {0: 0}
+        for node in order:
+            left_child, right_child = children[node]
+            if left_child != -1:
+                new_id[left_child], new_id[right_child] = len(order), len(order) + 1
+                depth[left_child] = depth[right_child] = depth[node] + 1
+                order.extend((left_child, right_child))
+
+        for node in order:
+            left_child, right_child = children[node]
+            if left_child == -1:
+                # leaf menunjuk dirinya sendiri: tetap di tempat pada level berikutnya
+                feature.append(0)
+                threshold.append(0.0)
+                left.append(offset + new_id[node])
+                right.append(offset + new_id[node])
+                default_left.append(True)
+                leaf_value.append(tree["split_conditions"][node])
+            else:
+                feature.append(tree["split_indices"][node])
+                threshold.append(tree["split_conditions"][node])
+                left.append(offset + new_id[left_child])
+                right.append(offset + new_id[right_child])
+                default_left.append(bool(tree["default_left"][node]))
+                leaf_value.append(0.0)
+        max_depth = max(max_depth, max(depth.values()))
+        roots.append(offset)
+        offset += len(order)
+
+    return TreeEnsemble(
+        columns=columns,
+        n_features=n_features,
+        feature=feature,
+        threshold=threshold,
+        left=left,
+        right=right,
+        default_left=default_left,
+        leaf_value=leaf_value,
+        roots=roots,
+        tree_class=tree_info,
+        base_margin=base_margin,
+        max_depth=max_depth,
+    )
+
+def save_ensemble(ensemble: TreeEnsemble, path: Path, source_version: str):
+    np.savez(
+        path,
+        format=np.int32(ENSEMBLE_FORMAT),
+        source_version=np.str_(source_version),
+        columns=ensemble.columns,
+        n_features=np.int32(ensemble.n_features),
+        feature=ensemble.feature,
+        threshold=ensemble.threshold,
+        left=ensemble.left,
+        right=ensemble.right,
+        default_left=ensemble.default_left,
+        leaf_value=ensemble.leaf_value,
+        roots=ensemble.roots,
+        tree_class=ensemble.tree_class,
+        base_margin=ensemble.base_margin,
+        max_depth=np.int32(ensemble.max_depth),
+    )
+
+def load_ensemble(path: Path):
+    """Mengembalikan (ensemble, source_version); hanya butuh NumPy"""
+    with np.load(path, allow_pickle=False) as data:
+        if int(data["format"]) != ENSEMBLE_FORMAT:
+            raise ValueError(f"Format tree ensemble tidak didukung: {int(data['format'])}")
+        arrays = {
+            name: data[name]
+            for name in ("columns", "feature", "threshold", "left", "right", "default_left",
+                         "leaf_value", "roots", "tree_class", "base_margin")
+        }
+        ensemble = TreeEnsemble(n_features=int(data["n_features"]), max_depth=int(data["max_depth"]), **arrays)
+        return ensemble, str(data["source_version"])